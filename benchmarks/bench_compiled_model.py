@@ -0,0 +1,69 @@
+"""
+Benchmark del modelo compilado frente al pipeline original (preprocessor.pkl + best_model.pkl).
+
+Para lotes de 1, 100 y 10.000 empleados (filas de AbandonoEmpleados.csv replicadas) mide la
+latencia por llamada de score_frame con cada par de artefactos (p50 y p99) y comprueba que las
+probabilidades coinciden. Requiere haber ejecutado scripts/export_compiled_model.py.
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_compiled_model.py
+  python benchmarks/bench_compiled_model.py --batch-sizes 1 100 10000 --repeat 200
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from compiled_model import load_compiled  # noqa: E402
+from scoring import (  # noqa: E402
+    ARTIFACTS, CSV_NA_VALUES, CSV_SEP, INDEX_COL, input_columns, load_artifacts, load_manifest, score_frame,
+)
+
+
+def _latencias(fn, repeat: int) -> np.ndarray:
+    fn()  # calentamiento
+    out = np.empty(repeat)
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        out[i] = time.perf_counter() - t0
+    return out * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: modelo compilado vs pipeline sklearn/imblearn")
+    parser.add_argument("--csv", default=str(ROOT / "AbandonoEmpleados.csv"))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--repeat", type=int, default=100, help="Llamadas medidas por tamaño de lote")
+    args = parser.parse_args()
+
+    compiled = load_compiled(ARTIFACTS)
+    if compiled is None:
+        print("No hay modelo compilado. Ejecute: python scripts/export_compiled_model.py", file=sys.stderr)
+        sys.exit(1)
+    _, pre_c, model_c = compiled
+    pre, model = load_artifacts(ARTIFACTS)
+    columns = input_columns(pre, load_manifest(ARTIFACTS))
+    base = pd.read_csv(args.csv, sep=CSV_SEP, index_col=INDEX_COL, na_values=CSV_NA_VALUES)
+
+    print(f"{'lote':>7} {'pipeline p50':>13} {'p99':>8} {'compilado p50':>14} {'p99':>8} {'speedup':>8} {'dif. máx':>9}")
+    for n in args.batch_sizes:
+        df = base.iloc[np.arange(n) % len(base)]
+        diff = float(np.max(np.abs(score_frame(pre, model, df, columns) - score_frame(pre_c, model_c, df, columns))))
+        repeat = max(5, args.repeat if n <= 1000 else args.repeat // 10)
+        t_pipe = _latencias(lambda: score_frame(pre, model, df, columns), repeat)
+        t_comp = _latencias(lambda: score_frame(pre_c, model_c, df, columns), repeat)
+        p50_a, p99_a = np.percentile(t_pipe, [50, 99])
+        p50_b, p99_b = np.percentile(t_comp, [50, 99])
+        print(f"{n:>7,} {p50_a:>10.2f} ms {p99_a:>5.2f} ms {p50_b:>11.2f} ms {p99_b:>5.2f} ms "
+              f"{p50_a / p50_b:>7.1f}x {diff:>9.1e}")
+
+
+if __name__ == "__main__":
+    main()
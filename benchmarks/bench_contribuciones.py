@@ -0,0 +1,79 @@
+"""
+Benchmark de los factores de riesgo por segmento: contribuciones recalculadas para la selección en
+cada consulta (TreeSHAP con pred_contribs) frente a contribuciones precalculadas al puntuar y
+agregadas con ContribucionesSegmento (dashboard/contribuciones_segmento.py).
+
+Genera datasets sintéticos remuestreando df_con_scoring.pkl. El recálculo solo se mide hasta
+--max-recalculo filas; también se informa del coste del cálculo por lotes (una vez al puntuar) y
+del tamaño de las columnas float32 en el almacén.
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_contribuciones.py
+  python benchmarks/bench_contribuciones.py --rows 100000 1000000 --max-recalculo 100000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT / "dashboard"))
+
+from contribuciones import contribuciones_frame  # noqa: E402
+from contribuciones_segmento import ContribucionesSegmento  # noqa: E402
+from scoring import input_columns, load_artifacts, load_manifest  # noqa: E402
+
+
+def _timeit(fn, repeat: int) -> tuple[float, object]:
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: contribuciones recalculadas vs precalculadas por segmento")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--max-recalculo", type=int, default=100_000, help="Filas máximas para medir el recálculo")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = joblib.load(ROOT / "artifacts" / "modeling" / "df_con_scoring.pkl")
+    preprocessor, model = load_artifacts(compiled=True)
+    columns = input_columns(preprocessor, load_manifest())
+    contrib_base, _ = contribuciones_frame(preprocessor, model, base, columns)
+    rng = np.random.default_rng(0)
+    print(f"{'filas':>11} {'modo':<34} {'ms':>10} {'MB':>8}")
+    for n in args.rows:
+        idx = rng.integers(0, len(base), n)
+        df = base.iloc[idx].reset_index(drop=True)
+        # Segmento: un departamento con la mitad de los años en compañía
+        seleccion = (df["departamento"] == "Research & Development") & (df["anos_compania"] <= df["anos_compania"].median())
+        posiciones = np.flatnonzero(seleccion.to_numpy())
+
+        if n <= args.max_recalculo:
+            t, _ = _timeit(lambda: contribuciones_frame(preprocessor, model, df.iloc[posiciones], columns)[0].mean(), 1)
+            print(f"{n:>11,} {'recalcular la selección':<34} {t * 1000:>10.1f} {'':>8}")
+            t, _ = _timeit(lambda: contribuciones_frame(preprocessor, model, df, columns), 1)
+            print(f"{n:>11,} {'lote al puntuar (todas las filas)':<34} {t * 1000:>10.1f} {'':>8}")
+
+        contribs = contrib_base.iloc[idx].reset_index(drop=True)
+        datos = pd.concat([df[["departamento"]], contribs], axis=1)
+        t_build, seg = _timeit(lambda: ContribucionesSegmento(datos), 1)
+        mb = contribs.memory_usage(index=False).sum() / 1e6
+        print(f"{n:>11,} {'matriz (1 vez por carga)':<34} {t_build * 1000:>10.1f} {mb:>8.1f}")
+        t, _ = _timeit(lambda: seg.media(posiciones), args.repeat)
+        print(f"{n:>11,} {'precalculadas: media del segmento':<34} {t * 1000:>10.1f} {'':>8}")
+        t, _ = _timeit(lambda: seg.media_por_departamento(posiciones), args.repeat)
+        print(f"{n:>11,} {'precalculadas: por departamento':<34} {t * 1000:>10.1f} {'':>8}")
+
+
+if __name__ == "__main__":
+    main()
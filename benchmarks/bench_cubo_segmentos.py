@@ -0,0 +1,83 @@
+"""
+Benchmark del cubo de segmentos frente a los groupby por fila de las páginas Resumen y Distribución.
+
+Replica df_con_scoring.pkl hasta --rows filas y mide, para un cambio de umbrales en el sidebar:
+  - groupby: % alto riesgo por departamento, por rango de años y por satisfacción (código anterior).
+  - cubo: construcción (una vez por carga de datos) y consulta de los mismos agregados.
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_cubo_segmentos.py --rows 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "dashboard"))
+
+from cubo_segmentos import BINS_ANOS, LABELS_ANOS, CuboSegmentos  # noqa: E402
+
+SCORING_COL = "scoring_abandono"
+
+
+def _groupby(df: pd.DataFrame, th_high: float):
+    alto = lambda s: (s >= th_high).mean() * 100  # noqa: E731
+    dep = df.groupby("departamento", dropna=False, observed=True)[SCORING_COL].apply(alto)
+    rangos = pd.cut(df["anos_compania"], bins=BINS_ANOS, labels=LABELS_ANOS, include_lowest=True)
+    anos = df[SCORING_COL].groupby(rangos, observed=True).agg(["count", lambda x: (x >= th_high).sum()])
+    sat = df.groupby("satisfaccion_entorno", dropna=False, observed=True)[SCORING_COL].apply(alto)
+    return dep, anos, sat
+
+
+def _cubo(cubo: CuboSegmentos, th_high: float):
+    mascara = cubo.mascara()
+    total, alto = cubo.contar(), cubo.contar(th_high)
+    dep = cubo.por_dimension(alto, mascara, "departamento") / cubo.por_dimension(total, mascara, "departamento") * 100
+    anos = (cubo.por_rango_anos(total, mascara), cubo.por_rango_anos(alto, mascara))
+    sat = cubo.por_dimension(alto, mascara, "satisfaccion_entorno") / cubo.por_dimension(total, mascara, "satisfaccion_entorno") * 100
+    return dep, anos, sat
+
+
+def _timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: cubo de segmentos vs groupby por fila")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = joblib.load(ROOT / "artifacts" / "modeling" / "df_con_scoring.pkl")
+    rng = np.random.default_rng(0)
+    df = base.iloc[rng.integers(0, len(base), args.rows)].reset_index(drop=True)
+    df[SCORING_COL] = rng.random(args.rows).astype(np.float32)
+
+    t0 = time.perf_counter()
+    cubo = CuboSegmentos(df, SCORING_COL)
+    t_build = time.perf_counter() - t0
+    t_groupby = _timeit(lambda: _groupby(df, 0.5), args.repeat)
+    t_cubo = _timeit(lambda: _cubo(cubo, 0.5), args.repeat)
+
+    dep_g, _, _ = _groupby(df, 0.5)
+    dep_c, _, _ = _cubo(cubo, 0.5)
+    ok = np.allclose(dep_g.sort_index().to_numpy(), dep_c.sort_index().to_numpy())
+    print(f"{args.rows:,} filas, {int(np.prod(cubo.shape))} celdas")
+    print(f"  groupby por cambio de umbral:  {t_groupby * 1000:9.1f} ms")
+    print(f"  cubo: construcción (1 vez):    {t_build * 1000:9.1f} ms")
+    print(f"  cubo: consulta por umbral:     {t_cubo * 1000:9.1f} ms  ({t_groupby / t_cubo:,.0f}x)")
+    print(f"  resultados iguales: {ok}")
+
+
+if __name__ == "__main__":
+    main()
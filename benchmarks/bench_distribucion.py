@@ -0,0 +1,83 @@
+"""
+Benchmark de los gráficos de "Distribución y riesgo": histograma y boxplot con plotly.express
+sobre todas las filas (código anterior) frente a las figuras construidas desde los resúmenes del
+cubo de segmentos (graficos_distribucion.py).
+
+Replica df_con_scoring.pkl hasta --rows filas (scores aleatorios) y mide, por camino, el tiempo de
+construir las dos figuras y serializarlas a JSON (lo que st.plotly_chart envía al navegador) y el
+tamaño de ese JSON. El cubo se construye una vez por carga de datos y se mide aparte.
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_distribucion.py --rows 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "dashboard"))
+
+from cubo_segmentos import CuboSegmentos  # noqa: E402
+from graficos_distribucion import figura_caja, figura_histograma, resumen_distribucion  # noqa: E402
+
+SCORING_COL = "scoring_abandono"
+TH_LOW, TH_HIGH = 0.3, 0.5
+
+
+def _filas(df: pd.DataFrame) -> list:
+    """Código anterior de la página: figuras de plotly.express con las filas filtradas."""
+    fig = px.histogram(df, x=SCORING_COL, nbins=20, labels={SCORING_COL: "Scoring abandono"})
+    fig.add_vline(x=TH_LOW, line_dash="dash", line_color="gray", annotation_text=f"Medio {TH_LOW}")
+    fig.add_vline(x=TH_HIGH, line_dash="dash", line_color="orange", annotation_text=f"Alto {TH_HIGH}")
+    orden_med = df.groupby("departamento", observed=True)[SCORING_COL].median().sort_values(ascending=False).index.tolist()
+    df_ord = df.copy()
+    df_ord["departamento"] = pd.Categorical(df_ord["departamento"], categories=orden_med, ordered=True)
+    fig2 = px.box(df_ord, x="departamento", y=SCORING_COL, points="outliers", title="Boxplot por departamento")
+    return [fig, fig2]
+
+
+def _resumenes(cubo: CuboSegmentos) -> list:
+    resumen = resumen_distribucion(cubo, np.ones(cubo.shape, dtype=bool), -np.inf, np.inf)
+    return [figura_histograma(resumen["conteos"], TH_LOW, TH_HIGH), figura_caja(resumen["caja"])]
+
+
+def _medir(fn, repeat: int) -> tuple[float, int]:
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        size = sum(len(pio.to_json(f, validate=False)) for f in fn())
+        best = min(best, time.perf_counter() - t0)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: gráficos de distribución por filas vs desde resúmenes")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = joblib.load(ROOT / "artifacts" / "modeling" / "df_con_scoring.pkl")
+    rng = np.random.default_rng(0)
+    print(f"{'filas':>10} {'camino':<22} {'ms':>9} {'payload KB':>11}")
+    for n in args.rows:
+        df = base.iloc[rng.integers(0, len(base), n)][["departamento", "anos_compania", "satisfaccion_entorno"]].copy()
+        df[SCORING_COL] = rng.beta(1.2, 4.0, n)
+        t0 = time.perf_counter()
+        cubo = CuboSegmentos(df, SCORING_COL)
+        t_cubo = time.perf_counter() - t0
+        t, size = _medir(lambda: _filas(df), args.repeat)
+        print(f"{n:>10,} {'filas (px)':<22} {t * 1000:>9.1f} {size / 1024:>11,.0f}")
+        t, size = _medir(lambda: _resumenes(cubo), args.repeat)
+        print(f"{n:>10,} {'resúmenes del cubo':<22} {t * 1000:>9.1f} {size / 1024:>11,.0f}")
+        print(f"{n:>10,} {'cubo (1 vez por carga)':<22} {t_cubo * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Benchmark del entrenamiento en memoria (export_model_artifacts.py) frente al entrenamiento fuera de
+memoria (--externo, scripts/entrenamiento_externo.py): segundos, pico de RSS y probabilidades.
+
+Paridad (con el CSV del proyecto): el modelo fuera de memoria, con bloques pequeños (--bloque-paridad)
+para que haya varios row groups y cubetas, debe dar las mismas probabilidades en test que el pipeline
+en memoria, para cada modo de --smote. Se reportan también las diferencias de las medianas, media y
+escala del preprocessor (media y escala vienen de partial_fit: pueden diferir en el último bit).
+
+A escala: CSV sintéticos de --rows empleados (generador_empleados.py, escritos por bloques). Cada modo
+entrena en un proceso nuevo y reporta segundos, pico de RSS sobre el proceso tras las importaciones,
+AUPR en un test sintético de 50.000 empleados y la diferencia media y máxima de probabilidades con el
+modelo en memoria. Aquí las probabilidades no coinciden: el generador remuestrea empleados reales y hay
+miles de filas repetidas, así que SMOTE encuentra vecinos a la misma distancia y el último bit de la
+escala decide cuál elige (con el preprocessor de uno en ambos modos, el modelo es idéntico). La
+comparación a escala es de AUPR. El entrenamiento en memoria se mide hasta --max-memoria filas.
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_entrenamiento_externo.py
+  python benchmarks/bench_entrenamiento_externo.py --rows 100000 --filas-bloque 20000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from export_model_artifacts import MANIFEST_PATH, _build_pipeline, _default_classifier, _prepare_data  # noqa: E402
+from generador_empleados import CSV_NA_VALUES, CSV_SEP, generar_empleados, leer_base  # noqa: E402
+
+MODOS = ("memoria", "externo")
+FILAS_CSV = 250_000
+FILAS_TEST = 50_000
+SEMILLA_TEST = 999
+
+
+def _feature_columns() -> list[str]:
+    if not MANIFEST_PATH.exists():
+        return []
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f).get("feature_columns", [])
+
+
+def _entrenar(modo: str, csv_path: Path, filas_bloque: int, smote: str, directorio: Path):
+    """(preprocessor, pipeline) entrenados en memoria o fuera de memoria, como export_model_artifacts.py."""
+    from entrenamiento_externo import entrenar_externo
+
+    if modo == "externo":
+        r = entrenar_externo(csv_path, _feature_columns(), filas_bloque, smote, directorio=directorio,
+                             informar=lambda *_: None)
+        return r["preprocessor"], r["pipeline"]
+    data = _prepare_data(csv_path, _feature_columns())
+    train_y = data["train_y"]
+    clf = _default_classifier((train_y == 0).sum() / max((train_y == 1).sum(), 1))
+    pipeline = _build_pipeline(clf, smote, len(train_y)).fit(data["train_x_t"], train_y)
+    return data["preprocessor"], pipeline
+
+
+def paridad(filas_bloque: int, directorio: Path) -> bool:
+    """Probabilidades en test y estadísticas del preprocessor, en memoria vs fuera de memoria."""
+    csv_path = ROOT / "AbandonoEmpleados.csv"
+    test_x = _prepare_data(csv_path, _feature_columns())["test_x_t"]
+    print(f"Paridad con el CSV del proyecto (bloques de {filas_bloque} filas):")
+    ok = True
+    for smote in ("auto", "imblearn", "escalable"):
+        pre_m, pipe_m = _entrenar("memoria", csv_path, filas_bloque, smote, directorio)
+        pre_e, pipe_e = _entrenar("externo", csv_path, filas_bloque, smote, directorio)
+        num_m, num_e = pre_m.named_transformers_["num"], pre_e.named_transformers_["num"]
+        medianas = np.array_equal(num_m["impute"].statistics_, num_e["impute"].statistics_, equal_nan=True)
+        categorias = all(np.array_equal(a, b) for a, b in zip(pre_m.named_transformers_["cat"].categories_,
+                                                              pre_e.named_transformers_["cat"].categories_))
+        dif_media = np.abs(num_m["scale"].mean_ - num_e["scale"].mean_).max()
+        dif_escala = np.abs(num_m["scale"].scale_ / num_e["scale"].scale_ - 1).max()
+        dif_proba = np.abs(pipe_m.predict_proba(test_x)[:, 1] - pipe_e.predict_proba(test_x)[:, 1]).max()
+        dentro = bool(medianas and categorias and dif_proba < 1e-6)
+        ok &= dentro
+        print(f"  --smote {smote:<10} medianas {'=' if medianas else '≠'}, categorías {'=' if categorias else '≠'}, "
+              f"media {dif_media:.1e}, escala (rel.) {dif_escala:.1e}, probabilidades {dif_proba:.1e} "
+              f"{'ok' if dentro else 'DISTINTO'}")
+    return ok
+
+
+def csv_sintetico(n: int, ruta: Path, seed: int) -> Path:
+    """CSV de n empleados sintéticos, escrito por bloques (sin el DataFrame completo en memoria)."""
+    base = leer_base()
+    for i, inicio in enumerate(range(0, n, FILAS_CSV)):
+        m = min(FILAS_CSV, n - inicio)
+        df = generar_empleados(m, base, seed * 1000 + i).drop(columns=["_origen"])
+        df.index = df.index + inicio
+        df.to_csv(ruta, sep=CSV_SEP, na_rep=CSV_NA_VALUES, mode="w" if i == 0 else "a", header=i == 0)
+    return ruta
+
+
+def _status_mb(campo: str) -> float:
+    with open("/proc/self/status", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith(campo + ":"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _reiniciar_pico() -> float:
+    """Reinicia el pico de RSS del proceso (el de las importaciones lo ocultaría) y devuelve el RSS actual."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="utf-8") as f:
+            f.write("5")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return _status_mb("VmRSS")
+
+
+def _pico_mb() -> float:
+    return _status_mb("VmHWM")
+
+
+def _measure(modo: str, csv_path: Path, filas_bloque: int, test_path: Path, salida: Path):
+    """Se ejecuta en el subproceso: entrena, guarda las probabilidades del test en salida e imprime JSON."""
+    from sklearn.metrics import average_precision_score
+
+    from esquema import leer_csv
+    from features import construir_features, limpiar
+
+    rss0 = _reiniciar_pico()
+    t0 = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        pre, pipeline = _entrenar(modo, csv_path, filas_bloque, "auto", Path(tmp))
+    res = {"segundos": time.perf_counter() - t0, "pico_rss_mb": _pico_mb() - rss0}
+    test = construir_features(limpiar(leer_csv(test_path)))
+    proba = pipeline.predict_proba(pre.transform(test[list(pre.feature_names_in_)]))[:, 1]
+    np.save(salida, proba)
+    res["aupr"] = float(average_precision_score(test["abandono"], proba))
+    print(json.dumps(res))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: entrenamiento en memoria vs fuera de memoria")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--filas-bloque", type=int, default=100_000)
+    parser.add_argument("--max-memoria", type=int, default=1_000_000, help="Filas máximas del entrenamiento en memoria")
+    parser.add_argument("--bloque-paridad", type=int, default=200, help="Filas por bloque en la paridad con el CSV")
+    parser.add_argument("--dir", default=None, help="Directorio para los CSV sintéticos (default: temporal)")
+    parser.add_argument("--salida", default=None, help="JSON con los resultados")
+    parser.add_argument("--_measure", nargs=5, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args._measure:
+        modo, csv_path, filas_bloque, test_path, salida = args._measure
+        _measure(modo, Path(csv_path), int(filas_bloque), Path(test_path), Path(salida))
+        return
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        tmp = Path(tmp)
+        ok = paridad(args.bloque_paridad, tmp)
+        test_path = csv_sintetico(FILAS_TEST, tmp / "test.csv", SEMILLA_TEST)
+        resultados = []
+        print(f"\n{'filas':>11} {'modo':<8} {'s':>8} {'pico RSS MB':>12} {'AUPR':>8} {'dif. media':>11} {'dif. máx.':>10}")
+        for n in args.rows:
+            csv_path = csv_sintetico(n, tmp / f"empleados_{n}.csv", seed=n)
+            probas = {}
+            for modo in MODOS:
+                if modo == "memoria" and n > args.max_memoria:
+                    print(f"{n:>11,} {modo:<8} {'omitido (--max-memoria)':>41}")
+                    continue
+                salida = tmp / f"proba_{modo}.npy"
+                out = subprocess.run([sys.executable, "-W", "ignore", __file__, "--_measure", modo, str(csv_path),
+                                      str(args.filas_bloque), str(test_path), str(salida)],
+                                     capture_output=True, text=True, check=True)
+                r = json.loads(out.stdout.strip().splitlines()[-1])
+                probas[modo] = np.load(salida)
+                dif = None
+                if modo != "memoria" and "memoria" in probas:
+                    dif = np.abs(probas[modo] - probas["memoria"])
+                    r["dif_proba_media"], r["dif_proba_max"] = float(dif.mean()), float(dif.max())
+                print(f"{n:>11,} {modo:<8} {r['segundos']:>8.1f} {r['pico_rss_mb']:>12,.0f} {r['aupr']:>8.4f}"
+                      + ("" if dif is None else f" {dif.mean():>11.4f} {dif.max():>10.4f}"))
+                resultados.append({"filas": n, "modo": modo, **r})
+            csv_path.unlink()
+
+    if args.salida:
+        Path(args.salida).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"paridad_ok": ok, "filas_bloque": args.filas_bloque, "resultados": resultados}, f, indent=2)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark del motor de filtros por índices frente al filtrado por máscaras sucesivas
+(copia + .astype(str).isin(...) en cada llamada) de get_df_filtrado.
+
+Genera datasets sintéticos remuestreando df_con_scoring.pkl (scores aleatorios) y mide varios
+estados de filtros típicos del sidebar; comprueba que ambos caminos devuelven las mismas filas.
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_motor_filtros.py
+  python benchmarks/bench_motor_filtros.py --rows 100000 1000000 5000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "dashboard"))
+
+from common import SCORING_COL, _filtrar_motor, _filtrar_pandas  # noqa: E402
+from motor_filtros import MotorFiltros  # noqa: E402
+
+INF = float("inf")
+ESTADOS = {
+    "sin filtros": dict(departamentos=[], satisfaccion=[], anos_min=None, anos_max=None, score_desde=-INF, score_hasta=INF),
+    "rango años (sidebar)": dict(departamentos=[], satisfaccion=[], anos_min=0, anos_max=40, score_desde=-INF, score_hasta=INF),
+    "1 depto + alto": dict(departamentos=["Sales"], satisfaccion=[], anos_min=0, anos_max=40, score_desde=0.5, score_hasta=INF),
+    "todos los filtros": dict(departamentos=["Sales", "Human Resources"], satisfaccion=["Baja", "Media"],
+                              anos_min=2, anos_max=10, score_desde=0.3, score_hasta=0.5),
+}
+
+
+def _timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: motor de filtros vs máscaras sucesivas")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = joblib.load(ROOT / "artifacts" / "modeling" / "df_con_scoring.pkl")
+    rng = np.random.default_rng(0)
+    for n in args.rows:
+        df = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+        df[SCORING_COL] = rng.random(n).astype(np.float32)
+        t0 = time.perf_counter()
+        motor = MotorFiltros(df, rangos=("anos_compania", SCORING_COL))
+        t_build = time.perf_counter() - t0
+        print(f"\n{n:,} filas, {len(df.columns)} columnas (construcción del motor: {t_build * 1000:.0f} ms)")
+        print(f"  {'estado':<22} {'filas':>10} {'máscaras ms':>12} {'motor ms':>10} {'motor+4 cols ms':>16}")
+        for nombre, estado in ESTADOS.items():
+            ref = _filtrar_pandas(df, estado)
+            out = _filtrar_motor(motor, df, estado)
+            if not out.index.equals(ref.index):
+                print(f"ERROR: filas distintas en '{nombre}'", file=sys.stderr)
+                sys.exit(1)
+            t_old = _timeit(lambda: _filtrar_pandas(df, estado), args.repeat)
+            t_new = _timeit(lambda: _filtrar_motor(motor, df, estado), args.repeat)
+            t_proj = _timeit(lambda: _filtrar_motor(motor, df, estado, columns=[SCORING_COL, "departamento", "anos_compania", "satisfaccion_entorno"]), args.repeat)
+            print(f"  {nombre:<22} {len(ref):>10,} {t_old * 1000:>12.1f} {t_new * 1000:>10.1f} {t_proj * 1000:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark del scoring por lotes: throughput del modo de un proceso frente a --workers N.
+
+Replica AbandonoEmpleados.csv hasta --rows filas (ids renumerados) en una carpeta temporal,
+puntúa el archivo con 1, 2, 4, ... procesos y muestra filas/s y speedup por número de cores.
+También comprueba que la salida en paralelo conserva el orden de ids y los mismos scores.
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_score_batch.py --rows 1000000
+  python benchmarks/bench_score_batch.py --rows 200000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from score_batch import score_csv  # noqa: E402
+from scoring import CSV_NA_VALUES, CSV_SEP, INDEX_COL, SCORING_COL  # noqa: E402
+
+
+def build_csv(n_rows: int, dest: Path, src: Path = ROOT / "AbandonoEmpleados.csv") -> Path:
+    """Escribe un CSV de n_rows filas repitiendo las del original, con ids únicos."""
+    base = pd.read_csv(src, sep=CSV_SEP, na_values=CSV_NA_VALUES, keep_default_na=False, dtype=str)
+    block = 100_000
+    first = True
+    for start in range(0, n_rows, block):
+        size = min(block, n_rows - start)
+        part = base.iloc[np.arange(start, start + size) % len(base)].copy()
+        part[INDEX_COL] = np.arange(start + 1, start + size + 1)
+        part.to_csv(dest, sep=CSV_SEP, index=False, mode="w" if first else "a", header=first, na_rep=CSV_NA_VALUES)
+        first = False
+    return dest
+
+
+def default_workers() -> list[int]:
+    cpus = os.cpu_count() or 1
+    out, w = [], 1
+    while w < cpus:
+        out.append(w)
+        w *= 2
+    return out + [cpus]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de score_batch: 1 proceso vs --workers N")
+    parser.add_argument("--rows", type=int, default=200_000, help="Filas del CSV sintético")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="Lista de workers a medir")
+    args = parser.parse_args()
+    workers_list = args.workers or default_workers()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        csv_path = build_csv(args.rows, tmp / "input.csv")
+        print(f"CSV sintético: {args.rows:,} filas ({csv_path.stat().st_size / 1e6:.1f} MB)")
+        print(f"{'workers':>8} {'segundos':>10} {'filas/s':>12} {'speedup':>8}")
+        reference = None
+        base_time = None
+        for w in workers_list:
+            out_path = tmp / f"out_{w}.csv"
+            t0 = time.perf_counter()
+            n = score_csv(csv_path, out_path, args.chunksize, workers=w)
+            elapsed = time.perf_counter() - t0
+            base_time = base_time or elapsed
+            print(f"{w:>8} {elapsed:>10.2f} {n / elapsed:>12,.0f} {base_time / elapsed:>7.2f}x")
+            out = pd.read_csv(out_path, sep=CSV_SEP, index_col=INDEX_COL)
+            if reference is None:
+                reference = out
+            elif not (out.index.equals(reference.index)
+                      and np.allclose(out[SCORING_COL], reference[SCORING_COL], atol=1e-6)):
+                print(f"ERROR: la salida con workers={w} no coincide con la de workers={workers_list[0]}", file=sys.stderr)
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark de carga del dataset con scoring: pickle (joblib.load) frente al almacén columnar
+Arrow con memory map, completo y con proyección de columnas (las que usan los filtros).
+
+Cada medición corre en un proceso nuevo y reporta tiempo de carga e incremento de RSS.
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_scoring_store.py --rows 1000000
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT / "dashboard"))
+
+MODES = ("pickle", "arrow", "arrow_proyectado")
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _measure(mode: str, path: str):
+    """Se ejecuta en el subproceso: carga según mode e imprime JSON con segundos y MB."""
+    from almacen_scoring import read_scoring_store
+    from common import FILTER_COLUMNS
+
+    rss0 = _rss_mb()
+    t0 = time.perf_counter()
+    if mode == "pickle":
+        df = joblib.load(path)
+    elif mode == "arrow":
+        df = read_scoring_store(Path(path))
+    else:
+        df = read_scoring_store(Path(path), FILTER_COLUMNS)
+    elapsed = time.perf_counter() - t0
+    print(json.dumps({"seconds": elapsed, "rss_mb": _rss_mb() - rss0, "columns": len(df.columns)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga: pickle vs Arrow memory-mapped")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--_measure", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args._measure:
+        _measure(*args._measure)
+        return
+
+    from scoring import write_scoring_store
+
+    base = joblib.load(ROOT / "artifacts" / "modeling" / "df_con_scoring.pkl")
+    df = base.iloc[np.arange(args.rows) % len(base)].copy()
+    df.index = np.arange(1, args.rows + 1)
+    df.index.name = base.index.name
+    with tempfile.TemporaryDirectory() as tmp:
+        pkl = Path(tmp) / "df.pkl"
+        store = Path(tmp) / "df.feather"
+        joblib.dump(df, pkl)
+        write_scoring_store(df, store)
+        del df
+        print(f"{args.rows:,} filas: pickle {pkl.stat().st_size / 1e6:.1f} MB, arrow {store.stat().st_size / 1e6:.1f} MB")
+        print(f"{'modo':<18} {'segundos':>9} {'ΔRSS MB':>9} {'columnas':>9}")
+        for mode in MODES:
+            path = pkl if mode == "pickle" else store
+            out = subprocess.run([sys.executable, "-W", "ignore", __file__, "--_measure", mode, str(path)],
+                                 capture_output=True, text=True, check=True)
+            res = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{mode:<18} {res['seconds']:>9.3f} {res['rss_mb']:>9.1f} {res['columns']:>9}")
+
+
+if __name__ == "__main__":
+    main()
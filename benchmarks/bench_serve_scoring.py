@@ -0,0 +1,117 @@
+"""
+Benchmark del servicio de scoring (scripts/serve_scoring.py): latencia p50/p99 y peticiones/s
+con N clientes concurrentes enviando un empleado por petición (como hace el HRIS).
+
+Si no se indica --url, arranca el servidor en un subproceso con los parámetros de micro-batching dados.
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_serve_scoring.py --concurrency 32 --requests 2000
+  python benchmarks/bench_serve_scoring.py --max-batch-size 1 --max-wait-ms 0   # sin micro-batching
+"""
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from scoring import CSV_NA_VALUES, CSV_SEP, INDEX_COL  # noqa: E402
+
+
+def _post(url: str, body: bytes) -> float:
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    t0 = time.perf_counter()
+    with urllib.request.urlopen(req) as resp:
+        resp.read()
+    return time.perf_counter() - t0
+
+
+def _wait_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + "/health") as resp:
+                if resp.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("El servidor no respondió a /health")
+
+
+def run(base_url: str, payloads: list[bytes], concurrency: int, n_requests: int) -> dict:
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(n_requests))
+
+    def client():
+        local = []
+        for i in counter:
+            local.append(_post(base_url + "/predict", payloads[i % len(payloads)]))
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    lat_ms = np.array(latencies) * 1000
+    return {
+        "requests": len(lat_ms),
+        "req_per_s": len(lat_ms) / elapsed,
+        "p50_ms": float(np.percentile(lat_ms, 50)),
+        "p99_ms": float(np.percentile(lat_ms, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de latencia/throughput de serve_scoring.py")
+    parser.add_argument("--url", default=None, help="URL base de un servidor ya arrancado (ej. http://127.0.0.1:8000)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    df = pd.read_csv(ROOT / "AbandonoEmpleados.csv", sep=CSV_SEP, index_col=INDEX_COL, na_values=CSV_NA_VALUES)
+    df = df.astype(object).where(df.notna(), None)
+    payloads = [json.dumps(r).encode("utf-8") for r in df.to_dict(orient="records")]
+
+    proc = None
+    base_url = args.url
+    if base_url is None:
+        base_url = f"http://127.0.0.1:{args.port}"
+        proc = subprocess.Popen([
+            sys.executable, str(ROOT / "scripts" / "serve_scoring.py"), "--port", str(args.port),
+            "--max-batch-size", str(args.max_batch_size), "--max-wait-ms", str(args.max_wait_ms),
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_ready(base_url)
+        run(base_url, payloads, args.concurrency, min(200, args.requests))  # calentamiento
+        res = run(base_url, payloads, args.concurrency, args.requests)
+        with urllib.request.urlopen(base_url + "/health") as resp:
+            health = json.loads(resp.read())
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    print(f"Concurrencia {args.concurrency}, lote ≤ {args.max_batch_size}, espera ≤ {args.max_wait_ms} ms")
+    print(f"  {res['requests']:,} peticiones, {res['req_per_s']:,.0f} req/s, "
+          f"p50 {res['p50_ms']:.1f} ms, p99 {res['p99_ms']:.1f} ms")
+    if health.get("batches"):
+        print(f"  tamaño medio de lote: {health['rows'] / health['batches']:.1f} filas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Benchmark del sobremuestreo del entrenamiento: imblearn.SMOTE (vecinos exactos con NearestNeighbors)
+frente a SMOTEEscalable (scripts/smote_escalable.py) con vecinos exactos por bloques, con índice
+aproximado (ivf) y en float32, a 100k, 1M y 5M filas de entrenamiento.
+
+Paridad (con el CSV del proyecto, split de export_model_artifacts.py): XGBoost por defecto entrenado
+tras cada sampler, AUPR medio en test sobre --semillas valores de random_state frente al de
+imblearn.SMOTE (tolerancia --tol-aupr). Con 71 positivos en test, una sola semilla varía ±0.015 de AUPR
+solo por el sorteo de SMOTE: se compara la media. El ivf se fuerza con listas pequeñas (--lista-paridad)
+para que la búsqueda sea realmente aproximada. A escala, el AUPR de cada sampler también se compara con
+el de imblearn.SMOTE en las filas donde se mide.
+
+A escala: matrices preprocesadas de empleados sintéticos (generador_empleados.py), transformadas por
+bloques con el preprocessor del proyecto. Por sampler: segundos y pico de memoria de fit_resample
+(tracemalloc: entrada convertida, vecinos y salida), recall@k de los vecinos ivf frente a los exactos
+(sobre --consultas-recall filas minoritarias) y, hasta --max-fit filas, AUPR en un test sintético.
+imblearn.SMOTE se mide hasta --max-imblearn filas y float64 hasta --max-float64 (memoria).
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_smote_escalable.py
+  python benchmarks/bench_smote_escalable.py --rows 100000 1000000 --max-fit 0
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import average_precision_score
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from export_model_artifacts import MANIFEST_PATH, _default_classifier, _prepare_data  # noqa: E402
+from features import construir_features, limpiar  # noqa: E402
+from generador_empleados import generar_empleados, leer_base  # noqa: E402
+from model_search import SMOTE_PARAMS  # noqa: E402
+from smote_escalable import MAX_ELEMENTOS_BLOQUE, SMOTEEscalable, vecinos_ivf  # noqa: E402
+
+FILAS_BLOQUE = 250_000
+
+
+def _samplers(lista_ivf: int | None = None, random_state: int = SMOTE_PARAMS["random_state"]) -> dict:
+    from imblearn.over_sampling import SMOTE
+
+    params = {**SMOTE_PARAMS, "random_state": random_state}
+    ivf = {"algoritmo": "ivf"} if lista_ivf is None else {"algoritmo": "ivf", "tamano_lista": lista_ivf}
+    return {
+        "imblearn.SMOTE": lambda: SMOTE(**params),
+        "escalable exacto": lambda: SMOTEEscalable(**params, algoritmo="exacto"),
+        "escalable ivf": lambda: SMOTEEscalable(**params, **ivf),
+        "escalable ivf float32": lambda: SMOTEEscalable(**params, **ivf, float32=True),
+    }
+
+
+def _aupr(X_res, y_res, X_test, y_test) -> float:
+    spw = (y_res == 0).sum() / max((y_res == 1).sum(), 1)
+    clf = _default_classifier(spw).fit(X_res, y_res)
+    return float(average_precision_score(y_test, clf.predict_proba(X_test)[:, 1]))
+
+
+def _medir(sampler, X, y) -> tuple[float, float, tuple]:
+    """(segundos, pico MB, (X_res, y_res)) de fit_resample."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    res = sampler.fit_resample(X, y)
+    segundos = time.perf_counter() - t0
+    pico = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return segundos, pico, res
+
+
+def paridad(data: dict, lista_ivf: int, tol: float, semillas: int) -> bool:
+    """AUPR medio en test sobre semillas random_state de SMOTE, frente al medio de imblearn.SMOTE."""
+    X, y = data["train_x_t"], data["train_y"]
+    print(f"Paridad con el CSV del proyecto ({len(y):,} filas de entrenamiento, AUPR en test, media de "
+          f"{semillas} semillas; tolerancia {tol}):")
+    auprs: dict[str, list[float]] = {}
+    for semilla in range(semillas):
+        for nombre, crear in _samplers(lista_ivf, semilla).items():
+            X_res, y_res = crear().fit_resample(X, y)
+            auprs.setdefault(nombre, []).append(_aupr(X_res, y_res, data["test_x_t"], data["test_y"]))
+    referencia, ok = None, True
+    for nombre, valores in auprs.items():
+        media = float(np.mean(valores))
+        referencia = media if referencia is None else referencia
+        dentro = abs(media - referencia) <= tol
+        ok &= dentro
+        print(f"  {nombre:<24} AUPR {media:.4f} ± {np.std(valores):.4f} (dif. {media - referencia:+.4f}) "
+              f"{'ok' if dentro else 'FUERA DE TOLERANCIA'}")
+    return ok
+
+
+def matriz_sintetica(n: int, preprocessor, seed: int, dtype) -> tuple[np.ndarray, np.ndarray]:
+    """n empleados sintéticos preprocesados por bloques en una matriz dtype (sin el DataFrame completo)."""
+    base = leer_base()
+    columnas = list(preprocessor.feature_names_in_)
+    X, y = None, np.empty(n, dtype=np.int64)
+    for i, inicio in enumerate(range(0, n, FILAS_BLOQUE)):
+        m = min(FILAS_BLOQUE, n - inicio)
+        df = construir_features(limpiar(generar_empleados(m, base, seed * 1000 + i).drop(columns=["_origen"])))
+        bloque = preprocessor.transform(df[columnas])
+        if X is None:
+            X = np.empty((n, bloque.shape[1]), dtype=dtype)
+        X[inicio:inicio + m] = bloque
+        y[inicio:inicio + m] = df["abandono"].to_numpy()
+    return X, y
+
+
+def recall_ivf(X_min: np.ndarray, k: int, consultas: int) -> float:
+    """Fracción de los k vecinos exactos que encuentra el ivf, sobre las primeras consultas filas."""
+    ivf = vecinos_ivf(X_min, k, rng=np.random.RandomState(SMOTE_PARAMS["random_state"]))
+    normas = np.einsum("ij,ij->i", X_min, X_min)
+    filas_bloque = max(1, MAX_ELEMENTOS_BLOQUE // len(X_min))
+    aciertos = []
+    for inicio in range(0, consultas, filas_bloque):
+        fin = min(inicio + filas_bloque, consultas)
+        d = normas[np.newaxis, :] - 2.0 * (X_min[inicio:fin] @ X_min.T)
+        d[np.arange(fin - inicio), np.arange(inicio, fin)] = -np.inf
+        exactos = np.argpartition(d, k, axis=1)[:, 1:k + 1]
+        # Con empates de distancia cuenta como acierto cualquier vecino a la distancia del k-ésimo exacto
+        radio = np.take_along_axis(d, exactos, axis=1).max(axis=1, keepdims=True)
+        aciertos.append(np.take_along_axis(d, ivf[inicio:fin], axis=1) <= radio + 1e-4 * np.abs(radio))
+    return float(np.concatenate(aciertos).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: imblearn.SMOTE vs SMOTEEscalable (tiempo, memoria, AUPR)")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--max-imblearn", type=int, default=1_000_000, help="Filas máximas para imblearn.SMOTE")
+    parser.add_argument("--max-float64", type=int, default=1_000_000, help="Filas máximas de los samplers en float64")
+    parser.add_argument("--max-fit", type=int, default=1_000_000, help="Filas máximas para entrenar y medir AUPR (0: no)")
+    parser.add_argument("--consultas-recall", type=int, default=2000)
+    parser.add_argument("--lista-paridad", type=int, default=32, help="tamano_lista del ivf en la paridad con el CSV")
+    parser.add_argument("--tol-aupr", type=float, default=0.01)
+    parser.add_argument("--semillas", type=int, default=10, help="Semillas de SMOTE en la paridad con el CSV")
+    parser.add_argument("--salida", default=None, help="JSON con los resultados")
+    args = parser.parse_args()
+
+    feature_columns = []
+    if MANIFEST_PATH.exists():
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            feature_columns = json.load(f).get("feature_columns", [])
+    data = _prepare_data(ROOT / "AbandonoEmpleados.csv", feature_columns)
+    ok = paridad(data, args.lista_paridad, args.tol_aupr, args.semillas)
+
+    preprocessor = data["preprocessor"]
+    X_test, y_test = matriz_sintetica(50_000, preprocessor, seed=999, dtype=np.float32)
+    resultados = []
+    print(f"\n{'filas':>11} {'sampler':<24} {'s':>8} {'pico MB':>9} {'generadas':>11} {'AUPR':>8}")
+    for n in args.rows:
+        dtype = np.float64 if n <= args.max_float64 else np.float32
+        X, y = matriz_sintetica(n, preprocessor, seed=n, dtype=dtype)
+        referencia = None
+        for nombre, crear in _samplers().items():
+            if nombre == "imblearn.SMOTE" and n > args.max_imblearn:
+                print(f"{n:>11,} {nombre:<24} {'omitido (--max-imblearn)':>41}")
+                continue
+            if dtype == np.float32 and "float32" not in nombre:
+                print(f"{n:>11,} {nombre:<24} {'omitido (--max-float64)':>41}")
+                continue
+            segundos, pico, (X_res, y_res) = _medir(crear(), X, y)
+            aupr = _aupr(X_res, y_res, X_test, y_test) if n <= args.max_fit else None
+            generadas = len(y_res) - len(y)
+            del X_res, y_res
+            nota = ""
+            if aupr is not None:
+                referencia = aupr if nombre == "imblearn.SMOTE" else referencia
+                if referencia is not None and abs(aupr - referencia) > args.tol_aupr:
+                    ok, nota = False, " FUERA DE TOLERANCIA"
+            print(f"{n:>11,} {nombre:<24} {segundos:>8.2f} {pico:>9,.0f} {generadas:>11,} "
+                  f"{aupr if aupr is not None else float('nan'):>8.4f}{nota}")
+            resultados.append({"filas": n, "sampler": nombre, "segundos": segundos, "pico_mb": pico,
+                               "generadas": generadas, "aupr": aupr})
+        k = SMOTE_PARAMS["k_neighbors"]
+        X_min = np.ascontiguousarray(X[y == 1], dtype=np.float32)
+        recall = recall_ivf(X_min, k, min(args.consultas_recall, len(X_min)))
+        print(f"{n:>11,} recall@{k} ivf vs exacto: {recall:.3f} ({len(X_min):,} filas minoritarias)")
+        resultados.append({"filas": n, "sampler": "recall ivf", "recall": recall})
+        del X, y, X_min
+
+    if args.salida:
+        Path(args.salida).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"paridad_ok": ok, "resultados": resultados}, f, indent=2)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark del one-hot denso frente al CSR (export_model_artifacts.py --sparse) en el recorrido
+de entrenamiento y scoring: preprocessor, SMOTE, fit de XGBoost y predict_proba.
+
+Las filas de AbandonoEmpleados.csv se replican hasta --rows y, para cada factor de
+--cardinality-factors, cada categórica se multiplica en niveles (p. ej. factor 100: "Sales" pasa a
+"Sales_0" ... "Sales_99"), simulando centros de coste o puestos de un HRIS real. Cada combinación
+corre en un proceso nuevo y reporta segundos por etapa, MB de la matriz de train y pico de RSS.
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_sparse_onehot.py
+  python benchmarks/bench_sparse_onehot.py --rows 50000 --cardinality-factors 1 10 100
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+MODES = ("denso", "sparse")
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _matrix_mb(X) -> float:
+    if hasattr(X, "indptr"):
+        return (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / 1024 ** 2
+    return X.nbytes / 1024 ** 2
+
+
+def _synthetic(rows: int, factor: int, seed: int = 42) -> tuple[pd.DataFrame, np.ndarray, list[str], list[str]]:
+    """X con las columnas de feature_columns (categóricas con factor veces más niveles) e y."""
+    from features import construir_features, limpiar
+    from scoring import CSV_NA_VALUES, CSV_SEP, INDEX_COL, load_manifest
+
+    base = pd.read_csv(ROOT / "AbandonoEmpleados.csv", sep=CSV_SEP, index_col=INDEX_COL, na_values=CSV_NA_VALUES)
+    base = construir_features(limpiar(base))
+    df = base.iloc[np.arange(rows) % len(base)].reset_index(drop=True)
+    columns = [c for c in load_manifest().get("feature_columns", []) if c in df.columns]
+    X = df[columns].dropna(axis=1, how="all")
+    num_cols = [c for c in X.columns if X[c].dtype in (np.int64, np.float64)]
+    cat_cols = [c for c in X.columns if c not in num_cols]
+    rng = np.random.default_rng(seed)
+    if factor > 1:
+        for c in cat_cols:
+            sufijo = pd.Series(rng.integers(0, factor, rows).astype(str), index=X.index)
+            X[c] = (X[c].astype(object) + "_" + sufijo).where(X[c].notna())
+    return X[num_cols + cat_cols], df["abandono"].astype(int).to_numpy(), num_cols, cat_cols
+
+
+def _measure(mode: str, rows: int, factor: int):
+    """Se ejecuta en el subproceso: entrena y puntúa en el modo indicado e imprime JSON."""
+    from imblearn.over_sampling import SMOTE
+    from sklearn.metrics import average_precision_score
+    from sklearn.model_selection import train_test_split
+    from xgboost import XGBClassifier
+
+    from export_model_artifacts import RANDOM_STATE, TEST_SIZE, _build_preprocessor
+    from model_search import SMOTE_PARAMS
+
+    X, y, num_cols, cat_cols = _synthetic(rows, factor)
+    train_x, test_x, train_y, test_y = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    rss0 = _rss_mb()
+    res = {}
+
+    t0 = time.perf_counter()
+    pre = _build_preprocessor(num_cols, cat_cols, sparse=mode == "sparse")
+    X_tr = pre.fit_transform(train_x)
+    res["preprocess_s"] = time.perf_counter() - t0
+    res["n_features"] = X_tr.shape[1]
+    res["matrix_mb"] = _matrix_mb(X_tr)
+
+    t0 = time.perf_counter()
+    X_res, y_res = SMOTE(**SMOTE_PARAMS).fit_resample(X_tr, train_y)
+    res["smote_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    spw = (train_y == 0).sum() / max((train_y == 1).sum(), 1)
+    clf = XGBClassifier(scale_pos_weight=spw, random_state=42, eval_metric="logloss",
+                        n_estimators=50, max_depth=5, learning_rate=0.1, n_jobs=1).fit(X_res, y_res)
+    res["fit_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    proba = clf.predict_proba(pre.transform(test_x))[:, 1]
+    res["score_s"] = time.perf_counter() - t0
+    res["aupr"] = float(average_precision_score(test_y, proba))
+    res["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - rss0
+    print(json.dumps(res))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: one-hot denso vs CSR en entrenamiento y scoring")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--cardinality-factors", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--_measure", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args._measure:
+        mode, rows, factor = args._measure
+        _measure(mode, int(rows), int(factor))
+        return
+
+    print(f"{args.rows:,} filas (70% train)")
+    print(f"{'factor':>6} {'modo':<7} {'columnas':>9} {'matriz MB':>10} {'prepro s':>9} {'smote s':>8} "
+          f"{'fit s':>7} {'score s':>8} {'pico RSS MB':>12} {'AUPR':>6}")
+    for factor in args.cardinality_factors:
+        for mode in MODES:
+            out = subprocess.run([sys.executable, "-W", "ignore", __file__, "--_measure", mode, str(args.rows), str(factor)],
+                                 capture_output=True, text=True, check=True)
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{factor:>6} {mode:<7} {r['n_features']:>9,} {r['matrix_mb']:>10.1f} {r['preprocess_s']:>9.2f} "
+                  f"{r['smote_s']:>8.2f} {r['fit_s']:>7.2f} {r['score_s']:>8.2f} {r['peak_rss_mb']:>12.1f} {r['aupr']:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Suite de benchmarks de los caminos calientes a escala, con datos sintéticos (generador_empleados.py).
+
+Para cada tamaño de --rows (default 10k, 100k, 1M y 5M empleados) genera el dataset, lo escribe como
+CSV con el formato de AbandonoEmpleados.csv y mide:
+  - ingesta: read_csv del CSV (tipos inferidos y con el esquema de esquema.py) y limpieza + features
+  - filtrado (sobre el dataset con los tipos del almacén): lo que hace common.get_df_filtrado sin la caché de filtros (motor de índices y, como
+    referencia, la ruta pandas de respaldo)
+  - agregados de las páginas: cubo de segmentos (construcción y KPIs), resumen de distribución y
+    optimizador de umbrales
+  - tabla de "Scoring y datos" (TablaScoring, que reemplazó a _prepare_scoring_table): índices y página
+  - scoring: preprocessor + predict_proba por bloques, con el pipeline .pkl y con el modelo compilado
+  - entrenamiento: _prepare_data + SMOTE (el que elige --smote auto) + XGBoost por defecto de export_model_artifacts.py
+
+Las etapas caras tienen un máximo de filas (--max-scoring, --max-entrenamiento, --max-pandas); por
+encima se anotan como omitidas. Los resultados se escriben como JSON (meta con commit, fecha y
+versiones; una entrada por etapa y tamaño con segundos y filas/s) para comparar ejecuciones entre
+commits con --comparar. No escribe en artifacts/modeling.
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_suite.py
+  python benchmarks/bench_suite.py --rows 10000 100000 --salida /tmp/antes.json
+  python benchmarks/bench_suite.py --rows 10000 100000 --comparar /tmp/antes.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "dashboard"))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from esquema import esquema_almacen  # noqa: E402
+from generador_empleados import SCORING_COL, con_scoring, escribir_csv, generar_empleados, leer_base  # noqa: E402
+
+RESULTADOS_DIR = ROOT / "benchmarks" / "resultados"
+CHUNKSIZE = 100_000
+# Estado de filtros típico del sidebar: dos departamentos, banda alta y hasta 20 años en la compañía
+ESTADO_FILTROS = {
+    "departamentos": ["Research & Development", "Sales"],
+    "satisfaccion": [],
+    "anos_min": 0,
+    "anos_max": 20,
+    "score_desde": 0.5,
+    "score_hasta": float("inf"),
+}
+
+
+class Suite:
+    """Acumula las mediciones y las vuelca a JSON tras cada etapa (un fallo a 5M no pierde lo anterior)."""
+
+    def __init__(self, salida: Path, repeat: int, meta: dict):
+        self.salida = salida
+        self.repeat = repeat
+        self.resultados: list[dict] = []
+        self.meta = meta
+
+    def medir(self, etapa: str, filas: int, fn, repeat: int | None = None, detalle: str | None = None):
+        """Mejor tiempo de repeat llamadas a fn (1 para las etapas caras); devuelve lo que devuelve fn."""
+        mejor, out = float("inf"), None
+        for _ in range(repeat or self.repeat):
+            out = None
+            gc.collect()
+            t0 = time.perf_counter()
+            out = fn()
+            mejor = min(mejor, time.perf_counter() - t0)
+        self._anotar({"etapa": etapa, "filas": filas, "segundos": mejor, "filas_por_s": filas / mejor if mejor > 0 else None,
+                      "detalle": detalle})
+        print(f"{filas:>11,} {etapa:<50} {mejor * 1000:>12.1f} ms")
+        return out
+
+    def omitir(self, etapa: str, filas: int, motivo: str) -> None:
+        self._anotar({"etapa": etapa, "filas": filas, "segundos": None, "filas_por_s": None, "detalle": motivo})
+        print(f"{filas:>11,} {etapa:<50} {'omitida':>15}  ({motivo})")
+
+    def _anotar(self, resultado: dict) -> None:
+        self.resultados.append(resultado)
+        self.salida.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.salida, "w", encoding="utf-8") as f:
+            json.dump({"meta": self.meta, "resultados": self.resultados}, f, indent=2, ensure_ascii=False)
+
+
+def _git(*args: str) -> str | None:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _meta() -> dict:
+    import sklearn
+    import xgboost
+
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "cambios_sin_commit": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "xgboost": xgboost.__version__,
+        "cpus": os.cpu_count(),
+        "plataforma": platform.platform(),
+    }
+
+
+def _ingesta(suite: Suite, n: int, csv_path: Path):
+    from esquema import leer_csv
+    from features import construir_features, limpiar
+
+    suite.medir("ingesta: read_csv (tipos inferidos)", n, lambda: leer_base(csv_path), repeat=1)
+    raw = suite.medir("ingesta: leer_csv (esquema)", n, lambda: leer_csv(csv_path), repeat=1)
+    suite.medir("ingesta: limpieza + features", n, lambda: construir_features(limpiar(raw)), repeat=1)
+
+
+def _dashboard(suite: Suite, n: int, df: pd.DataFrame, max_pandas: int):
+    from common import _filtrar_motor, _filtrar_pandas
+    from cubo_segmentos import CuboSegmentos
+    from graficos_distribucion import resumen_distribucion
+    from motor_filtros import MotorFiltros
+    from optimizador_umbrales import OptimizadorUmbrales
+    from tabla_scoring import TablaScoring
+
+    estado = ESTADO_FILTROS
+    motor = suite.medir("filtrado: índices del motor (1 vez)", n,
+                        lambda: MotorFiltros(df, rangos=("anos_compania", SCORING_COL)), repeat=1)
+    filtrado = suite.medir("filtrado: get_df_filtrado (motor)", n, lambda: _filtrar_motor(motor, df, estado))
+    if n <= max_pandas:
+        suite.medir("filtrado: get_df_filtrado (pandas)", n, lambda: _filtrar_pandas(df, estado))
+    else:
+        suite.omitir("filtrado: get_df_filtrado (pandas)", n, f"más de --max-pandas={max_pandas:,} filas")
+
+    cubo = suite.medir("páginas: cubo de segmentos (1 vez)", n, lambda: CuboSegmentos(df, SCORING_COL), repeat=1)
+
+    def kpis():
+        mascara = cubo.mascara(departamentos=estado["departamentos"], anos_min=estado["anos_min"], anos_max=estado["anos_max"])
+        total, alto = cubo.contar(), cubo.contar(estado["score_desde"])
+        return (cubo.por_dimension(alto, mascara, "departamento"), cubo.por_dimension(total, mascara, "departamento"),
+                cubo.por_rango_anos(alto, mascara), cubo.por_dimension(alto, mascara, "satisfaccion_entorno"))
+
+    suite.medir("páginas: KPIs y segmentos desde el cubo", n, kpis)
+    mascara = cubo.mascara(departamentos=estado["departamentos"])
+    suite.medir("páginas: resumen de distribución", n, lambda: resumen_distribucion(cubo, mascara, 0.5, float("inf")))
+    optimizador = suite.medir("páginas: optimizador de umbrales (1 vez)", n,
+                              lambda: OptimizadorUmbrales(df, SCORING_COL), repeat=1)
+    suite.medir("páginas: umbrales óptimos", n, optimizador.optimizar)
+
+    tabla = suite.medir("tabla: índices de TablaScoring (1 vez)", n, lambda: TablaScoring(df, SCORING_COL), repeat=1)
+    filas = df.index.get_indexer(filtrado.index)
+
+    def pagina():
+        posiciones = tabla.ordenar(tabla.mascara(filas, 0.3), "scoring", True)
+        return tabla.pagina(df, posiciones, 0, 50, 0.3, 0.5)
+
+    suite.medir("tabla: página de 50 candidatos", n, pagina)
+
+
+def _scoring(suite: Suite, n: int, raw: pd.DataFrame):
+    from scoring import ARTIFACTS, input_columns, load_artifacts, load_manifest, score_frame
+
+    def por_bloques(pre, model):
+        return np.concatenate([score_frame(pre, model, raw.iloc[s:s + CHUNKSIZE], columns)
+                               for s in range(0, len(raw), CHUNKSIZE)])
+
+    pre, model = load_artifacts(ARTIFACTS)
+    columns = input_columns(pre, load_manifest(ARTIFACTS))
+    suite.medir("scoring: preprocessor + predict_proba (pkl)", n, lambda: por_bloques(pre, model), repeat=1)
+    pre_c, model_c = load_artifacts(ARTIFACTS, compiled=True)
+    if type(model_c) is type(model):
+        suite.omitir("scoring: preprocessor + predict_proba (compilado)", n, "no hay modelo compilado vigente")
+    else:
+        suite.medir("scoring: preprocessor + predict_proba (compilado)", n, lambda: por_bloques(pre_c, model_c), repeat=1)
+
+
+def _entrenamiento(suite: Suite, n: int, csv_path: Path):
+    from export_model_artifacts import MANIFEST_PATH, _build_pipeline, _default_classifier, _prepare_data
+
+    feature_columns = []
+    if MANIFEST_PATH.exists():
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            feature_columns = json.load(f).get("feature_columns", [])
+    data = suite.medir("entrenamiento: lectura + split + preprocessor", n,
+                       lambda: _prepare_data(csv_path, feature_columns), repeat=1)
+    train_y = data["train_y"]
+    scale_pos_weight = (train_y == 0).sum() / max((train_y == 1).sum(), 1)
+    pipeline = _build_pipeline(_default_classifier(scale_pos_weight), n_filas=len(train_y))
+    suite.medir("entrenamiento: SMOTE + XGBoost (fit)", n, lambda: pipeline.fit(data["train_x_t"], train_y), repeat=1)
+
+
+def comparar(actual: dict, previo: dict) -> None:
+    """Tabla por (etapa, filas) con el tiempo de cada ejecución y el cociente actual / previo."""
+    antes = {(r["etapa"], r["filas"]): r["segundos"] for r in previo["resultados"]}
+    print(f"\nComparación con {previo['meta'].get('commit')} ({previo['meta'].get('fecha')}):")
+    print(f"{'filas':>11} {'etapa':<50} {'previo ms':>12} {'actual ms':>12} {'actual/previo':>14}")
+    for r in actual["resultados"]:
+        t_antes = antes.get((r["etapa"], r["filas"]))
+        if t_antes is None or r["segundos"] is None:
+            continue
+        print(f"{r['filas']:>11,} {r['etapa']:<50} {t_antes * 1000:>12.1f} {r['segundos'] * 1000:>12.1f} "
+              f"{r['segundos'] / t_antes:>13.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks a escala con datos sintéticos")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--etapas", nargs="+", default=["ingesta", "dashboard", "scoring", "entrenamiento"],
+                        choices=["ingesta", "dashboard", "scoring", "entrenamiento"])
+    parser.add_argument("--max-pandas", type=int, default=1_000_000, help="Filas máximas para el filtrado pandas")
+    parser.add_argument("--max-scoring", type=int, default=1_000_000, help="Filas máximas para el scoring")
+    parser.add_argument("--max-entrenamiento", type=int, default=100_000, help="Filas máximas para el entrenamiento")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones de las etapas rápidas (se guarda la mejor)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--salida", default=None,
+                        help="JSON de resultados (default: benchmarks/resultados/<fecha>_<commit>.json)")
+    parser.add_argument("--comparar", default=None, help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+
+    meta = _meta()
+    salida = Path(args.salida) if args.salida else (
+        RESULTADOS_DIR / f"{datetime.now():%Y%m%d_%H%M%S}_{meta['commit'] or 'sin_git'}.json")
+    suite = Suite(salida, args.repeat, meta)
+    base = leer_base()
+    print(f"{'filas':>11} {'etapa':<50} {'tiempo':>15}")
+    with tempfile.TemporaryDirectory(prefix="bench_suite_") as tmp:
+        for n in args.rows:
+            raw = generar_empleados(n, base, args.seed)
+            csv_path = escribir_csv(raw, Path(tmp) / f"empleados_{n}.csv")
+            if "ingesta" in args.etapas:
+                _ingesta(suite, n, csv_path)
+            if "dashboard" in args.etapas:
+                _dashboard(suite, n, esquema_almacen(con_scoring(raw, args.seed)), args.max_pandas)
+            if "scoring" in args.etapas:
+                if n <= args.max_scoring:
+                    _scoring(suite, n, raw.drop(columns=["_origen", "abandono"]))
+                else:
+                    suite.omitir("scoring: preprocessor + predict_proba", n, f"más de --max-scoring={args.max_scoring:,} filas")
+            if "entrenamiento" in args.etapas:
+                if n <= args.max_entrenamiento:
+                    _entrenamiento(suite, n, csv_path)
+                else:
+                    suite.omitir("entrenamiento: SMOTE + XGBoost (fit)", n,
+                                 f"más de --max-entrenamiento={args.max_entrenamiento:,} filas")
+            del raw
+            csv_path.unlink()
+            gc.collect()
+    print(f"\nResultados: {salida}")
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            comparar({"meta": suite.meta, "resultados": suite.resultados}, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark de la tabla de "Scoring y datos": tabla completa estilada (preparar, Styler sobre todas
+las filas y serialización como la hace st.dataframe) frente a la tabla paginada de tabla_scoring.py
+(máscara + orden precomputado + solo la página visible).
+
+Genera datasets sintéticos remuestreando df_con_scoring.pkl con todos los empleados como candidatos
+(scoring entre 0,3 y 1, sin abandono), de modo que --rows es el número de candidatos. La tabla
+completa solo se mide hasta --max-completa filas (más allá tarda minutos y necesita varios GB).
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_tabla_scoring.py
+  python benchmarks/bench_tabla_scoring.py --rows 10000 100000 1000000 --page-size 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "dashboard"))
+
+from tabla_scoring import TablaScoring, columnas_tabla  # noqa: E402
+
+SCORING_COL = "scoring_abandono"
+TH_LOW, TH_HIGH = 0.3, 0.5
+
+
+def _estilo(df: pd.DataFrame) -> pd.DataFrame:
+    colors = np.where(df["banda"] == "Alto", "background-color: #ffcccc",
+                      np.where(df["banda"] == "Medio", "background-color: #fffacd", ""))
+    return pd.DataFrame(np.tile(colors[:, np.newaxis], (1, len(df.columns))), index=df.index, columns=df.columns)
+
+
+def _serializar(df: pd.DataFrame) -> int:
+    """Lo que hace st.dataframe con un Styler en el servidor: estilos + datos a Arrow. Devuelve bytes."""
+    from streamlit import dataframe_util
+    from streamlit.elements.lib.pandas_styler_utils import marshall_styler
+    from streamlit.proto.ArrowData_pb2 import ArrowData as ArrowProto
+
+    proto = ArrowProto()
+    with pd.option_context("styler.render.max_elements", max(df.size, 1)):
+        marshall_styler(proto, df.style.apply(_estilo, axis=None), "bench")
+    datos = dataframe_util.convert_pandas_df_to_arrow_bytes(df)
+    return len(datos) + proto.ByteSize()
+
+
+def _completa(df: pd.DataFrame) -> int:
+    """Camino anterior de la página: copia, banda, filtro por umbral, orden y tabla entera al navegador."""
+    out = df.copy()
+    out["banda"] = np.where(out[SCORING_COL] >= TH_HIGH, "Alto", np.where(out[SCORING_COL] >= TH_LOW, "Medio", "Bajo"))
+    out = out[out[SCORING_COL] >= TH_LOW]
+    out = out[columnas_tabla(out, SCORING_COL)].sort_values(SCORING_COL, ascending=False)
+    return _serializar(out)
+
+
+def _paginada(tabla: TablaScoring, df: pd.DataFrame, page_size: int, por: str, busqueda: str = "") -> int:
+    posiciones = tabla.ordenar(tabla.mascara(None, TH_LOW, busqueda), por, True)
+    return _serializar(tabla.pagina(df, posiciones, 0, page_size, TH_LOW, TH_HIGH))
+
+
+def _timeit(fn, repeat: int) -> tuple[float, object]:
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: tabla completa estilada vs tabla paginada")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--max-completa", type=int, default=100_000, help="Filas máximas para medir la tabla completa")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = joblib.load(ROOT / "artifacts" / "modeling" / "df_con_scoring.pkl")
+    base = base[[c for c in base.columns if not str(c).startswith("_")]]
+    rng = np.random.default_rng(0)
+    print(f"{'candidatos':>11} {'modo':<24} {'ms':>10} {'KB enviados':>12}")
+    for n in args.rows:
+        df = base.iloc[rng.integers(0, len(base), n)].copy()
+        df.index = pd.RangeIndex(1, n + 1, name=base.index.name)
+        df[SCORING_COL] = rng.uniform(TH_LOW, 1.0, n)
+        if "abandono" in df.columns:
+            df["abandono"] = 0
+
+        t_build, tabla = _timeit(lambda: TablaScoring(df, SCORING_COL), 1)
+        print(f"{n:>11,} {'índices (1 vez por carga)':<24} {t_build * 1000:>10.1f} {'':>12}")
+        if n <= args.max_completa:
+            t, nbytes = _timeit(lambda: _completa(df), max(1, args.repeat // 2))
+            print(f"{n:>11,} {'completa':<24} {t * 1000:>10.1f} {nbytes / 1024:>12,.0f}")
+        for por in ("scoring", "departamento"):
+            t, nbytes = _timeit(lambda: _paginada(tabla, df, args.page_size, por), args.repeat)
+            print(f"{n:>11,} {'paginada (' + por + ')':<24} {t * 1000:>10.1f} {nbytes / 1024:>12,.0f}")
+        t, nbytes = _timeit(lambda: _paginada(tabla, df, args.page_size, "scoring", "Sales"), args.repeat)
+        print(f"{n:>11,} {'paginada (búsqueda)':<24} {t * 1000:>10.1f} {nbytes / 1024:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark del optimizador de umbrales por valor esperado (optimizador_umbrales.py): ordenación una
+vez por carga y consulta (global + por departamento) con sumas acumuladas, frente a un barrido por
+rejilla de pares de umbrales con máscaras sobre todas las filas (paso --paso, solo hasta
+--max-rejilla filas).
+
+Genera datasets sintéticos remuestreando df_con_scoring.pkl (scoring con ruido pequeño para que
+haya muchos umbrales candidatos distintos). Comprueba que el óptimo exacto no vale menos que el
+mejor par de la rejilla.
+
+Ejecutar desde la raíz del proyecto:
+  python benchmarks/bench_umbrales_optimos.py
+  python benchmarks/bench_umbrales_optimos.py --rows 100000 1000000 5000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "dashboard"))
+
+from optimizador_umbrales import (  # noqa: E402
+    COSTE_ALTO, COSTE_MEDIO, RETENCION_ALTO, RETENCION_MEDIO, OptimizadorUmbrales,
+)
+
+SCORING_COL = "scoring_abandono"
+
+
+def _rejilla(df: pd.DataFrame, paso: float) -> float:
+    """Mejor valor global probando cada par (alto, medio) de la rejilla con máscaras sobre las filas."""
+    score = df[SCORING_COL].to_numpy()
+    ganancia = np.where(df["abandono"].to_numpy() > 0, df["impacto_abandono"].clip(lower=0).to_numpy(), 0.0)
+    umbrales = np.round(np.arange(0.0, 1.0 + paso / 2, paso), 6)
+    mejor = 0.0
+    for i, alto in enumerate(umbrales):
+        en_alto = score >= alto
+        valor_alto = (ganancia[en_alto] * RETENCION_ALTO - COSTE_ALTO).sum()
+        for medio in umbrales[: i + 1]:
+            en_medio = (score >= medio) & ~en_alto
+            mejor = max(mejor, valor_alto + (ganancia[en_medio] * RETENCION_MEDIO - COSTE_MEDIO).sum())
+    return mejor
+
+
+def _timeit(fn, repeat: int) -> tuple[float, object]:
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: optimizador de umbrales vs rejilla de pares")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--paso", type=float, default=0.05, help="Paso de la rejilla de umbrales")
+    parser.add_argument("--max-rejilla", type=int, default=1_000_000, help="Filas máximas para medir la rejilla")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = joblib.load(ROOT / "artifacts" / "modeling" / "df_con_scoring.pkl")
+    base = base[[SCORING_COL, "departamento", "abandono", "impacto_abandono"]]
+    rng = np.random.default_rng(0)
+    print(f"{'filas':>11} {'modo':<26} {'ms':>10} {'valor':>16}")
+    for n in args.rows:
+        df = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+        df[SCORING_COL] = np.clip(df[SCORING_COL] + rng.normal(0, 0.01, n), 0, 1)
+
+        t_build, optimizador = _timeit(lambda: OptimizadorUmbrales(df, SCORING_COL), 1)
+        print(f"{n:>11,} {'orden (1 vez por carga)':<26} {t_build * 1000:>10.1f} {'':>16}")
+        t, res = _timeit(lambda: optimizador.optimizar(), args.repeat)
+        valor = res["global"]["valor"]
+        print(f"{n:>11,} {'optimizar (global + dep.)':<26} {t * 1000:>10.1f} {valor:>16,.0f}")
+        if n <= args.max_rejilla:
+            t, valor_rejilla = _timeit(lambda: _rejilla(df, args.paso), 1)
+            print(f"{n:>11,} {'rejilla paso ' + str(args.paso):<26} {t * 1000:>10.1f} {valor_rejilla:>16,.0f}")
+            assert valor >= valor_rejilla - 1e-6 * abs(valor_rejilla), "el óptimo exacto vale menos que la rejilla"
+
+
+if __name__ == "__main__":
+    main()
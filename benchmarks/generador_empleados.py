@@ -0,0 +1,92 @@
+"""
+Generador de datasets sintéticos de empleados a escala, a partir de AbandonoEmpleados.csv.
+
+generar_empleados(n) devuelve n filas con el esquema exacto del CSV (mismas columnas, tipos y niveles
+de cada categórica) remuestreando empleados reales por clase, de modo que la proporción de abandono es
+la del CSV (237 de 1.470) y cada columna conserva su tasa de faltantes (#N/D). salario_mes y
+distancia_casa llevan un ruido pequeño, acotado al rango observado, para que no todo sean duplicados.
+
+escribir_csv(df, ruta) lo guarda con el formato del CSV original (';' y '#N/D').
+con_scoring(df) añade limpieza, features y scoring_abandono como en df_con_scoring.pkl: el scoring
+es el del empleado real remuestreado más ruido, sin ejecutar el modelo.
+
+Lo usan benchmarks/bench_suite.py y puede importarse desde cualquier benchmark:
+  from generador_empleados import generar_empleados
+"""
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from features import construir_features, limpiar  # noqa: E402
+
+CSV_PATH = ROOT / "AbandonoEmpleados.csv"
+SCORING_PATH = ROOT / "artifacts" / "modeling" / "df_con_scoring.pkl"
+SCORING_COL = "scoring_abandono"
+CSV_SEP = ";"
+CSV_NA_VALUES = "#N/D"
+INDEX_COL = "id"
+
+# Columna -> ruido: relativo (fracción) o absoluto (unidades enteras)
+RUIDO_RELATIVO = {"salario_mes": 0.05}
+RUIDO_ABSOLUTO = {"distancia_casa": 1}
+RUIDO_SCORING = 0.01
+
+
+def leer_base(csv_path: Path = CSV_PATH) -> pd.DataFrame:
+    return pd.read_csv(csv_path, sep=CSV_SEP, index_col=INDEX_COL, na_values=CSV_NA_VALUES)
+
+
+def generar_empleados(n: int, base: pd.DataFrame | None = None, seed: int = 0) -> pd.DataFrame:
+    """
+    n empleados sintéticos (ids 1..n) con el esquema del CSV. La columna _origen guarda el id del
+    empleado real remuestreado (la usa con_scoring; escribir_csv la descarta).
+    """
+    base = leer_base() if base is None else base
+    rng = np.random.default_rng(seed)
+    es_baja = (base["abandono"] == "Yes").to_numpy()
+    n_bajas = int(round(n * es_baja.mean()))
+    posiciones = np.concatenate([
+        rng.choice(np.flatnonzero(es_baja), n_bajas),
+        rng.choice(np.flatnonzero(~es_baja), n - n_bajas),
+    ])
+    rng.shuffle(posiciones)
+
+    df = base.iloc[posiciones]
+    df.index = pd.RangeIndex(1, n + 1, name=INDEX_COL)
+    df = df.copy()
+    df["_origen"] = base.index.to_numpy()[posiciones]
+    for col, frac in RUIDO_RELATIVO.items():
+        ruido = df[col].to_numpy() * rng.uniform(1 - frac, 1 + frac, n)
+        df[col] = np.clip(np.rint(ruido), base[col].min(), base[col].max()).astype(base[col].dtype)
+    for col, delta in RUIDO_ABSOLUTO.items():
+        ruido = df[col].to_numpy() + rng.integers(-delta, delta + 1, n)
+        df[col] = np.clip(ruido, base[col].min(), base[col].max()).astype(base[col].dtype)
+    return df
+
+
+def escribir_csv(df: pd.DataFrame, ruta: Path) -> Path:
+    """Guarda df con el formato de AbandonoEmpleados.csv (separador ';', faltantes '#N/D')."""
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    df.drop(columns=["_origen"], errors="ignore").to_csv(ruta, sep=CSV_SEP, na_rep=CSV_NA_VALUES)
+    return ruta
+
+
+def con_scoring(df: pd.DataFrame, seed: int = 0, scoring_path: Path = SCORING_PATH) -> pd.DataFrame:
+    """
+    Limpieza + features (abandono 0/1, impacto_abandono, ...) y scoring_abandono float32: el del
+    empleado de origen en df_con_scoring.pkl más ruido N(0, RUIDO_SCORING), acotado a [0, 1].
+    """
+    rng = np.random.default_rng(seed)
+    scoring = joblib.load(scoring_path)[SCORING_COL]
+    origen = df["_origen"].to_numpy()
+    out = construir_features(limpiar(df.drop(columns=["_origen"])))
+    valores = scoring.reindex(origen).to_numpy(dtype=np.float64) + rng.normal(0, RUIDO_SCORING, len(out))
+    out[SCORING_COL] = np.clip(valores, 0, 1).astype(np.float32)
+    return out
@@ -5,13 +5,20 @@ Uso local: configurar .streamlit/secrets.toml con [passwords] usuario = "valor"
 Para nube: configurar secrets en Streamlit Cloud (ver README_DEPLOY.md).
 """
 import os
+import time
 import streamlit as st
 from common import (
     get_manifest,
     get_df_scoring,
     render_sidebar_filters,
     get_df_filtrado,
+    iniciar_precarga,
+    iniciar_rerun,
+    registrar_arranque,
+    segundos_desde_arranque,
+    get_tiempos_arranque,
     SCORING_COL,
+    FILTER_COLUMNS,
 )
 
 st.set_page_config(
@@ -43,7 +50,21 @@ def check_login(username: str, password: str) -> bool:
     return creds.get(username) == password or creds.get(username) == str(password)
 
 
+def _render_tiempos_arranque():
+    """Tiempos del arranque en frío del proceso: hasta el login y del primer render con datos."""
+    tiempos = get_tiempos_arranque()
+    partes = []
+    if "login" in tiempos:
+        partes.append(f"login en {tiempos['login']:.1f} s")
+    if "primera_pagina" in tiempos:
+        partes.append(f"primera página en {tiempos['primera_pagina']:.1f} s")
+    if partes:
+        st.sidebar.caption("Arranque en frío: " + " · ".join(partes))
+
+
 def main():
+    t_render = time.perf_counter()
+    iniciar_rerun("Inicio")
     if "authenticated" not in st.session_state:
         st.session_state.authenticated = False
     if "username" not in st.session_state:
@@ -70,13 +91,15 @@ def main():
                     st.rerun()
                 else:
                     st.error("Usuario o contraseña incorrectos.")
+        # Desde el arranque del proceso hasta el formulario de login (imports + servidor)
+        registrar_arranque("login", segundos_desde_arranque())
         st.stop()
 
     # Autenticado: cargar datos y mostrar sidebar en todas las vistas
     manifest = get_manifest()
-    df_raw = get_df_scoring()
+    df_raw = get_df_scoring(FILTER_COLUMNS)
     render_sidebar_filters(df_raw)
-    df_filtrado = get_df_filtrado(df_raw) if df_raw is not None else None
+    df_filtrado = get_df_filtrado(df_raw, columns=(SCORING_COL,)) if df_raw is not None else None
 
     st.sidebar.markdown("---")
     st.sidebar.caption(f"Sesión: {st.session_state.username}")
@@ -103,6 +126,11 @@ def main():
         n = len(df_filtrado) if df_filtrado is not None else 0
         st.success(f"Datos cargados: **{n}** empleados (tras filtros).")
 
+    # Primer render con datos del proceso; después se precargan las demás páginas en segundo plano
+    registrar_arranque("primera_pagina", time.perf_counter() - t_render)
+    _render_tiempos_arranque()
+    iniciar_precarga()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,78 @@
+"""
+Caché LRU compartida (entre sesiones y páginas) para resultados de filtrado.
+
+La clave es un hash canónico del estado de filtros del sidebar, las columnas pedidas y la versión
+del dataset con scoring; cambiar de página con la misma selección es un acierto de caché.
+El tamaño está acotado por número de entradas y por bytes; se expulsa la menos usada recientemente.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def clave_canonica(**partes) -> str:
+    """Hash estable de valores simples; las listas se ordenan (el orden de selección no filtra distinto)."""
+    def _norm(v):
+        if isinstance(v, (list, tuple, set)):
+            return sorted(str(x) for x in v)
+        if isinstance(v, dict):
+            return {k: _norm(x) for k, x in v.items()}
+        return v
+    payload = json.dumps(_norm(partes), sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _tamano(valor) -> int:
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=False).sum())
+    return 0
+
+
+class CacheLRU:
+    def __init__(self, max_entradas: int = 32, max_bytes: int = 512 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self._datos: OrderedDict[str, tuple[object, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, clave: str):
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave][0]
+            self.fallos += 1
+            return None
+
+    def put(self, clave: str, valor) -> None:
+        tam = _tamano(valor)
+        if tam > self.max_bytes:
+            return
+        with self._lock:
+            if clave in self._datos:
+                self._bytes -= self._datos.pop(clave)[1]
+            self._datos[clave] = (valor, tam)
+            self._bytes += tam
+            while len(self._datos) > self.max_entradas or self._bytes > self.max_bytes:
+                _, (_, t) = self._datos.popitem(last=False)
+                self._bytes -= t
+                self.expulsiones += 1
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": (self.aciertos / total) if total else 0.0,
+                "entradas": len(self._datos),
+                "mb": self._bytes / 1e6,
+                "expulsiones": self.expulsiones,
+            }
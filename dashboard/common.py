@@ -1,11 +1,35 @@
 """
 Módulo común del dashboard: carga de manifest y datos, filtros globales en sidebar.
+
+Arranque: aquí solo se importa lo que necesita la página de inicio. joblib, features.py (que trae
+sklearn), pyarrow y el pipeline se importan al usarse; tras el login un hilo precarga los artefactos
+de las demás páginas (iniciar_precarga).
+
+Los artefactos se cachean por versión (recarga_artefactos.py): al publicar una versión con
+scripts/registro_artefactos.py, un hilo la detecta, la precarga en segundo plano y la activa.
 """
 from pathlib import Path
 import json
+import os
+import sys
+import threading
+import time
 import streamlit as st
+import numpy as np
 import pandas as pd
-import joblib
+
+_T_IMPORT = time.time()
+
+# Módulos de scripts/ y del dashboard sin sklearn ni joblib: se importan al cargar. features.py (sklearn)
+# y joblib se importan dentro de las funciones que los usan.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from almacen_scoring import read_scoring_store, read_store_schema
+from cache_filtros import CacheLRU, clave_canonica
+from cubo_segmentos import CuboSegmentos
+from instrumentacion import REGISTRO, cronometrado, iniciar_rerun, medir
+from motor_filtros import MotorFiltros
+from recarga_artefactos import CacheVersionada, VigilanteArtefactos, por_version, version_inicial
+from tabla_scoring import TablaScoring
 
 # Rutas: buscar artifacts/modeling desde raíz del repo o desde cwd (por si se ejecuta desde dashboard/)
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -22,67 +46,268 @@ def _artifacts_dir():
     return _CANDIDATE_ARTIFACTS[0]
 
 ARTIFACTS_DIR = _artifacts_dir()
-MANIFEST_PATH = ARTIFACTS_DIR / "experiment_manifest.json"
-DF_SCORING_PATH = ARTIFACTS_DIR / "df_con_scoring.pkl"
-PIPELINE_PATH = ARTIFACTS_DIR / "pipeline.pkl"
-BEST_MODEL_PATH = ARTIFACTS_DIR / "best_model.pkl"
+
+# Artefactos cargados, por versión publicada (o versión local sin registro)
+ARTEFACTOS = CacheVersionada(ARTIFACTS_DIR, version_inicial(ARTIFACTS_DIR))
+
+# Cada cuántos segundos se comprueba si hay una versión publicada nueva (0 = no se comprueba)
+RECARGA_INTERVALO_S = float(os.environ.get("DASHBOARD_RECARGA_S", "30"))
+
+
+def _ruta(nombre: str) -> Path:
+    """Ruta de un artefacto en la versión de este rerun (o la que se está precargando)."""
+    return ARTEFACTOS.directorio() / nombre
 
 # Nombre de la columna de scoring (según plan)
 SCORING_COL = "scoring_abandono"
 
+# Columnas que usan los filtros del sidebar; cada página pide estas más las que grafica
+FILTER_COLUMNS = (SCORING_COL, "departamento", "anos_compania", "satisfaccion_entorno")
+
+# Mediciones de la página Rendimiento como JSON lines (también activable desde la página)
+TIEMPOS_JSONL_PATH = BASE_DIR / "logs" / "tiempos_dashboard.jsonl"
+if os.environ.get("DASHBOARD_TIEMPOS_JSONL"):
+    REGISTRO.exportar_a(Path(os.environ["DASHBOARD_TIEMPOS_JSONL"]))
+
+# Caché de resultados de filtrado compartida entre páginas y sesiones
+CACHE_FILTROS_MAX_ENTRADAS = 32
+CACHE_FILTROS_MAX_BYTES = 512 * 1024 * 1024
+
 
 def _load_manifest():
-    if not MANIFEST_PATH.exists():
+    path = _ruta("experiment_manifest.json")
+    if not path.exists():
         return None
-    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+    with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def _load_df_scoring():
-    if not DF_SCORING_PATH.exists():
+@cronometrado("carga df_scoring")
+def _load_df_scoring(columns: tuple[str, ...] | None = None):
+    """
+    Carga el DataFrame con scoring (ver _load_df_scoring_fuente). Las features derivadas pedidas que
+    no estén guardadas (p. ej. datos puntuados desde un export en bruto) se calculan con features.py.
+    """
+    df = _load_df_scoring_fuente(columns)
+    if df is None:
         return None
+    if columns is not None and all(c in df.columns for c in columns):
+        return df
+    from features import FEATURES_DERIVADAS, columnas_base, construir_features
+
+    faltan = [c for c in (columns or FEATURES_DERIVADAS) if c in FEATURES_DERIVADAS and c not in df.columns]
+    if not faltan:
+        return df
+    base = df if columns is None else _load_df_scoring_fuente(tuple(columnas_base(faltan)))
+    derivadas = construir_features(base, faltan)
+    nuevas = {c: derivadas[c] for c in faltan if c in derivadas.columns}
+    if not nuevas:
+        return df
+    out = df.assign(**nuevas)
+    out.attrs = dict(df.attrs)
+    return out
+
+
+def _load_df_scoring_fuente(columns: tuple[str, ...] | None = None):
+    """
+    Lee el DataFrame con scoring: almacén columnar si existe y no es más antiguo que el pickle;
+    si no, el pickle (fallback), p. ej. recién regenerado desde el notebook.
+    """
+    if _store_vigente():
+        try:
+            path = _ruta("df_con_scoring.feather")
+            df = read_scoring_store(path, columns)
+            df.attrs["version_datos"] = _version_archivo(path)
+            return df
+        except Exception:
+            pass
+    df = _get_df_scoring_pickle()
+    if df is None or columns is None:
+        return df
+    return df[[c for c in df.columns if c in columns]]
+
+
+def _store_vigente() -> bool:
+    """El almacén columnar existe y no es más antiguo que el pickle."""
+    store, pickle = _ruta("df_con_scoring.feather"), _ruta("df_con_scoring.pkl")
+    return store.exists() and (not pickle.exists() or store.stat().st_mtime >= pickle.stat().st_mtime)
+
+
+def _esquema_fuente() -> tuple[list[str], dict]:
+    """(columnas, metadatos churn.*) del dataset con scoring sin leer los datos (esquema Arrow o pickle)."""
+    if _store_vigente():
+        try:
+            return read_store_schema(_ruta("df_con_scoring.feather"))
+        except Exception:
+            pass
+    df = _get_df_scoring_pickle()
+    return (list(df.columns) if df is not None else []), {}
+
+
+def _version_archivo(path: Path) -> str:
+    """Versión del dataset para claves de caché: versión de artefactos, nombre, fecha de modificación y tamaño."""
+    st_ = path.stat()
+    return f"{ARTEFACTOS.version()}/{path.name}:{st_.st_mtime_ns}:{st_.st_size}"
+
+
+def _load_df_scoring_pickle():
+    path = _ruta("df_con_scoring.pkl")
+    if not path.exists():
+        return None
+    import joblib
+    from esquema import esquema_almacen
+
     try:
-        return joblib.load(DF_SCORING_PATH)
+        df = joblib.load(path)
     except Exception:
         return None
+    # Mismos tipos que el almacén columnar: categorías con códigos enteros, enteros pequeños, float32
+    df = esquema_almacen(df)
+    df.attrs["version_datos"] = _version_archivo(path)
+    return df
 
 
 def _load_pipeline():
     """Carga el pipeline para feature importance. Prueba varias rutas y pipeline.pkl o best_model.pkl."""
     candidates = [
-        PIPELINE_PATH, BEST_MODEL_PATH,
+        _ruta("pipeline.pkl"), _ruta("best_model.pkl"),
         Path.cwd() / "artifacts" / "modeling" / "pipeline.pkl",
         Path.cwd() / "artifacts" / "modeling" / "best_model.pkl",
         Path.cwd().parent / "artifacts" / "modeling" / "pipeline.pkl",
         Path.cwd().parent / "artifacts" / "modeling" / "best_model.pkl",
     ]
-    for path in candidates:
-        if path.exists():
-            try:
-                return joblib.load(path)
-            except Exception:
-                continue
+    with medir("carga pipeline") as info:
+        import joblib
+
+        for i, path in enumerate(candidates, start=1):
+            if path.exists():
+                try:
+                    modelo = joblib.load(path)
+                    info["detalle"] = f"{path.name} (candidato {i} de {len(candidates)})"
+                    return modelo
+                except Exception:
+                    continue
+        info["detalle"] = f"ninguno de {len(candidates)} candidatos"
     return None
 
 
-@st.cache_data(ttl=300)
+@por_version(ARTEFACTOS)
 def get_manifest():
     return _load_manifest()
 
 
-@st.cache_data(ttl=300)
-def get_df_scoring():
-    return _load_df_scoring()
+@por_version(ARTEFACTOS)
+def _get_df_scoring_pickle():
+    return _load_df_scoring_pickle()
+
+
+@por_version(ARTEFACTOS)
+def get_df_scoring(columns: tuple[str, ...] | None = None):
+    """
+    DataFrame con scoring compartido por todas las sesiones (no modificar in place).
+    columns: columnas a leer (proyección); None = todas.
+    """
+    return _load_df_scoring(columns)
+
+
+@por_version(ARTEFACTOS)
+@cronometrado("construcción cubo de segmentos")
+def get_cubo_segmentos():
+    """Cubo de agregados por segmento, construido una vez por carga de datos (ver cubo_segmentos.py)."""
+    df = get_df_scoring(FILTER_COLUMNS + ("impacto_abandono",))
+    if df is None or df.empty or SCORING_COL not in df.columns:
+        return None
+    return CuboSegmentos(df, SCORING_COL)
+
+
+@por_version(ARTEFACTOS)
+@cronometrado("construcción motor de filtros")
+def get_motor_filtros():
+    """Índices de filtrado del dataset con scoring, construidos una vez por carga (ver motor_filtros.py)."""
+    df = get_df_scoring(FILTER_COLUMNS)
+    if df is None or df.empty:
+        return None
+    return MotorFiltros(df, rangos=("anos_compania", SCORING_COL))
+
+
+def get_df_tabla_scoring():
+    """
+    Dataset de "Scoring y datos": todas las columnas salvo las contribuciones contrib__*, que la tabla y
+    las exportaciones no muestran (el detalle de un empleado usa get_contribuciones).
+    """
+    return get_df_scoring(_columnas_tabla())
+
+
+@por_version(ARTEFACTOS)
+def _columnas_tabla() -> tuple[str, ...] | None:
+    from contribuciones_segmento import columnas_contribucion
+    from features import FEATURES_DERIVADAS
+
+    columnas, _ = _esquema_fuente()
+    if not columnas:
+        return None
+    contribuciones = set(columnas_contribucion(columnas))
+    # Las features derivadas que no estén guardadas se calculan al cargar, como sin proyección
+    return tuple(c for c in columnas if c not in contribuciones) + tuple(c for c in FEATURES_DERIVADAS if c not in columnas)
+
+
+@por_version(ARTEFACTOS)
+@cronometrado("construcción tabla de scoring")
+def get_tabla_scoring():
+    """Órdenes precomputados de la tabla de "Scoring y datos", construidos una vez por carga (ver tabla_scoring.py)."""
+    df = get_df_tabla_scoring()
+    if df is None or df.empty or SCORING_COL not in df.columns:
+        return None
+    return TablaScoring(df, SCORING_COL)
+
+
+@por_version(ARTEFACTOS)
+@cronometrado("construcción optimizador de umbrales")
+def get_optimizador_umbrales():
+    """Scores ordenados con etiqueta e impacto para optimizar umbrales, una vez por carga (ver optimizador_umbrales.py)."""
+    from optimizador_umbrales import OptimizadorUmbrales
+
+    df = get_df_scoring(FILTER_COLUMNS + ("abandono", "impacto_abandono"))
+    if df is None or df.empty or SCORING_COL not in df.columns or "abandono" not in df.columns:
+        return None
+    return OptimizadorUmbrales(df, SCORING_COL)
+
+
+@por_version(ARTEFACTOS)
+@cronometrado("construcción matriz de contribuciones")
+def get_contribuciones():
+    """
+    Contribuciones por empleado guardadas al puntuar (contrib__*), como matriz float32, una vez por
+    carga (ver contribuciones_segmento.py). None si el dataset no las tiene.
+    """
+    from contribuciones_segmento import ContribucionesSegmento, columnas_contribucion
+
+    columnas, meta = _esquema_fuente()
+    cols = columnas_contribucion(columnas)
+    if not cols:
+        return None
+    df = get_df_scoring(FILTER_COLUMNS + tuple(cols))
+    if df is None or df.empty:
+        return None
+    return ContribucionesSegmento(df, (meta.get("contribuciones") or {}).get("base"))
 
 
 @st.cache_resource
+def get_cache_filtros() -> CacheLRU:
+    return CacheLRU(CACHE_FILTROS_MAX_ENTRADAS, CACHE_FILTROS_MAX_BYTES)
+
+
+@por_version(ARTEFACTOS)
 def get_pipeline():
     return _load_pipeline()
 
 
+@cronometrado("carga preprocessor")
 def _load_preprocessor():
     """Carga el preprocessor para nombres de features (mismas rutas que pipeline)."""
-    for base in [ARTIFACTS_DIR, Path.cwd() / "artifacts" / "modeling", Path.cwd().parent / "artifacts" / "modeling"]:
+    import joblib
+
+    for base in [ARTEFACTOS.directorio(), Path.cwd() / "artifacts" / "modeling", Path.cwd().parent / "artifacts" / "modeling"]:
         path = base / "preprocessor.pkl"
         if path.exists():
             try:
@@ -92,11 +317,168 @@ def _load_preprocessor():
     return None
 
 
-@st.cache_resource
+@por_version(ARTEFACTOS)
 def get_preprocessor():
     return _load_preprocessor()
 
 
+def _importancias_manifest(manifest: dict | None) -> pd.DataFrame | None:
+    """Importancias guardadas en el manifest (best_model.feature_importances), como variable/importancia."""
+    best = (manifest or {}).get("best_model", {})
+    imp_list = (best.get("feature_importances") or (manifest or {}).get("feature_importances") or [])
+    if not isinstance(imp_list, list) or len(imp_list) == 0:
+        return None
+    if isinstance(imp_list[0], dict):
+        df_imp = pd.DataFrame(imp_list)
+        if "variable" in df_imp.columns and "importancia" in df_imp.columns:
+            return df_imp
+        return None
+    if isinstance(imp_list[0], (int, float)):
+        names = (manifest or {}).get("feature_columns", [])
+        if len(names) != len(imp_list):
+            names = [f"X{i}" for i in range(len(imp_list))]
+        return pd.DataFrame({"variable": names, "importancia": imp_list})
+    return None
+
+
+def _importancias_pipeline(manifest: dict | None) -> pd.DataFrame | None:
+    """Importancias leídas del pipeline (.pkl): importa sklearn, imblearn y xgboost; solo si el manifest no las tiene."""
+    pipeline = get_pipeline()
+    if pipeline is None:
+        return None
+    try:
+        if hasattr(pipeline, "steps") and len(pipeline.steps):
+            clf = pipeline.steps[-1][1]
+        elif hasattr(pipeline, "named_steps"):
+            clf = pipeline.named_steps.get("clf", pipeline.named_steps.get("classifier", pipeline))
+        else:
+            clf = pipeline
+        if not hasattr(clf, "feature_importances_"):
+            return None
+        imp = clf.feature_importances_
+        preprocessor = get_preprocessor()
+        if preprocessor is not None and hasattr(preprocessor, "get_feature_names_out"):
+            try:
+                feature_names = preprocessor.get_feature_names_out()
+            except Exception:
+                feature_names = []
+        else:
+            feature_names = (manifest or {}).get("feature_columns", [])
+        if len(feature_names) != len(imp):
+            feature_names = [f"X{i}" for i in range(len(imp))]
+        return pd.DataFrame({"variable": list(feature_names), "importancia": imp})
+    except Exception:
+        return None
+
+
+def get_feature_importances(manifest: dict | None, top_n: int = 15) -> pd.DataFrame | None:
+    """
+    Top top_n importancias de variables (orden ascendente, para barras horizontales). Se leen del
+    manifest; el pipeline solo se carga si el manifest no las tiene (export_model_artifacts.py las guarda).
+    """
+    df_imp = _importancias_manifest(manifest)
+    if df_imp is None:
+        df_imp = _importancias_pipeline(manifest)
+    if df_imp is None or df_imp.empty:
+        return None
+    return df_imp.nlargest(top_n, "importancia").sort_values("importancia", ascending=True)
+
+
+def _cargar_artefactos(estado: dict) -> None:
+    """Carga lo que usan las páginas, en la versión de artefactos de este hilo (cada paso queda en su caché)."""
+    pasos = [
+        ("datos (resumen)", lambda: get_df_scoring(FILTER_COLUMNS + ("impacto_abandono",))),
+        ("cubo de segmentos", get_cubo_segmentos),
+        ("motor de filtros", get_motor_filtros),
+        ("datos (tabla de scoring)", get_df_tabla_scoring),
+        ("tabla de scoring", get_tabla_scoring),
+        ("contribuciones", get_contribuciones),
+    ]
+    if _importancias_manifest(get_manifest()) is None:
+        pasos += [("pipeline", get_pipeline), ("preprocessor", get_preprocessor)]
+    for nombre, paso in pasos:
+        try:
+            paso()
+            estado["pasos"].append(nombre)
+        except Exception as e:
+            estado["errores"].append(f"{nombre}: {e}")
+
+
+def _precargar(estado: dict) -> None:
+    """Carga en segundo plano lo que usan las demás páginas."""
+    iniciar_rerun("precarga")
+    t0 = time.perf_counter()
+    _cargar_artefactos(estado)
+    estado["segundos"] = time.perf_counter() - t0
+    estado["terminada"] = True
+
+
+def _recargar_version() -> list[str]:
+    """Precarga de una versión nueva para el vigilante (antes de activarla); devuelve los errores."""
+    estado = {"pasos": [], "errores": []}
+    _cargar_artefactos(estado)
+    return estado["errores"]
+
+
+@st.cache_resource
+def iniciar_precarga() -> dict:
+    """
+    Lanza (una vez por proceso) el hilo de precarga de artefactos y el vigilante de versiones. Devuelve
+    el estado de la precarga: {"terminada", "segundos", "pasos", "errores"}. Llamar tras el login, al
+    final del render.
+    """
+    estado = {"terminada": False, "segundos": None, "pasos": [], "errores": []}
+    hilo = threading.Thread(target=_precargar, args=(estado,), name="precarga-artefactos", daemon=True)
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+
+        add_script_run_ctx(hilo)
+    except ImportError:
+        pass
+    hilo.start()
+    get_vigilante()
+    return estado
+
+
+@st.cache_resource
+def get_vigilante() -> VigilanteArtefactos | None:
+    """Hilo (uno por proceso) que activa en caliente las versiones de artefactos publicadas; None si está desactivado."""
+    if RECARGA_INTERVALO_S <= 0:
+        return None
+    vigilante = VigilanteArtefactos(ARTEFACTOS, _recargar_version, RECARGA_INTERVALO_S)
+    vigilante.iniciar()
+    return vigilante
+
+
+def _inicio_proceso() -> float:
+    """Instante (epoch) en que arrancó el proceso; en Linux desde /proc, si no el de la importación de common."""
+    try:
+        with open("/proc/self/stat", encoding="utf-8") as f:
+            campos = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", encoding="utf-8") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + int(campos[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return _T_IMPORT
+
+
+_INICIO_PROCESO = _inicio_proceso()
+_TIEMPOS_ARRANQUE: dict[str, float] = {"import_common": time.time() - _T_IMPORT}
+
+
+def segundos_desde_arranque() -> float:
+    return time.time() - _INICIO_PROCESO
+
+
+def registrar_arranque(etapa: str, segundos: float) -> None:
+    """Guarda el tiempo de etapa solo la primera vez en el proceso (arranque en frío)."""
+    _TIEMPOS_ARRANQUE.setdefault(etapa, segundos)
+
+
+def get_tiempos_arranque() -> dict[str, float]:
+    return dict(_TIEMPOS_ARRANQUE)
+
+
 def _init_session_state():
     if "filter_departamentos" not in st.session_state:
         st.session_state.filter_departamentos = []
@@ -123,6 +505,29 @@ def get_umbrales_riesgo():
     return th_low, th_high
 
 
+def get_intervalo_banda() -> tuple[float, float]:
+    """Intervalo [desde, hasta) de scoring que deja pasar la banda elegida en el sidebar."""
+    th_low, th_high = get_umbrales_riesgo()
+    banda = st.session_state.get("filter_banda", "Todos")
+    if banda == f"Alto riesgo (≥{th_high})":
+        return th_high, float("inf")
+    if banda == f"Riesgo medio ({th_low}–{th_high})":
+        return th_low, th_high
+    if banda == f"Bajo (<{th_low})":
+        return float("-inf"), th_low
+    return float("-inf"), float("inf")
+
+
+def get_mascara_cubo(cubo: CuboSegmentos):
+    """Celdas del cubo que pasan los filtros de departamento, años y satisfacción del sidebar."""
+    return cubo.mascara(
+        departamentos=st.session_state.get("filter_departamentos"),
+        satisfaccion=st.session_state.get("filter_satisfaccion"),
+        anos_min=st.session_state.get("filter_anos_min"),
+        anos_max=st.session_state.get("filter_anos_max"),
+    )
+
+
 def render_sidebar_filters(df: pd.DataFrame | None):
     """
     Renderiza los filtros globales en el sidebar. Debe llamarse al inicio de cada página.
@@ -133,12 +538,8 @@ def render_sidebar_filters(df: pd.DataFrame | None):
     if df is None or df.empty:
         st.sidebar.caption("Cargue datos con scoring para activar filtros.")
         return
-    # Opciones desde datos
-    departamentos = sorted(df["departamento"].dropna().astype(str).unique().tolist()) if "departamento" in df.columns else []
-    satisfaccion_opts = sorted(df["satisfaccion_entorno"].dropna().astype(str).unique().tolist()) if "satisfaccion_entorno" in df.columns else []
-    anos_compania = df["anos_compania"].dropna() if "anos_compania" in df.columns else pd.Series(dtype=float)
-    anos_min_data = int(anos_compania.min()) if len(anos_compania) else 0
-    anos_max_data = int(anos_compania.max()) if len(anos_compania) else 30
+    # Opciones desde datos (cacheadas por versión del dataset)
+    departamentos, satisfaccion_opts, anos_min_data, anos_max_data = _opciones_filtros(df)
     if SCORING_COL not in df.columns:
         st.sidebar.caption("No hay columna de scoring en los datos.")
         return
@@ -156,7 +557,7 @@ def render_sidebar_filters(df: pd.DataFrame | None):
         "Umbral alto riesgo (≥)",
         0.0, 1.0,
         value=float(st.session_state.filter_umbral_alto),
-        step=0.05,
+        step=0.01,
         key="slider_umbral_alto",
         help="Scoring ≥ este valor = Alto riesgo. Afecta KPIs y gráficos en todas las solapas.",
     )
@@ -165,11 +566,12 @@ def render_sidebar_filters(df: pd.DataFrame | None):
         "Umbral riesgo medio (≥)",
         0.0, 1.0,
         value=float(st.session_state.filter_umbral_medio),
-        step=0.05,
+        step=0.01,
         key="slider_umbral_medio",
         help="Scoring ≥ este valor = al menos Riesgo medio. Por debajo = Bajo. Afecta todas las solapas.",
     )
     st.session_state.filter_umbral_medio = st.session_state.get("slider_umbral_medio", 0.3)
+    _render_umbrales_optimos()
     th_low, th_high = get_umbrales_riesgo()
     # Banda de scoring (opciones dinámicas según umbrales)
     bandas_opts = ["Todos", f"Alto riesgo (≥{th_high})", f"Riesgo medio ({th_low}–{th_high})", f"Bajo (<{th_low})"]
@@ -204,39 +606,284 @@ def render_sidebar_filters(df: pd.DataFrame | None):
     ])
     if activos > 0:
         st.sidebar.caption(f"Filtros activos: {activos}")
+    _render_debug_cache()
 
 
-def get_df_filtrado(df: pd.DataFrame | None) -> pd.DataFrame | None:
-    """
-    Aplica los filtros del sidebar al DataFrame y devuelve una copia filtrada.
-    Si df es None, devuelve None.
-    """
-    if df is None or df.empty:
+@cronometrado("umbrales óptimos")
+def get_umbrales_optimos(coste_alto: float, retencion_alto: float, coste_medio: float,
+                         retencion_medio: float) -> dict | None:
+    """Umbrales de máximo valor esperado (global y por departamento), en la caché de filtros por parámetros."""
+    optimizador = get_optimizador_umbrales()
+    if optimizador is None:
         return None
+    df = get_df_scoring(FILTER_COLUMNS + ("abandono", "impacto_abandono"))
+    version = df.attrs.get("version_datos")
+    parametros = [coste_alto, retencion_alto, coste_medio, retencion_medio]
+    clave = clave_canonica(tipo="umbrales_optimos", version=version, parametros=parametros) if version else None
+    if clave is not None:
+        cached = get_cache_filtros().get(clave)
+        if cached is not None:
+            return cached
+    resultado = optimizador.optimizar(*parametros)
+    if clave is not None:
+        get_cache_filtros().put(clave, resultado)
+    return resultado
+
+
+def _aplicar_umbrales(th_alto: float, th_medio: float):
+    """Callback de "Aplicar": fija los umbrales y descarta el estado de los sliders para que tomen el valor nuevo."""
+    st.session_state.filter_umbral_alto = th_alto
+    st.session_state.filter_umbral_medio = th_medio
+    st.session_state.pop("slider_umbral_alto", None)
+    st.session_state.pop("slider_umbral_medio", None)
+
+
+def _render_umbrales_optimos():
+    """Expander del sidebar con los umbrales que maximizan el valor esperado según costes y tasas de retención."""
+    from optimizador_umbrales import COSTE_ALTO, COSTE_MEDIO, RETENCION_ALTO, RETENCION_MEDIO
+
+    if get_optimizador_umbrales() is None:
+        return
+    with st.sidebar.expander("Umbrales óptimos (valor esperado)"):
+        st.caption("Valor de intervenir = abandono × retención × impacto − coste, con las etiquetas históricas.")
+        c1, c2 = st.columns(2)
+        # Persisten entre páginas como los filtros (filter_opt_*), el widget solo muestra el valor
+        campos = [
+            (c1, "coste_alto", "Coste alto", COSTE_ALTO, None, 100.0),
+            (c2, "retencion_alto", "Retención alto", RETENCION_ALTO, 1.0, 0.05),
+            (c1, "coste_medio", "Coste medio", COSTE_MEDIO, None, 50.0),
+            (c2, "retencion_medio", "Retención medio", RETENCION_MEDIO, 1.0, 0.05),
+        ]
+        parametros = []
+        for col, nombre, etiqueta, default, maximo, paso in campos:
+            valor = col.number_input(etiqueta, min_value=0.0, max_value=maximo, step=paso, key=f"opt_{nombre}",
+                                     value=float(st.session_state.get(f"filter_opt_{nombre}", default)))
+            st.session_state[f"filter_opt_{nombre}"] = valor
+            parametros.append(valor)
+        resultado = get_umbrales_optimos(*parametros)
+        if resultado is None:
+            return
+        opt = resultado["global"]
+        if opt["umbral_medio"] is None:
+            st.caption("Con estos costes no conviene intervenir a nadie.")
+            return
+        # Sin nivel alto rentable, el umbral alto queda en 1 (nadie en alto riesgo)
+        th_alto = round(opt["umbral_alto"], 2) if opt["umbral_alto"] is not None else 1.0
+        th_medio = min(round(opt["umbral_medio"], 2), th_alto)
+        st.caption(
+            f"Alto ≥ {th_alto} ({opt['n_alto']:,}: {opt['tp_alto']:,} TP / {opt['fp_alto']:,} FP) · "
+            f"Medio ≥ {th_medio} ({opt['n_medio']:,}: {opt['tp_medio']:,} TP / {opt['fp_medio']:,} FP) · "
+            f"Valor esperado: {opt['valor']:,.0f}"
+        )
+        st.button("Aplicar", key="opt_aplicar", on_click=_aplicar_umbrales, args=(th_alto, th_medio))
+        por_dep = resultado["departamentos"]
+        if len(por_dep):
+            st.dataframe(por_dep[["umbral_alto", "umbral_medio", "valor"]].round(2), use_container_width=True)
+
+
+def _niveles_presentes(serie: pd.Series) -> list[str]:
+    """Niveles con alguna fila: en el orden del esquema si la columna es categórica (Baja < ... < Muy_Alta), si no alfabético."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codes = serie.cat.codes.to_numpy()
+        presentes = np.bincount(codes[codes >= 0], minlength=len(serie.cat.categories)) > 0
+        return [str(c) for c in serie.cat.categories[presentes]]
+    return sorted(serie.dropna().astype(str).unique().tolist())
+
+
+def _mascara_categorica(serie: pd.Series, valores: list) -> np.ndarray:
+    """Filas cuyo valor está en valores: compara códigos enteros si la columna es categórica, texto si no."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.categories.astype(str).get_indexer([str(v) for v in valores])
+        return np.isin(serie.cat.codes.to_numpy(), codigos[codigos >= 0])
+    return serie.astype(str).isin(valores).to_numpy()
+
+
+def _opciones_filtros(df: pd.DataFrame) -> tuple[list, list, int, int]:
+    """Opciones de los filtros (departamentos, niveles de satisfacción, rango de años) para df."""
+    version = df.attrs.get("version_datos")
+    clave = clave_canonica(tipo="opciones", version=version, columnas=[c for c in FILTER_COLUMNS if c in df.columns]) if version else None
+    cache = get_cache_filtros()
+    if clave is not None:
+        opciones = cache.get(clave)
+        if opciones is not None:
+            return opciones
+    departamentos = _niveles_presentes(df["departamento"]) if "departamento" in df.columns else []
+    satisfaccion_opts = _niveles_presentes(df["satisfaccion_entorno"]) if "satisfaccion_entorno" in df.columns else []
+    anos_compania = df["anos_compania"].dropna() if "anos_compania" in df.columns else pd.Series(dtype=float)
+    anos_min_data = int(anos_compania.min()) if len(anos_compania) else 0
+    anos_max_data = int(anos_compania.max()) if len(anos_compania) else 30
+    opciones = (departamentos, satisfaccion_opts, anos_min_data, anos_max_data)
+    if clave is not None:
+        cache.put(clave, opciones)
+    return opciones
+
+
+def _render_debug_cache():
+    """Panel de depuración con aciertos/fallos de la caché de filtros (visible con ?debug=1 en la URL)."""
+    if str(getattr(st, "query_params", {}).get("debug", "")) != "1":
+        return
+    stats = get_cache_filtros().estadisticas()
+    with st.sidebar.expander("Depuración: caché de filtros", expanded=True):
+        st.caption(
+            f"Aciertos: {stats['aciertos']} · Fallos: {stats['fallos']} · Tasa: {stats['tasa_aciertos']:.0%}\n\n"
+            f"Entradas: {stats['entradas']} ({stats['mb']:.1f} MB) · Expulsiones: {stats['expulsiones']}"
+        )
+
+
+def get_estado_filtros() -> dict:
+    """Estado de los filtros del sidebar como valores simples (listas, números)."""
+    desde, hasta = get_intervalo_banda()
+    return {
+        "departamentos": list(st.session_state.get("filter_departamentos") or []),
+        "satisfaccion": list(st.session_state.get("filter_satisfaccion") or []),
+        "anos_min": st.session_state.get("filter_anos_min"),
+        "anos_max": st.session_state.get("filter_anos_max"),
+        "score_desde": desde,
+        "score_hasta": hasta,
+    }
+
+
+def _filtrar_pandas(df: pd.DataFrame, estado: dict) -> pd.DataFrame:
+    """Filtrado por máscaras sucesivas (ruta de respaldo si el motor de índices no aplica a df)."""
     out = df.copy()
-    if st.session_state.filter_departamentos and "departamento" in out.columns:
-        out = out[out["departamento"].astype(str).isin(st.session_state.filter_departamentos)]
+    if estado["departamentos"] and "departamento" in out.columns:
+        out = out[_mascara_categorica(out["departamento"], estado["departamentos"])]
     if SCORING_COL in out.columns:
-        th_low, th_high = get_umbrales_riesgo()
-        banda = st.session_state.get("filter_banda", "Todos")
-        if banda == f"Alto riesgo (≥{th_high})":
-            out = out[out[SCORING_COL] >= th_high]
-        elif banda == f"Riesgo medio ({th_low}–{th_high})":
-            out = out[out[SCORING_COL].ge(th_low) & out[SCORING_COL].lt(th_high)]
-        elif banda == f"Bajo (<{th_low})":
-            out = out[out[SCORING_COL] < th_low]
+        if estado["score_desde"] > float("-inf"):
+            out = out[out[SCORING_COL] >= estado["score_desde"]]
+        if estado["score_hasta"] < float("inf"):
+            out = out[out[SCORING_COL] < estado["score_hasta"]]
     if "anos_compania" in out.columns:
-        a_min = st.session_state.get("filter_anos_min")
-        a_max = st.session_state.get("filter_anos_max")
-        if a_min is not None:
-            out = out[out["anos_compania"] >= a_min]
-        if a_max is not None:
-            out = out[out["anos_compania"] <= a_max]
-    if st.session_state.get("filter_satisfaccion") and "satisfaccion_entorno" in out.columns:
-        out = out[out["satisfaccion_entorno"].astype(str).isin(st.session_state.filter_satisfaccion)]
+        if estado["anos_min"] is not None:
+            out = out[out["anos_compania"] >= estado["anos_min"]]
+        if estado["anos_max"] is not None:
+            out = out[out["anos_compania"] <= estado["anos_max"]]
+    if estado["satisfaccion"] and "satisfaccion_entorno" in out.columns:
+        out = out[_mascara_categorica(out["satisfaccion_entorno"], estado["satisfaccion"])]
+    return out
+
+
+def _criterios_motor(estado: dict) -> dict:
+    desde, hasta = estado["score_desde"], estado["score_hasta"]
+    return {
+        "categorias": {"departamento": estado["departamentos"], "satisfaccion_entorno": estado["satisfaccion"]},
+        "rangos": {
+            "anos_compania": (estado["anos_min"], estado["anos_max"], True),
+            SCORING_COL: (desde if desde > float("-inf") else None, hasta if hasta < float("inf") else None, False),
+        },
+    }
+
+
+def _filtrar_motor(motor: MotorFiltros, df: pd.DataFrame, estado: dict, columns=None) -> pd.DataFrame:
+    return motor.filtrar(df, **_criterios_motor(estado), columns=columns)
+
+
+def _motor_aplica(motor: MotorFiltros | None, df: pd.DataFrame) -> bool:
+    return motor is not None and motor.n == len(df) and (motor.index is df.index or motor.index.equals(df.index))
+
+
+def get_filas_filtradas(df: pd.DataFrame):
+    """Posiciones de las filas de df que pasan los filtros del sidebar (None = todas), sin materializar filas."""
+    estado = get_estado_filtros()
+    motor = get_motor_filtros()
+    with medir("filtros (posiciones)") as info:
+        if _motor_aplica(motor, df):
+            posiciones = motor.seleccionar(**_criterios_motor(estado))
+        else:
+            posiciones = df.index.get_indexer(_filtrar_pandas(df, estado).index)
+            info["detalle"] = "pandas"
+        info["filas"] = len(df) if posiciones is None else len(posiciones)
+    return posiciones
+
+
+@cronometrado("resumen de distribución")
+def get_resumen_distribucion(cubo: CuboSegmentos, mascara, desde: float, hasta: float) -> dict:
+    """
+    Conteos por bin y estadísticos de boxplot de la selección del sidebar (ver graficos_distribucion.py),
+    guardados en la caché de filtros por estado y versión de datos.
+    """
+    from graficos_distribucion import resumen_distribucion
+
+    df = get_df_scoring(FILTER_COLUMNS + ("impacto_abandono",))
+    version = df.attrs.get("version_datos") if df is not None else None
+    clave = clave_canonica(tipo="distribucion", version=version, estado=get_estado_filtros()) if version else None
+    if clave is not None:
+        cached = get_cache_filtros().get(clave)
+        if cached is not None:
+            return cached
+    resumen = resumen_distribucion(cubo, mascara, desde, hasta)
+    if clave is not None:
+        get_cache_filtros().put(clave, resumen)
+    return resumen
+
+
+@cronometrado("factores del segmento")
+def get_factores_segmento(contribuciones) -> dict:
+    """
+    Contribución media por variable de la selección del sidebar, global y por departamento, guardada
+    en la caché de filtros por estado y versión de datos.
+    """
+    df = get_df_scoring(FILTER_COLUMNS + contribuciones.columnas)
+    version = df.attrs.get("version_datos")
+    clave = clave_canonica(tipo="factores", version=version, estado=get_estado_filtros()) if version else None
+    if clave is not None:
+        cached = get_cache_filtros().get(clave)
+        if cached is not None:
+            return cached
+    posiciones = get_filas_filtradas(df)
+    factores = {
+        "n": contribuciones.n if posiciones is None else len(posiciones),
+        "media": contribuciones.media(posiciones),
+        "por_departamento": contribuciones.media_por_departamento(posiciones),
+    }
+    if clave is not None:
+        get_cache_filtros().put(clave, factores)
+    return factores
+
+
+@cronometrado("get_df_filtrado")
+def get_df_filtrado(df: pd.DataFrame | None, columns: list[str] | tuple[str, ...] | None = None) -> pd.DataFrame | None:
+    """
+    Aplica los filtros del sidebar al DataFrame. Si df es None, devuelve None.
+    Usa el motor de índices cuando df tiene las filas del dataset cargado (mismo índice);
+    columns limita las columnas materializadas. El resultado es de solo lectura (puede compartir datos con df).
+    """
+    if df is None or df.empty:
+        return None
+    estado = get_estado_filtros()
+    version = df.attrs.get("version_datos")
+    clave = None
+    if version:
+        columnas = [c for c in df.columns if columns is None or c in columns]
+        clave = clave_canonica(tipo="filtrado", version=version, columnas=columnas, estado=estado)
+        cached = get_cache_filtros().get(clave)
+        if cached is not None:
+            return cached
+    motor = get_motor_filtros()
+    if _motor_aplica(motor, df):
+        out = _filtrar_motor(motor, df, estado, columns)
+    else:
+        out = _filtrar_pandas(df, estado)
+        out = out if columns is None else out[[c for c in out.columns if c in columns]]
+    if clave is not None:
+        get_cache_filtros().put(clave, out)
     return out
 
 
+def _admins() -> set[str]:
+    """Usuarios administradores: lista admins de secrets o DASHBOARD_ADMINS (separados por comas)."""
+    try:
+        if hasattr(st, "secrets") and st.secrets.get("admins"):
+            return {str(u) for u in st.secrets["admins"]}
+    except Exception:
+        pass
+    return {u.strip() for u in os.environ.get("DASHBOARD_ADMINS", "").split(",") if u.strip()}
+
+
+def es_admin() -> bool:
+    return bool(st.session_state.get("authenticated")) and st.session_state.get("username") in _admins()
+
+
 def ensure_authenticated():
     """Comprueba sesión. Si no está autenticado, muestra mensaje y detiene ejecución."""
     if not st.session_state.get("authenticated", False):
@@ -0,0 +1,88 @@
+"""
+Factores de riesgo por segmento a partir de las contribuciones precalculadas al puntuar
+(columnas contrib__<variable> del dataset con scoring, ver scripts/contribuciones.py).
+
+Las contribuciones se copian una vez por carga de datos a una matriz float32 contigua; cada consulta
+suma las filas que dejan pasar los filtros del sidebar (posiciones del motor de filtros), por bloques
+para no copiar la selección entera. No se recalcula ningún TreeSHAP en el dashboard.
+"""
+import numpy as np
+import pandas as pd
+
+CONTRIB_PREFIX = "contrib__"
+BLOQUE_FILAS = 262_144
+
+
+def columnas_contribucion(columnas) -> list[str]:
+    return [c for c in columnas if str(c).startswith(CONTRIB_PREFIX)]
+
+
+class ContribucionesSegmento:
+    """Matriz (empleados × variables) de contribuciones en log-odds y códigos de departamento."""
+
+    def __init__(self, df: pd.DataFrame, base: float | None = None):
+        columnas = columnas_contribucion(df.columns)
+        self.columnas = tuple(columnas)
+        self.variables = pd.Index([c[len(CONTRIB_PREFIX):] for c in columnas], name="variable")
+        self.base = base
+        self.index = df.index
+        self._matriz = np.ascontiguousarray(df[columnas].to_numpy(dtype=np.float32, na_value=np.nan))
+        self._total = np.nansum(self._matriz, axis=0, dtype=np.float64)
+        if "departamento" in df.columns:
+            self._dep, self.departamentos = pd.factorize(df["departamento"], sort=True)
+        else:
+            self._dep, self.departamentos = np.zeros(len(df), dtype=np.intp), pd.Index([])
+
+    @property
+    def n(self) -> int:
+        return len(self._matriz)
+
+    def media(self, posiciones: np.ndarray | None) -> pd.Series:
+        """Contribución media por variable de las filas en posiciones (None = todas)."""
+        if posiciones is None:
+            return pd.Series(self._total / max(self.n, 1), index=self.variables)
+        suma = np.zeros(len(self.variables), dtype=np.float64)
+        for start in range(0, len(posiciones), BLOQUE_FILAS):
+            suma += np.nansum(self._matriz[posiciones[start:start + BLOQUE_FILAS]], axis=0, dtype=np.float64)
+        return pd.Series(suma / max(len(posiciones), 1), index=self.variables)
+
+    def media_por_departamento(self, posiciones: np.ndarray | None) -> pd.DataFrame:
+        """Contribución media por variable (columnas) y departamento (filas) de las filas en posiciones."""
+        if posiciones is None:
+            posiciones = np.arange(self.n)
+        n_dep = len(self.departamentos)
+        suma = np.zeros((n_dep, len(self.variables)), dtype=np.float64)
+        cuenta = np.zeros(n_dep, dtype=np.int64)
+        for start in range(0, len(posiciones), BLOQUE_FILAS):
+            pos = posiciones[start:start + BLOQUE_FILAS]
+            dep = self._dep[pos]
+            ok = dep >= 0
+            bloque = np.nan_to_num(self._matriz[pos[ok]])
+            for j in range(bloque.shape[1]):
+                suma[:, j] += np.bincount(dep[ok], weights=bloque[:, j], minlength=n_dep)
+            cuenta += np.bincount(dep[ok], minlength=n_dep)
+        out = pd.DataFrame(suma / np.maximum(cuenta, 1)[:, None], index=self.departamentos, columns=self.variables)
+        return out[cuenta > 0]
+
+    def empleado(self, id_empleado) -> pd.Series | None:
+        """Contribuciones de un empleado por id, o None si no está."""
+        pos = self.index.get_indexer([id_empleado])[0]
+        if pos < 0:
+            return None
+        return pd.Series(self._matriz[pos].astype(np.float64), index=self.variables)
+
+
+def principales(contribuciones: pd.Series, top_n: int = 10) -> pd.DataFrame:
+    """Las top_n variables de mayor contribución absoluta, para el gráfico de barras."""
+    top = contribuciones.reindex(contribuciones.abs().sort_values(ascending=False).index[:top_n])
+    return pd.DataFrame({"variable": top.index, "contribucion": top.to_numpy(),
+                         "efecto": np.where(top.to_numpy() >= 0, "Sube el riesgo", "Baja el riesgo")})
+
+
+def factores_por_departamento(medias: pd.DataFrame, top_n: int = 3) -> pd.DataFrame:
+    """Por departamento, las top_n variables que más suben el riesgo, con su contribución media."""
+    filas = {}
+    for dep, fila in medias.iterrows():
+        top = fila.sort_values(ascending=False).head(top_n)
+        filas[dep] = {f"factor {i + 1}": f"{v} ({c:+.2f})" for i, (v, c) in enumerate(top.items()) if c > 0}
+    return pd.DataFrame.from_dict(filas, orient="index")
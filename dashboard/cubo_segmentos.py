@@ -0,0 +1,213 @@
+"""
+Cubo de agregados por segmento: departamento × años en compañía × satisfacción entorno.
+
+Se construye una vez por carga de datos. Los scores quedan ordenados dentro de cada celda, de modo
+que cualquier par de umbrales (y la banda del sidebar) se responde con búsqueda binaria y sumas
+acumuladas sobre unas cientos de celdas, sin volver a recorrer las filas. Con los mismos scores
+ordenados se obtienen los resúmenes de distribución de la página 3 (conteos por bin, cuartiles,
+bigotes y outliers por segmento) sin enviar las filas al gráfico.
+"""
+import numpy as np
+import pandas as pd
+
+DIMENSIONES = ("departamento", "anos_compania", "satisfaccion_entorno")
+
+# Rangos de antigüedad de la página de distribución
+BINS_ANOS = [0, 2, 5, 10, 15, 100]
+LABELS_ANOS = ["0-2", "2-5", "5-10", "10-15", "15+"]
+
+
+class CuboSegmentos:
+    """
+    Scores ordenados por celda (clave = celda * 2 + score, con score en [0, 1]) y sumas acumuladas
+    de score y de las columnas de valor. Las filas sin scoring no entran en el cubo.
+    """
+
+    def __init__(self, df: pd.DataFrame, score_col: str, valor_cols: tuple[str, ...] = ("impacto_abandono",)):
+        n = len(df)
+        codes = []
+        self.niveles: dict[str, pd.Index] = {}
+        for dim in DIMENSIONES:
+            if dim in df.columns:
+                c, uniques = pd.factorize(df[dim], sort=True, use_na_sentinel=False)
+            else:
+                c, uniques = np.zeros(n, dtype=np.intp), [np.nan]
+            codes.append(c)
+            self.niveles[dim] = pd.Index(uniques, name=dim)
+        self.shape = tuple(len(self.niveles[d]) for d in DIMENSIONES)
+        self.dimensiones = tuple(d for d in DIMENSIONES if d in df.columns)
+
+        cell = np.ravel_multi_index(codes, self.shape) if n else np.empty(0, dtype=np.intp)
+        score = df[score_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        ok = ~np.isnan(score)
+        key = cell[ok] * 2.0 + np.clip(score[ok], 0.0, 1.0)
+        order = np.argsort(key, kind="stable")
+        self._key = key[order]
+        self._cum = {"score": _cumsum0(score[ok][order])}
+        for col in valor_cols:
+            if col in df.columns:
+                v = df[col].to_numpy(dtype=np.float64, na_value=np.nan)[ok][order]
+                self._cum[col] = _cumsum0(np.nan_to_num(v, nan=0.0))
+        self._cells = np.arange(int(np.prod(self.shape)), dtype=np.float64) * 2.0
+
+    def tiene(self, columna: str) -> bool:
+        return columna in self._cum
+
+    def _pos(self, t, side: str = "left") -> np.ndarray:
+        # Fuera de [0, 1] basta con un desplazamiento dentro de la celda (scores ∈ [0, 1]);
+        # t puede ser un escalar o un valor por celda
+        return np.searchsorted(self._key, self._cells + np.clip(t, -0.5, 1.5), side=side)
+
+    def contar(self, desde: float = -np.inf, hasta: float = np.inf) -> np.ndarray:
+        """Nº de empleados con desde <= score < hasta, por celda (array con forma self.shape)."""
+        if desde >= hasta:
+            return np.zeros(self.shape, dtype=np.intp)
+        return (self._pos(hasta) - self._pos(desde)).reshape(self.shape)
+
+    def sumar(self, columna: str, desde: float = -np.inf, hasta: float = np.inf) -> np.ndarray:
+        """Suma de columna ('score' o una columna de valor) para desde <= score < hasta, por celda."""
+        if desde >= hasta:
+            return np.zeros(self.shape, dtype=np.float64)
+        cum = self._cum[columna]
+        return (cum[self._pos(hasta)] - cum[self._pos(desde)]).reshape(self.shape)
+
+    def histograma(self, mascara: np.ndarray, bordes: np.ndarray, desde: float = -np.inf,
+                   hasta: float = np.inf) -> np.ndarray:
+        """Nº de empleados por bin [bordes[i], bordes[i+1]) en las celdas de mascara (último bin cerrado)."""
+        bordes = np.asarray(bordes, dtype=np.float64)
+        limites = np.clip(bordes, desde, hasta)
+        sel = mascara.ravel()
+        acumulado = np.array([self._pos(b)[sel].sum() for b in limites[:-1]], dtype=np.int64)
+        ultimo = self._pos(limites[-1], side="right" if hasta > limites[-1] else "left")[sel].sum()
+        return np.diff(np.append(acumulado, ultimo))
+
+    def resumen_caja(self, mascara: np.ndarray, dimension: str, desde: float = -np.inf, hasta: float = np.inf,
+                     max_outliers: int = 200) -> pd.DataFrame:
+        """
+        Estadísticos de boxplot por nivel de dimension con los scores de las celdas de mascara en
+        [desde, hasta): n, q1, mediana, q3 (interpolación lineal, como numpy y plotly), bigotes (dato
+        más extremo dentro de 1,5 × IQR) y hasta max_outliers outliers por nivel (repartidos por rango,
+        incluidos los extremos) en la columna outliers. Exactos: selección del k-ésimo valor por
+        bisección sobre los scores ordenados de cada celda.
+        """
+        axis = DIMENSIONES.index(dimension)
+        grupo = np.unravel_index(np.arange(self._cells.size), self.shape)[axis]
+        sel = mascara.ravel()
+        n_grupos = self.shape[axis]
+        lo_t, hi_t = max(desde, -0.5), min(hasta, 1.5)
+        base = self._pos(lo_t)
+        fin = self._pos(hi_t)
+        n = np.bincount(grupo[sel], weights=(fin - base)[sel], minlength=n_grupos).astype(np.int64)
+
+        def menores(t_grupo: np.ndarray) -> np.ndarray:
+            t = np.clip(t_grupo[grupo], lo_t, hi_t)
+            return np.bincount(grupo[sel], weights=(self._pos(t) - base)[sel], minlength=n_grupos)
+
+        def primero_desde(t_grupo: np.ndarray) -> np.ndarray:
+            """Menor score >= t del grupo (dentro del intervalo)."""
+            p = self._pos(np.clip(t_grupo[grupo], lo_t, hi_t))
+            ok = sel & (p < fin)
+            out = np.full(n_grupos, np.nan)
+            vals = self._key[np.minimum(p, len(self._key) - 1)] - self._cells
+            np.fmin.at(out, grupo[ok], vals[ok])
+            return out
+
+        def ultimo_hasta(t_grupo: np.ndarray) -> np.ndarray:
+            """Mayor score <= t del grupo (dentro del intervalo)."""
+            p = np.minimum(self._pos(np.clip(t_grupo[grupo], lo_t, hi_t), side="right"), fin)
+            ok = sel & (p > base)
+            out = np.full(n_grupos, np.nan)
+            vals = self._key[np.maximum(p - 1, 0)] - self._cells
+            np.fmax.at(out, grupo[ok], vals[ok])
+            return out
+
+        def k_esimo(k: np.ndarray) -> np.ndarray:
+            lo, hi = np.full(n_grupos, float(lo_t)), np.full(n_grupos, float(hi_t))
+            for _ in range(60):
+                mid = (lo + hi) / 2
+                debajo = menores(mid) <= k
+                lo, hi = np.where(debajo, mid, lo), np.where(debajo, hi, mid)
+            return primero_desde(lo)
+
+        def cuantil(q: float) -> np.ndarray:
+            h = (np.maximum(n, 1) - 1) * q
+            a, b = k_esimo(np.floor(h)), k_esimo(np.ceil(h))
+            return a + (h - np.floor(h)) * (b - a)
+
+        q1, mediana, q3 = cuantil(0.25), cuantil(0.5), cuantil(0.75)
+        iqr = q3 - q1
+        valla_baja, valla_alta = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        bigote_bajo = primero_desde(np.nan_to_num(valla_baja, nan=lo_t))
+        bigote_alto = ultimo_hasta(np.nan_to_num(valla_alta, nan=hi_t))
+        outliers = [self._outliers(g, grupo, sel, base, fin, valla_baja[g], valla_alta[g])
+                    if n[g] else np.empty(0) for g in range(n_grupos)]
+        out = pd.DataFrame({
+            "n": n, "q1": q1, "mediana": mediana, "q3": q3,
+            "bigote_bajo": bigote_bajo, "bigote_alto": bigote_alto,
+            "n_outliers": [len(o) for o in outliers],
+        }, index=self.niveles[dimension])
+        out["outliers"] = [_muestra_por_rango(o, max_outliers) for o in outliers]
+        return out[out["n"] > 0]
+
+    def _outliers(self, g: int, grupo, sel, base, fin, valla_baja: float, valla_alta: float) -> np.ndarray:
+        """Scores del grupo g fuera de [valla_baja, valla_alta], ordenados."""
+        celdas = np.flatnonzero(sel & (grupo == g))
+        bajo = self._pos(valla_baja)[celdas]
+        alto = self._pos(valla_alta, side="right")[celdas]
+        partes = []
+        for c, b0, b1, a0, a1 in zip(celdas, base[celdas], np.minimum(bajo, fin[celdas]),
+                                     np.maximum(alto, base[celdas]), fin[celdas]):
+            if b1 > b0:
+                partes.append(self._key[b0:b1] - self._cells[c])
+            if a1 > a0:
+                partes.append(self._key[a0:a1] - self._cells[c])
+        return np.sort(np.concatenate(partes)) if partes else np.empty(0)
+
+    def mascara(self, departamentos=None, satisfaccion=None, anos_min=None, anos_max=None) -> np.ndarray:
+        """
+        Celdas que pasan los filtros del sidebar (mismas reglas que get_df_filtrado: selección por
+        texto en categóricas, rango cerrado en años; sin valor de años no pasa un filtro de años).
+        """
+        m_dep = _mascara_texto(self.niveles["departamento"], departamentos)
+        m_sat = _mascara_texto(self.niveles["satisfaccion_entorno"], satisfaccion)
+        anos = self.niveles["anos_compania"]
+        m_anos = np.ones(len(anos), dtype=bool)
+        if "anos_compania" in self.dimensiones:
+            vals = pd.to_numeric(pd.Series(anos), errors="coerce").to_numpy(dtype=np.float64)
+            if anos_min is not None:
+                m_anos &= vals >= anos_min
+            if anos_max is not None:
+                m_anos &= vals <= anos_max
+        return m_dep[:, None, None] & m_anos[None, :, None] & m_sat[None, None, :]
+
+    def por_dimension(self, valores: np.ndarray, mascara: np.ndarray, dimension: str) -> pd.Series:
+        """Agrega valores por celda (ya filtrados por mascara) sobre una dimensión."""
+        axis = DIMENSIONES.index(dimension)
+        otros = tuple(i for i in range(len(DIMENSIONES)) if i != axis)
+        return pd.Series(np.where(mascara, valores, 0).sum(axis=otros), index=self.niveles[dimension])
+
+    def por_rango_anos(self, valores: np.ndarray, mascara: np.ndarray) -> pd.Series:
+        """Agrega valores por rango de antigüedad (BINS_ANOS / LABELS_ANOS)."""
+        por_anos = self.por_dimension(valores, mascara, "anos_compania")
+        rangos = pd.cut(pd.to_numeric(pd.Series(por_anos.index), errors="coerce"),
+                        bins=BINS_ANOS, labels=LABELS_ANOS, include_lowest=True)
+        return pd.Series(por_anos.to_numpy()).groupby(rangos.values, observed=True).sum()
+
+
+def _muestra_por_rango(valores: np.ndarray, maximo: int) -> np.ndarray:
+    """Hasta maximo valores (ordenados) repartidos uniformemente por rango, incluidos mínimo y máximo."""
+    if len(valores) <= maximo:
+        return valores
+    return valores[np.unique(np.linspace(0, len(valores) - 1, maximo).round().astype(np.intp))]
+
+
+def _cumsum0(values: np.ndarray) -> np.ndarray:
+    out = np.zeros(len(values) + 1, dtype=np.float64)
+    np.cumsum(values, out=out[1:])
+    return out
+
+
+def _mascara_texto(niveles: pd.Index, seleccion) -> np.ndarray:
+    if not seleccion:
+        return np.ones(len(niveles), dtype=bool)
+    return pd.Index(niveles).astype(str).isin([str(s) for s in seleccion])
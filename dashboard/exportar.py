@@ -0,0 +1,120 @@
+"""
+Exportación de la lista de candidatos de "Scoring y datos" a CSV, Excel o Parquet.
+
+El archivo se genera solo al pedirlo, en un archivo temporal en disco y por bloques de CHUNK_FILAS
+filas con las mismas filas, orden y columnas que la tabla en pantalla (TablaScoring.pagina). Así la
+memoria depende del tamaño del bloque y no del número de candidatos. Excel usa openpyxl en modo
+write_only (opcional: si no está instalado el formato no se ofrece).
+"""
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CHUNK_FILAS = 50_000
+MAX_FILAS_EXCEL = 1_048_575  # límite de filas de una hoja, sin la cabecera
+DIR_EXPORTACIONES = Path(tempfile.gettempdir()) / "churn_exportaciones"
+MAX_EDAD_S = 3600
+
+FORMATOS = {
+    "CSV": ("csv", "text/csv"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def formatos_disponibles() -> list[str]:
+    disponibles = ["CSV"]
+    try:
+        import openpyxl  # noqa: F401
+
+        disponibles.append("Excel")
+    except ImportError:
+        pass
+    try:
+        import pyarrow.parquet  # noqa: F401
+
+        disponibles.append("Parquet")
+    except ImportError:
+        pass
+    return disponibles
+
+
+def bloques(tabla, df: pd.DataFrame, posiciones: np.ndarray, th_low: float, th_high: float,
+            chunk: int = CHUNK_FILAS):
+    """Bloques consecutivos de la tabla ordenada (mismas columnas y banda que en pantalla)."""
+    for i in range((len(posiciones) + chunk - 1) // chunk):
+        yield tabla.pagina(df, posiciones, i, chunk, th_low, th_high)
+
+
+def exportar(tabla, df: pd.DataFrame, posiciones: np.ndarray, th_low: float, th_high: float,
+             formato: str, destino: Path, chunk: int = CHUNK_FILAS) -> int:
+    """Escribe los candidatos de posiciones en destino con el formato indicado. Devuelve los bytes escritos."""
+    partes = bloques(tabla, df, posiciones, th_low, th_high, chunk)
+    if formato == "CSV":
+        _exportar_csv(partes, destino)
+    elif formato == "Parquet":
+        _exportar_parquet(partes, destino)
+    elif formato == "Excel":
+        if len(posiciones) > MAX_FILAS_EXCEL:
+            raise ValueError(f"Excel admite hasta {MAX_FILAS_EXCEL:,} filas; hay {len(posiciones):,}. Use CSV o Parquet.")
+        _exportar_excel(partes, destino)
+    else:
+        raise ValueError(f"Formato desconocido: {formato}")
+    return Path(destino).stat().st_size
+
+
+def _exportar_csv(partes, destino: Path) -> None:
+    # utf-8-sig: BOM para que Excel abra bien los acentos (igual que la descarga anterior)
+    with open(destino, "w", encoding="utf-8-sig", newline="") as f:
+        for i, bloque in enumerate(partes):
+            bloque.to_csv(f, header=i == 0, index=True)
+
+
+def _exportar_parquet(partes, destino: Path) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for bloque in partes:
+            if writer is None:
+                tabla = pa.Table.from_pandas(bloque, preserve_index=True)
+                writer = pq.ParquetWriter(str(destino), tabla.schema)
+            else:
+                tabla = pa.Table.from_pandas(bloque, schema=writer.schema, preserve_index=True)
+            writer.write_table(tabla)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _exportar_excel(partes, destino: Path) -> None:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Candidatos")
+    for i, bloque in enumerate(partes):
+        if i == 0:
+            ws.append([bloque.index.name or "id"] + [str(c) for c in bloque.columns])
+        valores = bloque.reset_index().astype(object)
+        valores = valores.where(valores.notna(), None)
+        for fila in valores.itertuples(index=False, name=None):
+            ws.append(list(fila))
+    wb.save(str(destino))
+
+
+def ruta_exportacion(extension: str) -> Path:
+    """Archivo temporal nuevo para una exportación; borra los de más de MAX_EDAD_S segundos."""
+    DIR_EXPORTACIONES.mkdir(parents=True, exist_ok=True)
+    limite = time.time() - MAX_EDAD_S
+    for viejo in DIR_EXPORTACIONES.glob("*"):
+        try:
+            if viejo.stat().st_mtime < limite:
+                viejo.unlink()
+        except OSError:
+            continue
+    return DIR_EXPORTACIONES / f"{uuid.uuid4().hex}.{extension}"
@@ -0,0 +1,56 @@
+"""
+Gráficos de la página "Distribución y riesgo" a partir de resúmenes del cubo de segmentos
+(CuboSegmentos.histograma y resumen_caja): el tamaño de la figura no depende del número de empleados.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from cubo_segmentos import CuboSegmentos
+
+# Bins fijos del histograma de scoring (20 de ancho 0,05 en [0, 1])
+BORDES_HISTOGRAMA = np.linspace(0.0, 1.0, 21)
+MAX_OUTLIERS = 200
+
+
+def resumen_distribucion(cubo: CuboSegmentos, mascara: np.ndarray, desde: float, hasta: float) -> dict:
+    """Conteos por bin y, si hay departamento, estadísticos de boxplot por departamento."""
+    resumen = {"conteos": cubo.histograma(mascara, BORDES_HISTOGRAMA, desde, hasta), "caja": None}
+    if "departamento" in cubo.dimensiones:
+        caja = cubo.resumen_caja(mascara, "departamento", desde, hasta, MAX_OUTLIERS)
+        resumen["caja"] = caja[caja.index.notna()]
+    return resumen
+
+
+def figura_histograma(conteos: np.ndarray, th_low: float, th_high: float) -> go.Figure:
+    bordes = BORDES_HISTOGRAMA
+    fig = go.Figure(go.Bar(
+        x=(bordes[:-1] + bordes[1:]) / 2, y=conteos, width=np.diff(bordes),
+        hovertemplate="Scoring %{customdata[0]:.2f}–%{customdata[1]:.2f}<br>Empleados: %{y}<extra></extra>",
+        customdata=np.column_stack([bordes[:-1], bordes[1:]]),
+    ))
+    fig.update_layout(bargap=0, xaxis_title="Scoring abandono", yaxis_title="Empleados")
+    fig.add_vline(x=th_low, line_dash="dash", line_color="gray", annotation_text=f"Medio {th_low}")
+    fig.add_vline(x=th_high, line_dash="dash", line_color="orange", annotation_text=f"Alto {th_high}")
+    return fig
+
+
+def figura_caja(caja: pd.DataFrame) -> go.Figure:
+    """Boxplot por departamento desde estadísticos precalculados, ordenado por mediana descendente."""
+    caja = caja.sort_values("mediana", ascending=False)
+    nombres = [str(d) for d in caja.index]
+    fig = go.Figure(go.Box(
+        x=nombres, q1=caja["q1"], median=caja["mediana"], q3=caja["q3"],
+        lowerfence=caja["bigote_bajo"], upperfence=caja["bigote_alto"],
+        name="scoring", boxpoints=False, showlegend=False,
+    ))
+    x_out = [n for n, o in zip(nombres, caja["outliers"]) for _ in range(len(o))]
+    if x_out:
+        fig.add_trace(go.Scatter(
+            x=x_out, y=np.concatenate(caja["outliers"].tolist()), mode="markers", showlegend=False,
+            marker={"size": 4, "opacity": 0.7},
+            hovertemplate="%{x}<br>Scoring: %{y:.3f}<extra>outlier</extra>",
+        ))
+    fig.update_layout(title="Boxplot por departamento", xaxis_title="departamento", yaxis_title="Scoring abandono",
+                      xaxis={"categoryorder": "array", "categoryarray": nombres})
+    return fig
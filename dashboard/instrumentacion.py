@@ -0,0 +1,128 @@
+"""
+Instrumentación ligera de los tramos costosos del dashboard: carga de artefactos, filtrado,
+agregados por segmento y construcción de figuras.
+
+medir("etapa") (context manager) y cronometrado("etapa") (decorador) anotan la duración, las filas
+procesadas y la página/rerun en curso en un registro en memoria del proceso (últimos MAX_REGISTROS,
+compartido entre sesiones). La página "Rendimiento" muestra percentiles recientes por etapa. Si se
+activa la exportación, cada medición se añade además como una línea JSON a un archivo.
+El coste por medición es un perf_counter y un append bajo lock.
+"""
+import contextvars
+import functools
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MAX_REGISTROS = 5000
+PERCENTILES = (50, 90, 99)
+
+_pagina: contextvars.ContextVar[str | None] = contextvars.ContextVar("pagina", default=None)
+_rerun: contextvars.ContextVar[str | None] = contextvars.ContextVar("rerun", default=None)
+
+
+class RegistroTiempos:
+    def __init__(self, max_registros: int = MAX_REGISTROS):
+        self._registros: deque[dict] = deque(maxlen=max_registros)
+        self._lock = threading.Lock()
+        self.ruta_jsonl: Path | None = None
+
+    def anotar(self, etapa: str, segundos: float, filas: int | None = None, detalle: str | None = None) -> None:
+        registro = {
+            "ts": time.time(), "pagina": _pagina.get(), "rerun": _rerun.get(), "etapa": etapa,
+            "ms": segundos * 1000.0, "filas": filas, "detalle": detalle,
+        }
+        with self._lock:
+            self._registros.append(registro)
+            ruta = self.ruta_jsonl
+            if ruta is not None:
+                with open(ruta, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    def exportar_a(self, ruta: Path | None) -> None:
+        """Activa (ruta) o desactiva (None) la escritura de cada medición como línea JSON."""
+        if ruta is not None:
+            Path(ruta).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self.ruta_jsonl = Path(ruta) if ruta is not None else None
+
+    def registros(self, desde_ts: float | None = None) -> pd.DataFrame:
+        with self._lock:
+            datos = list(self._registros)
+        df = pd.DataFrame(datos, columns=["ts", "pagina", "rerun", "etapa", "ms", "filas", "detalle"])
+        return df if desde_ts is None else df[df["ts"] >= desde_ts]
+
+    def percentiles(self, desde_ts: float | None = None) -> pd.DataFrame:
+        return resumen_percentiles(self.registros(desde_ts))
+
+    def vaciar(self) -> None:
+        with self._lock:
+            self._registros.clear()
+
+
+REGISTRO = RegistroTiempos()
+
+
+def resumen_percentiles(registros: pd.DataFrame) -> pd.DataFrame:
+    """Por etapa: n, percentiles de ms, máximo y mediana de filas, de la más lenta (p99) a la más rápida."""
+    columnas = ["etapa", "n"] + [f"p{p}_ms" for p in PERCENTILES] + ["max_ms", "filas_p50"]
+    if registros.empty:
+        return pd.DataFrame(columns=columnas)
+    filas = []
+    for etapa, grupo in registros.groupby("etapa", sort=False):
+        ms = grupo["ms"].to_numpy(dtype=np.float64)
+        n_filas = pd.to_numeric(grupo["filas"], errors="coerce").dropna()
+        fila = {"etapa": etapa, "n": len(ms)}
+        fila.update({f"p{p}_ms": v for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES))})
+        fila["max_ms"] = ms.max()
+        fila["filas_p50"] = float(n_filas.median()) if len(n_filas) else np.nan
+        filas.append(fila)
+    return pd.DataFrame(filas, columns=columnas).sort_values(columnas[-3], ascending=False, ignore_index=True)
+
+
+def iniciar_rerun(pagina: str) -> None:
+    """Etiqueta las mediciones siguientes de este rerun con la página y un id de rerun."""
+    _pagina.set(pagina)
+    _rerun.set(uuid.uuid4().hex[:8])
+
+
+def rerun_actual() -> str | None:
+    """Id del rerun en curso en este hilo (None fuera de un rerun)."""
+    return _rerun.get()
+
+
+def _filas(valor) -> int | None:
+    if isinstance(valor, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(valor)
+    return None
+
+
+@contextmanager
+def medir(etapa: str, filas: int | None = None, detalle: str | None = None):
+    """Mide el bloque; el dict devuelto admite fijar "filas" y "detalle" dentro del bloque."""
+    info = {"filas": filas, "detalle": detalle}
+    t0 = time.perf_counter()
+    try:
+        yield info
+    finally:
+        REGISTRO.anotar(etapa, time.perf_counter() - t0, info["filas"], info["detalle"])
+
+
+def cronometrado(etapa: str):
+    """Decorador: mide cada llamada; las filas se toman del resultado si es un DataFrame/array."""
+    def decorador(fn):
+        @functools.wraps(fn)
+        def envoltura(*args, **kwargs):
+            t0 = time.perf_counter()
+            resultado = fn(*args, **kwargs)
+            REGISTRO.anotar(etapa, time.perf_counter() - t0, _filas(resultado))
+            return resultado
+        return envoltura
+    return decorador
@@ -0,0 +1,87 @@
+"""
+Motor de filtros por índices para los filtros globales del sidebar.
+
+Se construye una vez por dataset cargado:
+  - categóricas (departamento, satisfacción): código de categoría → bitmap de filas (bits empaquetados);
+  - rangos (años en compañía, scoring): posiciones de fila ordenadas por valor.
+Cada filtrado combina bitmaps (OR dentro de una categórica, AND entre filtros), obtiene las
+posiciones seleccionadas y materializa solo las columnas que pide la página.
+"""
+import numpy as np
+import pandas as pd
+
+CATEGORICAS = ("departamento", "satisfaccion_entorno")
+
+
+class MotorFiltros:
+    def __init__(self, df: pd.DataFrame, rangos: tuple[str, ...]):
+        self.n = len(df)
+        self.index = df.index
+        self._bitmaps: dict[str, dict[str, np.ndarray]] = {}
+        for col in CATEGORICAS:
+            if col not in df.columns:
+                continue
+            codes, niveles = pd.factorize(df[col], use_na_sentinel=True)
+            order = np.argsort(codes, kind="stable")
+            limites = np.searchsorted(codes[order], np.arange(len(niveles) + 1))
+            self._bitmaps[col] = {
+                str(nivel): self._bitmap(order[limites[i]:limites[i + 1]]) for i, nivel in enumerate(niveles)
+            }
+        self._rangos: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for col in rangos:
+            if col not in df.columns:
+                continue
+            vals = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            order = np.argsort(vals, kind="stable")  # NaN al final
+            n_validos = int((~np.isnan(vals)).sum())
+            self._rangos[col] = (vals[order][:n_validos], order[:n_validos])
+
+    def _bitmap(self, posiciones: np.ndarray) -> np.ndarray:
+        mask = np.zeros(self.n, dtype=bool)
+        mask[posiciones] = True
+        return np.packbits(mask)
+
+    def _bitmap_rango(self, col: str, desde: float, hasta: float, incluye_hasta: bool) -> np.ndarray | None:
+        if desde is None and hasta is None:
+            return None
+        vals, order = self._rangos[col]
+        lo = np.searchsorted(vals, desde, side="left") if desde is not None else 0
+        hi = np.searchsorted(vals, hasta, side="right" if incluye_hasta else "left") if hasta is not None else len(vals)
+        if lo == 0 and hi == len(vals) == self.n:
+            return None  # el rango no descarta ninguna fila
+        return self._bitmap(order[lo:hi])
+
+    def seleccionar(self, categorias: dict[str, list], rangos: dict[str, tuple]) -> np.ndarray | None:
+        """
+        Posiciones (ordenadas) de las filas que pasan todos los filtros, o None si ninguno descarta filas.
+        categorias: {columna: valores elegidos (comparados como texto)}; lista vacía = todos.
+        rangos: {columna: (desde, hasta, incluye_hasta)}; None en un extremo = sin límite.
+        """
+        acumulado = None
+        for col, valores in categorias.items():
+            if not valores or col not in self._bitmaps:
+                continue
+            bm = np.zeros((self.n + 7) // 8, dtype=np.uint8)
+            for v in valores:
+                nivel = self._bitmaps[col].get(str(v))
+                if nivel is not None:
+                    bm |= nivel
+            acumulado = bm if acumulado is None else acumulado & bm
+        for col, (desde, hasta, incluye_hasta) in rangos.items():
+            if col not in self._rangos:
+                continue
+            bm = self._bitmap_rango(col, desde, hasta, incluye_hasta)
+            if bm is not None:
+                acumulado = bm if acumulado is None else acumulado & bm
+        if acumulado is None:
+            return None
+        return np.flatnonzero(np.unpackbits(acumulado, count=self.n))
+
+    def filtrar(self, df: pd.DataFrame, categorias: dict[str, list], rangos: dict[str, tuple],
+                columns: list[str] | None = None) -> pd.DataFrame:
+        """Aplica la selección a df (mismas filas y orden que el dataset indexado)."""
+        cols = df.columns if columns is None else df.columns[df.columns.isin(list(columns))]
+        filas = self.seleccionar(categorias, rangos)
+        if filas is None:
+            return df if len(cols) == len(df.columns) else df[cols]
+        return df.iloc[filas, df.columns.get_indexer(cols)]
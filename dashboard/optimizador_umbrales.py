@@ -0,0 +1,123 @@
+"""
+Umbrales de riesgo que maximizan el valor esperado de las intervenciones de retención.
+
+Dos niveles de intervención: alto riesgo (score >= umbral alto, más cara y más eficaz) y riesgo
+medio (umbral medio <= score < umbral alto). Con las etiquetas históricas (abandono) y el impacto de
+cada empleado, intervenir a un empleado vale:
+
+    abandono * tasa_retencion * impacto_abandono - coste_intervencion
+
+Los scores se ordenan una vez por carga de datos (global y por departamento). Cada consulta es una
+pasada con sumas acumuladas: el valor de intervenir a los k primeros en un nivel es una suma
+acumulada, y el mejor par (alto, medio) sale de un máximo acumulado, sin recorrer pares de umbrales.
+Solo son umbrales candidatos los cortes entre scores distintos (empates quedan del mismo lado).
+"""
+import numpy as np
+import pandas as pd
+
+from cubo_segmentos import _cumsum0
+
+# Valores por defecto del sidebar (misma unidad que impacto_abandono)
+COSTE_ALTO = 2000.0
+RETENCION_ALTO = 0.5
+COSTE_MEDIO = 300.0
+RETENCION_MEDIO = 0.2
+
+COLUMNAS = ("umbral_alto", "umbral_medio", "valor", "n_alto", "tp_alto", "fp_alto", "n_medio", "tp_medio", "fp_medio")
+
+
+class OptimizadorUmbrales:
+    """
+    Scores ordenados (descendente) con su etiqueta y su impacto, global y por departamento. Las filas
+    sin scoring o sin etiqueta no entran; un impacto ausente o negativo (sin salario) cuenta como 0.
+    """
+
+    def __init__(self, df: pd.DataFrame, score_col: str, label_col: str = "abandono",
+                 impacto_col: str = "impacto_abandono"):
+        score = df[score_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        y = pd.to_numeric(df[label_col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        ok = ~np.isnan(score) & ~np.isnan(y)
+        if impacto_col in df.columns:
+            impacto = df[impacto_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            impacto = np.zeros(len(df))
+        # Beneficio máximo de retener a cada empleado (0 si no abandonó)
+        ganancia = np.where(y > 0, np.clip(np.nan_to_num(impacto, nan=0.0), 0.0, None), 0.0)[ok]
+        score, y = score[ok], (y[ok] > 0)
+
+        orden = np.argsort(-score, kind="stable")
+        self._global = _ordenado(score[orden], y[orden], ganancia[orden])
+
+        self.departamentos = pd.Index([], name="departamento")
+        self._grupos: list[tuple[int, int]] = []
+        if "departamento" in df.columns:
+            codes, niveles = pd.factorize(df["departamento"].to_numpy()[ok], sort=True)
+            orden = np.lexsort((-score, codes))
+            cortes = np.searchsorted(codes[orden], np.arange(len(niveles) + 1))
+            self.departamentos = pd.Index(niveles, name="departamento")
+            self._grupos = list(zip(cortes[:-1], cortes[1:]))
+            self._dep = _ordenado(score[orden], y[orden], ganancia[orden])
+
+    @property
+    def n(self) -> int:
+        return len(self._global["score"])
+
+    def curva(self, coste: float, retencion: float) -> pd.DataFrame:
+        """TP, FP y valor esperado de intervenir a todos con score >= umbral, para cada umbral candidato."""
+        g = self._global
+        k = np.flatnonzero(g["validos"][1:]) + 1
+        valor = _cumsum0(g["ganancia"] * retencion - coste)
+        tp = g["tp"]
+        return pd.DataFrame({"umbral": g["score"][k - 1], "intervenidos": k, "tp": tp[k].astype(np.int64),
+                             "fp": (k - tp[k]).astype(np.int64), "valor": valor[k]})
+
+    def optimizar(self, coste_alto: float = COSTE_ALTO, retencion_alto: float = RETENCION_ALTO,
+                  coste_medio: float = COSTE_MEDIO, retencion_medio: float = RETENCION_MEDIO) -> dict:
+        """
+        Par de umbrales (alto, medio) de máximo valor esperado, global (dict) y por departamento
+        (DataFrame con las columnas de COLUMNAS). Umbral None = no conviene intervenir en ese nivel
+        (umbral_medio == umbral_alto si el nivel medio queda vacío).
+        """
+        params = (coste_alto, retencion_alto, coste_medio, retencion_medio)
+        resultado = {"global": dict(zip(COLUMNAS, _optimo(self._global, 0, self.n, *params)))}
+        filas = [_optimo(self._dep, a, b, *params) for a, b in self._grupos]
+        resultado["departamentos"] = pd.DataFrame(filas, index=self.departamentos, columns=list(COLUMNAS))
+        return resultado
+
+
+def _ordenado(score: np.ndarray, y: np.ndarray, ganancia: np.ndarray) -> dict:
+    # Los cortes válidos y los TP acumulados no dependen de costes ni tasas: se calculan una vez
+    return {"score": score, "y": y, "ganancia": ganancia, "validos": _validos(score), "tp": _cumsum0(y)}
+
+
+def _validos(score: np.ndarray) -> np.ndarray:
+    """validos[k]: se puede cortar tras los k primeros (k = 0..n) sin separar scores empatados."""
+    validos = np.ones(len(score) + 1, dtype=bool)
+    validos[1:-1] = score[:-1] > score[1:]
+    return validos
+
+
+def _optimo(datos: dict, a: int, b: int, coste_alto: float, retencion_alto: float,
+            coste_medio: float, retencion_medio: float) -> tuple:
+    """
+    Mejor (j, k) con j <= k: los j primeros en alto riesgo y del j al k en riesgo medio.
+    valor(j, k) = A[j] + M[k] - M[j], con A y M las sumas acumuladas de cada nivel; para cada k el
+    mejor j es el máximo acumulado de A - M.
+    """
+    score, ganancia = datos["score"][a:b], datos["ganancia"][a:b]
+    validos = _validos(score) if a or b < len(datos["score"]) else datos["validos"]
+    acum_alto = _cumsum0(ganancia * retencion_alto - coste_alto)
+    acum_medio = _cumsum0(ganancia * retencion_medio - coste_medio)
+    d = np.where(validos, acum_alto - acum_medio, -np.inf)
+    mejor_d = np.maximum.accumulate(d)
+    nuevo = d > np.concatenate(([-np.inf], mejor_d[:-1]))
+    arg_d = np.maximum.accumulate(np.where(nuevo, np.arange(len(d)), 0))
+    valor = np.where(validos, acum_medio + mejor_d, -np.inf)
+    k = int(np.argmax(valor))  # ante empates, el corte con menos intervenciones
+    j = int(arg_d[k])
+    tp = datos["tp"][a:b + 1] - datos["tp"][a]
+    umbral_alto = float(score[j - 1]) if j else None
+    umbral_medio = float(score[k - 1]) if k > j else umbral_alto
+    tp_alto, tp_medio = int(tp[j]), int(tp[k] - tp[j])
+    return (umbral_alto, umbral_medio, float(valor[k]), j, tp_alto, j - tp_alto,
+            k - j, tp_medio, k - j - tp_medio)
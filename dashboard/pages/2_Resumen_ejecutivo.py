@@ -1,5 +1,6 @@
 """
-Resumen Ejecutivo: KPIs, gráfico de bandas, importancia de variables y costos de intervención.
+Resumen Ejecutivo: KPIs, gráfico de bandas, importancia de variables, factores de riesgo del segmento
+y costos de intervención.
 """
 import streamlit as st
 import pandas as pd
@@ -8,50 +9,74 @@ from common import (
     ensure_authenticated,
     get_manifest,
     get_df_scoring,
-    get_pipeline,
-    get_preprocessor,
+    get_feature_importances,
+    get_contribuciones,
+    get_factores_segmento,
     render_sidebar_filters,
-    get_df_filtrado,
     get_umbrales_riesgo,
+    get_intervalo_banda,
+    get_cubo_segmentos,
+    get_mascara_cubo,
     SCORING_COL,
+    FILTER_COLUMNS,
 )
+from instrumentacion import iniciar_rerun, medir
 
 ensure_authenticated()
+iniciar_rerun("Resumen ejecutivo")
 manifest = get_manifest()
-df_raw = get_df_scoring()
+df_raw = get_df_scoring(FILTER_COLUMNS + ("impacto_abandono",))
 render_sidebar_filters(df_raw)
-df = get_df_filtrado(df_raw)
+cubo = get_cubo_segmentos()
 
 st.title("Resumen Ejecutivo")
-if df is None or df.empty:
-    st.warning("Cargue `df_con_scoring.pkl` en artifacts/modeling/ para ver KPIs y costos de intervención.")
+if cubo is None:
+    if df_raw is not None and not df_raw.empty and SCORING_COL not in df_raw.columns:
+        st.error("El DataFrame no tiene la columna de scoring.")
+    else:
+        st.warning("Cargue `df_con_scoring.pkl` en artifacts/modeling/ para ver KPIs y costos de intervención.")
     st.stop()
 
-if SCORING_COL not in df.columns:
-    st.error("El DataFrame no tiene la columna de scoring.")
+# KPIs desde el cubo de segmentos: celdas que pasan los filtros ∩ intervalo de la banda elegida
+th_low, th_high = get_umbrales_riesgo()
+mascara = get_mascara_cubo(cubo)
+desde, hasta = get_intervalo_banda()
+
+
+def _en_banda(a: float, b: float) -> tuple[float, float]:
+    return max(a, desde), min(b, hasta)
+
+
+def _contar(a: float = float("-inf"), b: float = float("inf")) -> int:
+    return int(cubo.contar(*_en_banda(a, b))[mascara].sum())
+
+
+total = _contar()
+if total == 0:
+    st.warning("Cargue `df_con_scoring.pkl` en artifacts/modeling/ para ver KPIs y costos de intervención.")
     st.stop()
+with medir("KPIs desde el cubo"):
+    alto = _contar(th_high)
+    medio = _contar(th_low, th_high)
+    bajo = _contar(b=th_low)
+    pct_alto = (alto / total * 100) if total else 0
 
-th_low, th_high = get_umbrales_riesgo()
-total = len(df)
-alto = (df[SCORING_COL] >= th_high).sum()
-medio = ((df[SCORING_COL] >= th_low) & (df[SCORING_COL] < th_high)).sum()
-bajo = (df[SCORING_COL] < th_low).sum()
-pct_alto = (alto / total * 100) if total else 0
-
-# Impacto abandono solo para alto riesgo
-impacto_alto_riesgo = None
-if "impacto_abandono" in df.columns:
-    impacto_alto_riesgo = df.loc[df[SCORING_COL] >= th_high, "impacto_abandono"].sum()
-
-# Riesgo promedio (scoring medio)
-riesgo_promedio = df[SCORING_COL].mean()
-
-# Departamento con más riesgo (% en alto riesgo)
-depto_mas_riesgo = None
-if "departamento" in df.columns and total > 0:
-    pct_alto_por_dept = df.groupby("departamento", dropna=False)[SCORING_COL].apply(lambda s: (s >= th_high).mean() * 100)
-    if len(pct_alto_por_dept) > 0:
-        depto_mas_riesgo = pct_alto_por_dept.idxmax()
+    # Impacto abandono solo para alto riesgo
+    impacto_alto_riesgo = None
+    if cubo.tiene("impacto_abandono"):
+        impacto_alto_riesgo = float(cubo.sumar("impacto_abandono", *_en_banda(th_high, float("inf")))[mascara].sum())
+
+    # Riesgo promedio (scoring medio)
+    riesgo_promedio = float(cubo.sumar("score", desde, hasta)[mascara].sum()) / total
+
+    # Departamento con más riesgo (% en alto riesgo)
+    depto_mas_riesgo = None
+    if "departamento" in cubo.dimensiones:
+        tot_dep = cubo.por_dimension(cubo.contar(desde, hasta), mascara, "departamento")
+        alto_dep = cubo.por_dimension(cubo.contar(*_en_banda(th_high, float("inf"))), mascara, "departamento")
+        pct_alto_por_dept = (alto_dep[tot_dep > 0] / tot_dep[tot_dep > 0] * 100)
+        if len(pct_alto_por_dept) > 0:
+            depto_mas_riesgo = pct_alto_por_dept.idxmax()
 
 # KPIs
 st.subheader("KPIs")
@@ -75,68 +100,59 @@ with col_bandas:
         "Banda": [f"Bajo (<{th_low})", f"Riesgo medio ({th_low}–{th_high})", f"Alto (≥{th_high})"],
         "Empleados": [bajo, medio, alto],
     })
-    fig_bandas = px.bar(df_bandas, x="Banda", y="Empleados", color="Empleados", color_continuous_scale="Blues")
-    fig_bandas.update_traces(
-        hovertemplate="<b>%{x}</b><br>Empleados: %{y}<br>Representa el número de empleados en esta banda de riesgo según su scoring.<extra></extra>"
-    )
-    fig_bandas.update_layout(title="Distribución por banda de riesgo")
+    with medir("figura bandas"):
+        fig_bandas = px.bar(df_bandas, x="Banda", y="Empleados", color="Empleados", color_continuous_scale="Blues")
+        fig_bandas.update_traces(
+            hovertemplate="<b>%{x}</b><br>Empleados: %{y}<br>Representa el número de empleados en esta banda de riesgo según su scoring.<extra></extra>"
+        )
+        fig_bandas.update_layout(title="Distribución por banda de riesgo")
     st.plotly_chart(fig_bandas, use_container_width=True)
 
 with col_imp:
-    df_imp = None
-    best = (manifest or {}).get("best_model", {})
-    imp_list = (best.get("feature_importances") or (manifest or {}).get("feature_importances") or [])
-    if isinstance(imp_list, list) and len(imp_list) > 0:
-        if isinstance(imp_list[0], dict):
-            df_imp = pd.DataFrame(imp_list)
-            if "variable" in df_imp.columns and "importancia" in df_imp.columns:
-                df_imp = df_imp.nlargest(15, "importancia").sort_values("importancia", ascending=True)
-            else:
-                df_imp = None
-        elif isinstance(imp_list[0], (int, float)):
-            names = (manifest or {}).get("feature_columns", [])
-            if len(names) != len(imp_list):
-                names = [f"X{i}" for i in range(len(imp_list))]
-            df_imp = pd.DataFrame({"variable": names, "importancia": imp_list}).nlargest(15, "importancia").sort_values("importancia", ascending=True)
-    if df_imp is None:
-        pipeline = get_pipeline()
-        if pipeline is not None:
-            try:
-                if hasattr(pipeline, "steps") and len(pipeline.steps):
-                    clf = pipeline.steps[-1][1]
-                elif hasattr(pipeline, "named_steps"):
-                    clf = pipeline.named_steps.get("clf", pipeline.named_steps.get("classifier", pipeline))
-                else:
-                    clf = pipeline
-                if hasattr(clf, "feature_importances_"):
-                    imp = clf.feature_importances_
-                    preprocessor = get_preprocessor()
-                    if preprocessor is not None and hasattr(preprocessor, "get_feature_names_out"):
-                        try:
-                            feature_names = preprocessor.get_feature_names_out()
-                        except Exception:
-                            feature_names = []
-                    else:
-                        feature_names = (manifest or {}).get("feature_columns", [])
-                    if len(feature_names) != len(imp):
-                        feature_names = [f"X{i}" for i in range(len(imp))]
-                    top_n = min(15, len(imp))
-                    idx_sorted = imp.argsort()[::-1][:top_n]
-                    df_imp = pd.DataFrame({
-                        "variable": [feature_names[i] for i in idx_sorted],
-                        "importancia": imp[idx_sorted],
-                    })
-            except Exception:
-                pass
+    # Del manifest: sin cargar el pipeline (sklearn/imblearn/xgboost) en el primer render
+    df_imp = get_feature_importances(manifest)
     if df_imp is not None and len(df_imp) > 0:
-        fig_imp = px.bar(df_imp, x="importancia", y="variable", orientation="h", title="Importancia de variables")
-        fig_imp.update_layout(yaxis={"categoryorder": "total ascending"}, margin=dict(l=80))
-        fig_imp.update_traces(
-            hovertemplate="<b>%{y}</b><br>Importancia: %{x:.4f}<br>Contribución relativa de la variable al modelo de predicción de abandono.<extra></extra>"
-        )
+        with medir("figura importancia"):
+            fig_imp = px.bar(df_imp, x="importancia", y="variable", orientation="h", title="Importancia de variables")
+            fig_imp.update_layout(yaxis={"categoryorder": "total ascending"}, margin=dict(l=80))
+            fig_imp.update_traces(
+                hovertemplate="<b>%{y}</b><br>Importancia: %{x:.4f}<br>Contribución relativa de la variable al modelo de predicción de abandono.<extra></extra>"
+            )
         st.plotly_chart(fig_imp, use_container_width=True)
     else:
         st.caption(
             "Para ver el gráfico de importancia, guarde pipeline.pkl (y preprocessor.pkl) en artifacts/modeling/ desde el notebook, "
             "o ejecute **scripts/export_model_artifacts.py**."
         )
+
+# Factores de riesgo de la selección: contribuciones por empleado precalculadas al puntuar
+st.subheader("Factores de riesgo del segmento")
+contribuciones = get_contribuciones()
+if contribuciones is None:
+    st.caption(
+        "Para ver los factores por segmento, guarde las contribuciones por empleado con "
+        "**scripts/export_scoring_store.py --contribuciones** (o **scripts/score_incremental.py**)."
+    )
+else:
+    from contribuciones_segmento import factores_por_departamento, principales
+
+    factores = get_factores_segmento(contribuciones)
+    if factores["n"] == 0:
+        st.caption("No hay empleados con los filtros actuales.")
+    else:
+        with medir("figura factores del segmento"):
+            df_fact = principales(factores["media"])
+            fig_fact = px.bar(
+                df_fact, x="contribucion", y="variable", color="efecto", orientation="h",
+                color_discrete_map={"Sube el riesgo": "#d62728", "Baja el riesgo": "#1f77b4"},
+                title=f"Contribución media al scoring ({factores['n']:,} empleados filtrados)",
+            )
+            fig_fact.update_layout(yaxis={"categoryorder": "total ascending"}, margin=dict(l=80), xaxis_title="log-odds")
+            fig_fact.update_traces(
+                hovertemplate="<b>%{y}</b><br>Contribución media: %{x:+.3f}<br>Positivo = la variable sube el riesgo de este segmento.<extra></extra>"
+            )
+        st.plotly_chart(fig_fact, use_container_width=True)
+        por_dep = factores_por_departamento(factores["por_departamento"])
+        if len(por_dep):
+            st.caption("Variables que más suben el riesgo en cada departamento (contribución media en log-odds):")
+            st.dataframe(por_dep, use_container_width=True)
@@ -8,48 +8,62 @@ from common import (
     ensure_authenticated,
     get_df_scoring,
     render_sidebar_filters,
-    get_df_filtrado,
     get_umbrales_riesgo,
-    SCORING_COL,
+    get_intervalo_banda,
+    get_cubo_segmentos,
+    get_mascara_cubo,
+    FILTER_COLUMNS,
+    get_resumen_distribucion,
 )
+from graficos_distribucion import figura_caja, figura_histograma
+from instrumentacion import iniciar_rerun, medir
 
 ensure_authenticated()
-df_raw = get_df_scoring()
+iniciar_rerun("Distribución y riesgo")
+df_raw = get_df_scoring(FILTER_COLUMNS)
 render_sidebar_filters(df_raw)
-df = get_df_filtrado(df_raw)
+cubo = get_cubo_segmentos()
 
 st.title("Distribución y riesgo por segmento")
-if df is None or df.empty or SCORING_COL not in df.columns:
+mascara = get_mascara_cubo(cubo) if cubo is not None else None
+desde, hasta = get_intervalo_banda()
+total_celda = cubo.contar(desde, hasta) if cubo is not None else None
+if cubo is None or int(total_celda[mascara].sum()) == 0:
     st.warning("Cargue `df_con_scoring.pkl` con columna de scoring.")
     st.stop()
 
 th_low, th_high = get_umbrales_riesgo()
 st.caption("Los umbrales de riesgo se configuran en el panel izquierdo y aplican a todos los gráficos.")
 
+# 1-2: histograma y boxplot desde resúmenes del cubo (conteos por bin, cuartiles, bigotes, outliers)
+resumen = get_resumen_distribucion(cubo, mascara, desde, hasta)
+
 # 1. Distribución de probabilidad
 st.subheader("Distribución de probabilidad de abandono")
-fig = px.histogram(df, x=SCORING_COL, nbins=20, labels={SCORING_COL: "Scoring abandono"})
-fig.add_vline(x=th_low, line_dash="dash", line_color="gray", annotation_text=f"Medio {th_low}")
-fig.add_vline(x=th_high, line_dash="dash", line_color="orange", annotation_text=f"Alto {th_high}")
-st.plotly_chart(fig, use_container_width=True)
+with medir("figura histograma"):
+    fig_hist = figura_histograma(resumen["conteos"], th_low, th_high)
+st.plotly_chart(fig_hist, use_container_width=True)
 
 # 2. Scoring por departamento (boxplot)
 st.subheader("Scoring por departamento")
-if "departamento" not in df.columns:
+if resumen["caja"] is None:
     st.caption("No hay columna departamento.")
 else:
-    orden_med = df.groupby("departamento")[SCORING_COL].median().sort_values(ascending=False).index.tolist()
-    df_ord = df.copy()
-    df_ord["departamento"] = pd.Categorical(df_ord["departamento"], categories=orden_med, ordered=True)
-    fig2 = px.box(df_ord, x="departamento", y=SCORING_COL, points="outliers", title="Boxplot por departamento")
-    st.plotly_chart(fig2, use_container_width=True)
+    with medir("figura boxplot", filas=len(resumen["caja"])):
+        fig_caja = figura_caja(resumen["caja"])
+    st.plotly_chart(fig_caja, use_container_width=True)
+
+# 3-5: % alto riesgo por segmento desde el cubo (sin recorrer filas al mover los umbrales)
+alto_celda = cubo.contar(max(th_high, desde), hasta)
 
 # 3. Riesgo por departamento (% alto riesgo)
 st.subheader("Riesgo por departamento (% alto riesgo)")
-if "departamento" not in df.columns:
+if "departamento" not in cubo.dimensiones:
     st.caption("No hay columna departamento en los datos.")
 else:
-    deps = df.groupby("departamento", dropna=False)[SCORING_COL].apply(lambda s: (s >= th_high).mean() * 100).sort_values(ascending=True)
+    with medir("agregados por departamento"):
+        tot = cubo.por_dimension(total_celda, mascara, "departamento")
+        deps = (cubo.por_dimension(alto_celda, mascara, "departamento")[tot > 0] / tot[tot > 0] * 100).sort_values(ascending=True)
     dep_df = deps.reset_index(name="% alto riesgo")
     if len(dep_df) == 0:
         st.caption("Sin datos para mostrar (filtros muy restrictivos).")
@@ -62,28 +76,34 @@ else:
 
 # 4. Riesgo por antigüedad
 st.subheader("Riesgo por antigüedad en la compañía")
-if "anos_compania" not in df.columns:
+if "anos_compania" not in cubo.dimensiones:
     st.caption("No hay columna anos_compania.")
 else:
-    bins = [0, 2, 5, 10, 15, 100]
-    labels = ["0-2", "2-5", "5-10", "10-15", "15+"]
-    df_bin = df.copy()
-    df_bin["rango_anos"] = pd.cut(df_bin["anos_compania"], bins=bins, labels=labels, include_lowest=True)
-    agg = df_bin.groupby("rango_anos", observed=True)[SCORING_COL].agg([("total", "count"), ("alto_riesgo", lambda x: (x >= th_high).sum())])
+    with medir("agregados por antigüedad"):
+        agg = pd.DataFrame({
+            "total": cubo.por_rango_anos(total_celda, mascara),
+            "alto_riesgo": cubo.por_rango_anos(alto_celda, mascara),
+        })
+    agg = agg[agg["total"] > 0]
     agg["pct_alto"] = (agg["alto_riesgo"] / agg["total"] * 100).round(1)
-    agg = agg.reset_index()
+    agg = agg.rename_axis("rango_anos").reset_index()
     fig4 = px.bar(agg, x="rango_anos", y="pct_alto", labels={"pct_alto": "% alto riesgo", "rango_anos": "Años en compañía"})
     st.plotly_chart(fig4, use_container_width=True)
 
 # 5. Riesgo por satisfacción entorno
 st.subheader("Riesgo por satisfacción entorno")
-if "satisfaccion_entorno" not in df.columns:
+if "satisfaccion_entorno" not in cubo.dimensiones:
     st.caption("No hay columna satisfaccion_entorno.")
 else:
+    with medir("agregados por satisfacción"):
+        tot = cubo.por_dimension(total_celda, mascara, "satisfaccion_entorno")
+        pct = cubo.por_dimension(alto_celda, mascara, "satisfaccion_entorno")[tot > 0] / tot[tot > 0] * 100
+    pct = pct[pct.index.notna()]
+    pct.index = pct.index.astype(str)
     orden = ["Baja", "Media", "Alta"]
-    sat_vals = df["satisfaccion_entorno"].astype(str).unique().tolist()
+    sat_vals = pct.index.tolist()
     orden = [o for o in orden if o in sat_vals] + [x for x in sorted(sat_vals) if x not in orden]
-    sat_agg = df.groupby("satisfaccion_entorno", dropna=False)[SCORING_COL].apply(lambda s: (s >= th_high).mean() * 100).reindex(orden).reset_index(name="% alto riesgo")
+    sat_agg = pct.reindex(orden).rename_axis("satisfaccion_entorno").reset_index(name="% alto riesgo")
     sat_agg = sat_agg.dropna(subset=["% alto riesgo"])
     if len(sat_agg):
         fig5 = px.bar(sat_agg, x="satisfaccion_entorno", y="% alto riesgo", title=f"% alto riesgo por nivel de satisfacción (umbral ≥{th_high})")
@@ -1,35 +1,30 @@
 """
-Scoring y datos: tabla priorizada y descarga CSV/Excel.
+Scoring y datos: tabla priorizada paginada, factores de un empleado y exportación CSV/Excel/Parquet
+bajo demanda.
 """
+from pathlib import Path
+
 import numpy as np
 import streamlit as st
 import pandas as pd
+import plotly.express as px
 from common import (
     ensure_authenticated,
-    get_df_scoring,
+    get_df_tabla_scoring,
+    get_contribuciones,
     render_sidebar_filters,
-    get_df_filtrado,
+    get_filas_filtradas,
+    get_tabla_scoring,
     get_umbrales_riesgo,
+    get_estado_filtros,
     SCORING_COL,
 )
+from cache_filtros import clave_canonica
+from instrumentacion import iniciar_rerun, medir
+from exportar import FORMATOS, exportar, formatos_disponibles, ruta_exportacion
+from tabla_scoring import ORDENES
 
-
-@st.cache_data(ttl=300)
-def _prepare_scoring_table(_df: pd.DataFrame, th_low: float, th_high: float) -> pd.DataFrame:
-    """Prepara la tabla filtrada y ordenada. Cacheada para evitar recálculo con mismos datos y umbrales."""
-    if _df is None or _df.empty or SCORING_COL not in _df.columns:
-        return pd.DataFrame()
-    df = _df.copy()
-    # Banda de forma vectorizada (más rápido que .apply por fila)
-    df["banda"] = np.where(
-        df[SCORING_COL] >= th_high, "Alto",
-        np.where(df[SCORING_COL] >= th_low, "Medio", "Bajo"),
-    )
-    df = df[df[SCORING_COL] >= th_low].copy()
-    columnas_relevantes = [c for c in ["departamento", "anos_compania", "satisfaccion_entorno", "anos_desde_ult_promocion"] if c in df.columns]
-    columnas_show = [SCORING_COL, "banda"] + columnas_relevantes + [c for c in df.columns if c not in [SCORING_COL, "banda"] + columnas_relevantes]
-    columnas_show = [c for c in columnas_show if c in df.columns]
-    return df[columnas_show].sort_values(SCORING_COL, ascending=False)
+FILAS_POR_PAGINA = (25, 50, 100, 250)
 
 
 def _estilo_riesgo_vectorized(df: pd.DataFrame) -> pd.DataFrame:
@@ -46,38 +41,108 @@ def _estilo_riesgo_vectorized(df: pd.DataFrame) -> pd.DataFrame:
 
 
 ensure_authenticated()
-df_raw = get_df_scoring()
+iniciar_rerun("Scoring y datos")
+df_raw = get_df_tabla_scoring()
 render_sidebar_filters(df_raw)
-df = get_df_filtrado(df_raw)
-
-# Solo empleados que aún no abandonaron: objetivo de técnicas de retención
-if df is not None and not df.empty and "abandono" in df.columns:
-    df = df[df["abandono"].isin([0, "No"])].copy()
 
 st.title("Scoring y datos")
-if df is None or df.empty:
+if df_raw is None or df_raw.empty:
     st.warning("Cargue `df_con_scoring.pkl` en artifacts/modeling/.")
     st.stop()
 
-if SCORING_COL not in df.columns:
+if SCORING_COL not in df_raw.columns:
     st.error("No hay columna de scoring en los datos.")
     st.stop()
 
 st.caption("Solo empleados que aún no han abandonado y con scoring mayor al umbral de riesgo medio. Los umbrales se configuran en el panel izquierdo.")
 
 th_low, th_high = get_umbrales_riesgo()
+tabla = get_tabla_scoring()
 
-df_show = _prepare_scoring_table(df, th_low, th_high)
+# Controles de la tabla: búsqueda y orden corren sobre los índices de tabla_scoring.py
+c_buscar, c_orden, c_dir, c_filas = st.columns([3, 2, 1, 1])
+busqueda = c_buscar.text_input("Buscar", placeholder="id o departamento", key="scoring_busqueda")
+por = c_orden.selectbox("Ordenar por", options=list(ORDENES), key="scoring_orden")
+descendente = c_dir.selectbox("Dirección", options=["Desc.", "Asc."], key="scoring_direccion") == "Desc."
+filas_por_pagina = c_filas.selectbox("Filas", options=list(FILAS_POR_PAGINA), index=1, key="scoring_filas")
 
-if df_show.empty:
+filas = get_filas_filtradas(df_raw)
+with medir("tabla: máscara y orden", detalle=por) as info:
+    posiciones = tabla.ordenar(tabla.mascara(filas, th_low, busqueda), por, descendente)
+    info["filas"] = len(posiciones)
+total = len(posiciones)
+if total == 0:
     st.info("No hay candidatos con scoring mayor al umbral de riesgo medio con los filtros actuales.")
+    st.stop()
 
-df_styled = df_show.style.apply(_estilo_riesgo_vectorized, axis=None)
+n_paginas = (total + filas_por_pagina - 1) // filas_por_pagina
+if st.session_state.get("scoring_pagina", 1) > n_paginas:
+    st.session_state.scoring_pagina = n_paginas  # los filtros dejaron menos páginas
+pagina = st.number_input(f"Página (de {n_paginas:,})", min_value=1, max_value=n_paginas, value=1, step=1, key="scoring_pagina")
+with medir("tabla: página", filas=filas_por_pagina):
+    df_pagina = tabla.pagina(df_raw, posiciones, int(pagina) - 1, filas_por_pagina, th_low, th_high)
+desde = (int(pagina) - 1) * filas_por_pagina
+st.caption(f"Mostrando {desde + 1:,}–{desde + len(df_pagina):,} de {total:,} candidatos.")
+
+df_styled = df_pagina.style.apply(_estilo_riesgo_vectorized, axis=None)
 st.dataframe(df_styled, use_container_width=True, height=400)
 
-st.download_button(
-    "Descargar CSV",
-    data=df_show.to_csv(index=True).encode("utf-8-sig"),
-    file_name="scoring_empleados.csv",
-    mime="text/csv",
+# Factores de un empleado: contribuciones guardadas al puntuar (sin recalcular el modelo)
+contribuciones = get_contribuciones()
+if contribuciones is not None:
+    with st.expander("¿Por qué este empleado tiene este scoring?"):
+        id_texto = st.text_input("Id del empleado", key="scoring_explicar_id")
+        if id_texto.strip():
+            from contribuciones_segmento import principales
+
+            try:
+                id_empleado = contribuciones.index.dtype.type(id_texto.strip())
+            except (TypeError, ValueError):
+                id_empleado = id_texto.strip()
+            fila = contribuciones.empleado(id_empleado)
+            if fila is None:
+                st.caption(f"No hay contribuciones para el id {id_texto.strip()}.")
+            else:
+                df_emp = principales(fila)
+                fig_emp = px.bar(
+                    df_emp, x="contribucion", y="variable", color="efecto", orientation="h",
+                    color_discrete_map={"Sube el riesgo": "#d62728", "Baja el riesgo": "#1f77b4"},
+                )
+                fig_emp.update_layout(yaxis={"categoryorder": "total ascending"}, xaxis_title="log-odds",
+                                      margin=dict(l=80), height=350)
+                st.plotly_chart(fig_emp, use_container_width=True)
+
+# Exportación: se genera solo al pulsar el botón, por bloques en un archivo temporal, con las
+# mismas filas y orden que la tabla; la descarga se ofrece mientras no cambien filtros ni orden.
+st.subheader("Exportar candidatos")
+c_formato, c_generar = st.columns([2, 1])
+formato = c_formato.selectbox("Formato", options=formatos_disponibles(), key="scoring_formato")
+clave_export = clave_canonica(
+    tipo="exportacion", version=df_raw.attrs.get("version_datos"), estado=get_estado_filtros(),
+    umbrales=[th_low, th_high], busqueda=busqueda, orden=[por, descendente], formato=formato,
 )
+if c_generar.button(f"Generar {formato} ({total:,} filas)"):
+    extension, mime = FORMATOS[formato]
+    anterior = st.session_state.get("scoring_export")
+    if anterior:
+        Path(anterior["ruta"]).unlink(missing_ok=True)
+    ruta = ruta_exportacion(extension)
+    try:
+        with st.spinner(f"Generando {formato}..."), medir("exportación", filas=total, detalle=formato):
+            exportar(tabla, df_raw, posiciones, th_low, th_high, formato, ruta)
+        st.session_state.scoring_export = {
+            "clave": clave_export, "ruta": str(ruta), "formato": formato,
+            "nombre": f"scoring_empleados.{extension}", "mime": mime,
+        }
+    except ValueError as e:
+        ruta.unlink(missing_ok=True)
+        st.session_state.pop("scoring_export", None)
+        st.error(str(e))
+
+export = st.session_state.get("scoring_export")
+if export and export["clave"] == clave_export and Path(export["ruta"]).exists():
+    # Descarga diferida: el archivo se lee solo al pulsar, no en cada rerun de la página
+    st.download_button(f"Descargar {export['formato']}", data=Path(export["ruta"]).read_bytes,
+                       file_name=export["nombre"], mime=export["mime"])
+else:
+    st.caption("Genere el archivo para descargar la lista con los filtros y el orden actuales.")
@@ -0,0 +1,90 @@
+"""
+Rendimiento (solo administradores): versión de artefactos activa, percentiles recientes de las etapas
+instrumentadas del dashboard (cargas de artefactos, filtrado, agregados y figuras) y exportación de las
+mediciones como JSON lines.
+"""
+import time
+
+import streamlit as st
+import plotly.express as px
+from common import (
+    ARTEFACTOS,
+    ensure_authenticated,
+    es_admin,
+    get_vigilante,
+    TIEMPOS_JSONL_PATH,
+)
+from instrumentacion import MAX_REGISTROS, PERCENTILES, REGISTRO, iniciar_rerun, resumen_percentiles
+
+VENTANAS = {"Últimos 15 min": 15 * 60, "Última hora": 3600, "Últimas 24 h": 24 * 3600, "Todo": None}
+
+ensure_authenticated()
+iniciar_rerun("Rendimiento")
+st.title("Rendimiento")
+if not es_admin():
+    st.error("Esta página solo está disponible para administradores.")
+    st.stop()
+
+
+def _hora(ts: float | None) -> str:
+    return time.strftime("%H:%M:%S", time.localtime(ts)) if ts is not None else "—"
+
+
+vigilante = get_vigilante()
+texto_version = f"Artefactos: versión **{ARTEFACTOS.activa}** ({ARTEFACTOS.entradas()} cargas en caché)."
+if vigilante is None:
+    st.caption(texto_version + " Recarga automática desactivada (DASHBOARD_RECARGA_S=0).")
+else:
+    ev = vigilante.estado
+    ultima = f"{_hora(ev['ultima_recarga'])} en {ev['segundos_ultima_recarga']:.1f} s" if ev["ultima_recarga"] else "—"
+    st.caption(
+        f"{texto_version} Comprobación cada {vigilante.intervalo_s:g} s (última: {_hora(ev['ultima_comprobacion'])}); "
+        f"recargas: {ev['recargas']} (última: {ultima}); cambios sin contenido nuevo: {ev['sin_cambios']}."
+    )
+    if ev["error"]:
+        st.warning(f"Error al comprobar o recargar artefactos (sigue activa {ARTEFACTOS.activa}): {ev['error']}")
+
+st.caption(
+    f"Mediciones de este proceso, compartidas por todas las sesiones: {len(REGISTRO.registros()):,} en memoria "
+    f"(máximo {MAX_REGISTROS:,}). Las etapas de construcción solo se miden cuando no están en caché."
+)
+c_ventana, c_pagina = st.columns(2)
+ventana = c_ventana.selectbox("Ventana", options=list(VENTANAS), key="rendimiento_ventana")
+desde_ts = time.time() - VENTANAS[ventana] if VENTANAS[ventana] is not None else None
+registros = REGISTRO.registros(desde_ts)
+paginas = ["Todas"] + sorted(p for p in registros["pagina"].dropna().unique())
+pagina = c_pagina.selectbox("Página", options=paginas, key="rendimiento_pagina")
+desde_pagina = registros if pagina == "Todas" else registros[registros["pagina"] == pagina]
+
+if desde_pagina.empty:
+    st.info("Todavía no hay mediciones en esta ventana. Navegue por las demás páginas y vuelva.")
+    st.stop()
+
+resumen = resumen_percentiles(desde_pagina)
+
+st.subheader("Percentiles por etapa")
+p_alto = f"p{PERCENTILES[-1]}_ms"
+st.dataframe(resumen.round(1), use_container_width=True, hide_index=True)
+fig = px.bar(resumen.head(15), x=p_alto, y="etapa", orientation="h", title=f"{p_alto} por etapa (las 15 más lentas)")
+fig.update_layout(yaxis={"categoryorder": "total ascending"}, margin=dict(l=200), xaxis_title="ms")
+st.plotly_chart(fig, use_container_width=True)
+
+st.subheader("Mediciones recientes")
+recientes = desde_pagina.tail(200).iloc[::-1].copy()
+recientes["hora"] = recientes["ts"].map(lambda t: time.strftime("%H:%M:%S", time.localtime(t)))
+st.dataframe(recientes[["hora", "pagina", "rerun", "etapa", "ms", "filas", "detalle"]].round(1),
+             use_container_width=True, hide_index=True, height=300)
+
+st.subheader("Exportar")
+c_activar, c_descargar, c_vaciar = st.columns(3)
+exportando = REGISTRO.ruta_jsonl is not None
+if c_activar.toggle("Escribir cada medición en JSON lines", value=exportando, key="rendimiento_jsonl") != exportando:
+    REGISTRO.exportar_a(None if exportando else TIEMPOS_JSONL_PATH)
+    st.rerun()
+if REGISTRO.ruta_jsonl is not None:
+    st.caption(f"Escribiendo en `{REGISTRO.ruta_jsonl}`.")
+c_descargar.download_button("Descargar ventana (.jsonl)", data=desde_pagina.to_json(orient="records", lines=True, force_ascii=False),
+                            file_name="tiempos_dashboard.jsonl", mime="application/x-ndjson")
+if c_vaciar.button("Vaciar mediciones"):
+    REGISTRO.vaciar()
+    st.rerun()
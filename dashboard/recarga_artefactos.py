@@ -0,0 +1,212 @@
+"""
+Caché de artefactos por versión y recarga en caliente al publicar una versión nueva.
+
+CacheVersionada guarda lo que cargan las funciones decoradas con por_version (dataset con scoring,
+cubo, motor de filtros, pipeline, ...). La clave es (versión, función, argumentos): no hay TTL, así que
+nada se recarga si no cambió la versión. Cada rerun fija la versión activa en su primera carga, de
+modo que un rerun no mezcla artefactos de dos versiones aunque la activa cambie a mitad de camino.
+
+VigilanteArtefactos comprueba cada intervalo_s segundos la firma del registro (solo un stat, ver
+scripts/registro_artefactos.py):
+  - si no cambió, no hace nada más;
+  - si cambió, lee la versión y su hash de contenido. Con el mismo hash (p. ej. activar de nuevo la
+    misma versión, o reescribir los archivos con el mismo contenido) renombra las entradas, sin recargar;
+  - con una versión realmente nueva, precarga en este hilo los artefactos de la nueva versión mientras
+    las sesiones siguen usando la anterior, y al terminar la activa (intercambio atómico). Después se
+    descartan las entradas de la versión anterior. Si la precarga falla, sigue activa la anterior.
+
+Sin registro (no existe CURRENT) la versión es el directorio de trabajo: la firma es el stat de los
+archivos y el hash de contenido se calcula cuando cambian. Sin CURRENT no hay intercambio atómico de
+archivos: se podría leer un artefacto a medio escribir.
+"""
+import functools
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable
+
+from instrumentacion import REGISTRO, iniciar_rerun, rerun_actual
+from registro_artefactos import directorio_version, firma, hash_contenido, manifest_version, version_vigente
+
+PREFIJO_LOCAL = "local-"
+
+# (id de rerun, versión) fijada en este contexto; id None = fijada explícitamente (precarga de una versión)
+_fijada: ContextVar[tuple[str | None, str] | None] = ContextVar("version_artefactos", default=None)
+
+
+def version_inicial(base: Path) -> str:
+    """Versión a la que apunta CURRENT o, sin registro, una versión local derivada del stat de los archivos."""
+    vigente = version_vigente(base)
+    if vigente is not None:
+        return vigente
+    return PREFIJO_LOCAL + hashlib.sha1(repr(firma(base)).encode()).hexdigest()[:12]
+
+
+class CacheVersionada:
+    def __init__(self, base: Path, version: str):
+        self.base = Path(base)
+        self.activa = version
+        self._preparando: set[str] = set()
+        self._valores: dict[tuple, object] = {}
+        self._locks: dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def version(self) -> str:
+        fijada = _fijada.get()
+        rerun = rerun_actual()
+        if fijada is not None and (fijada[0] is None or fijada[0] == rerun):
+            return fijada[1]
+        version = self.activa
+        if rerun is not None:
+            _fijada.set((rerun, version))
+        return version
+
+    def directorio(self, version: str | None = None) -> Path:
+        """Directorio de artefactos de version (por defecto, la de este rerun)."""
+        return directorio_version(self.base, self.version() if version is None else version)
+
+    @contextmanager
+    def preparando(self, version: str):
+        """Las cargas dentro del bloque (en este hilo) son de version, aunque no sea la activa."""
+        with self._lock:
+            self._preparando.add(version)
+        token = _fijada.set((None, version))
+        try:
+            yield
+        finally:
+            _fijada.reset(token)
+            with self._lock:
+                self._preparando.discard(version)
+
+    def _vigente(self, version: str) -> bool:
+        return version == self.activa or version in self._preparando
+
+    def obtener(self, fn: Callable, args: tuple, kwargs: dict):
+        version = self.version()
+        with self._lock:
+            if not self._vigente(version):
+                # Rerun fijado a una versión ya retirada: no se vuelve a cargar, pasa a la activa
+                version = self.activa
+                _fijada.set((rerun_actual(), version))
+            clave = (version, fn.__qualname__, args, tuple(sorted(kwargs.items())))
+            if clave in self._valores:
+                return self._valores[clave]
+            lock = self._locks.setdefault(clave, threading.Lock())
+        with lock:
+            with self._lock:
+                if clave in self._valores:
+                    return self._valores[clave]
+            valor = fn(*args, **kwargs)
+            with self._lock:
+                if self._vigente(version):
+                    self._valores[clave] = valor
+                self._locks.pop(clave, None)
+        return valor
+
+    def activar(self, version: str) -> None:
+        """Intercambio atómico: las cargas nuevas usan version; se descartan las demás."""
+        with self._lock:
+            self.activa = version
+            self._valores = {k: v for k, v in self._valores.items() if self._vigente(k[0])}
+
+    def renombrar(self, anterior: str, nueva: str) -> None:
+        """Mismo contenido con otro id de versión: las entradas pasan a la nueva sin recargar."""
+        with self._lock:
+            self._valores = {((nueva,) + k[1:] if k[0] == anterior else k): v for k, v in self._valores.items()}
+            if self.activa == anterior:
+                self.activa = nueva
+
+    def entradas(self) -> int:
+        with self._lock:
+            return len(self._valores)
+
+
+def por_version(cache: CacheVersionada):
+    """Decorador: resultado compartido entre sesiones, uno por versión de artefactos y argumentos."""
+    def decorador(fn):
+        @functools.wraps(fn)
+        def envoltura(*args, **kwargs):
+            return cache.obtener(fn, args, kwargs)
+        return envoltura
+    return decorador
+
+
+class VigilanteArtefactos:
+    def __init__(self, cache: CacheVersionada, precargar: Callable[[], list[str]], intervalo_s: float = 30.0):
+        """precargar() carga los artefactos (en la versión fijada) y devuelve los errores ("paso: error")."""
+        self.cache = cache
+        self.precargar = precargar
+        self.intervalo_s = intervalo_s
+        self._firma = firma(cache.base)
+        self._hashes: dict[str, str | None] = {}
+        self.estado = {
+            "comprobaciones": 0, "sin_cambios": 0, "recargas": 0, "ultima_comprobacion": None,
+            "ultima_recarga": None, "segundos_ultima_recarga": None, "error": None,
+        }
+
+    def _hash(self, version: str) -> str | None:
+        if version not in self._hashes:
+            if version.startswith(PREFIJO_LOCAL):
+                self._hashes[version] = hash_contenido(self.cache.base)
+            else:
+                self._hashes[version] = manifest_version(self.cache.base, version).get("artefactos", {}).get("hash")
+        return self._hashes[version]
+
+    def _leer_version(self) -> tuple[str, str | None]:
+        vigente = version_vigente(self.cache.base)
+        if vigente is not None:
+            return vigente, self._hash(vigente)
+        h = hash_contenido(self.cache.base)
+        version = PREFIJO_LOCAL + h[:12]
+        self._hashes[version] = h
+        return version, h
+
+    def comprobar(self) -> bool:
+        """Una comprobación; True si se activó una versión nueva."""
+        self.estado["comprobaciones"] += 1
+        self.estado["ultima_comprobacion"] = time.time()
+        actual = firma(self.cache.base)
+        if actual == self._firma:
+            return False
+        self._firma = actual
+        activa = self.cache.activa
+        nueva, hash_nuevo = self._leer_version()
+        if nueva == activa or (hash_nuevo is not None and hash_nuevo == self._hash(activa)):
+            if nueva != activa:
+                self.cache.renombrar(activa, nueva)
+            self.estado["sin_cambios"] += 1
+            return False
+        t0 = time.perf_counter()
+        with self.cache.preparando(nueva):
+            iniciar_rerun("recarga")
+            errores = self.precargar()
+        segundos = time.perf_counter() - t0
+        if errores:
+            self.estado["error"] = f"{nueva}: " + "; ".join(errores)
+            return False
+        self.cache.activar(nueva)
+        REGISTRO.anotar("recarga de artefactos", segundos, detalle=nueva)
+        self.estado.update(recargas=self.estado["recargas"] + 1, ultima_recarga=time.time(),
+                           segundos_ultima_recarga=segundos, error=None)
+        return True
+
+    def _bucle(self) -> None:
+        try:
+            # Sin registro, el hash de la versión local inicial se calcula aquí, fuera del arranque
+            self._hash(self.cache.activa)
+        except Exception as e:
+            self.estado["error"] = str(e)
+        while True:
+            time.sleep(self.intervalo_s)
+            try:
+                self.comprobar()
+            except Exception as e:
+                self.estado["error"] = str(e)
+
+    def iniciar(self) -> threading.Thread:
+        hilo = threading.Thread(target=self._bucle, name="vigilante-artefactos", daemon=True)
+        hilo.start()
+        return hilo
@@ -0,0 +1,111 @@
+"""
+Tabla paginada de candidatos para "Scoring y datos".
+
+Se construye una vez por dataset cargado con los órdenes precomputados (scoring, id, departamento
+con scoring descendente dentro de cada uno) y los ids ordenados para la búsqueda. Cada render:
+  - combina en una máscara booleana las filas de los filtros del sidebar, los candidatos (scoring ≥
+    umbral medio, sin abandono) y la búsqueda;
+  - recorre el orden precomputado quedándose con las filas de la máscara (O(n), sin ordenar);
+  - materializa y estila solo las filas de la página visible.
+"""
+import numpy as np
+import pandas as pd
+
+from contribuciones_segmento import columnas_contribucion
+
+ORDENES = ("scoring", "id", "departamento")
+COLUMNAS_RELEVANTES = ("departamento", "anos_compania", "satisfaccion_entorno", "anos_desde_ult_promocion")
+
+
+class TablaScoring:
+    def __init__(self, df: pd.DataFrame, scoring_col: str):
+        self.n = len(df)
+        self.index = df.index
+        self.scoring_col = scoring_col
+        self.score = df[scoring_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        self._sin_abandono = (
+            df["abandono"].isin([0, "No"]).to_numpy() if "abandono" in df.columns else np.ones(self.n, dtype=bool)
+        )
+        # NaN al final en el orden ascendente; nunca son candidatos (NaN >= umbral es False)
+        score_orden = np.where(np.isnan(self.score), -np.inf, self.score)
+        self._ordenes: dict[tuple[str, bool], np.ndarray] = {}
+        asc = np.argsort(score_orden, kind="stable")
+        self._ordenes[("scoring", False)], self._ordenes[("scoring", True)] = asc, asc[::-1]
+        ids = self.index.to_numpy()
+        orden_id = np.argsort(ids, kind="stable")
+        self._ids_ordenados = ids[orden_id]
+        self._ordenes[("id", False)], self._ordenes[("id", True)] = orden_id, orden_id[::-1]
+        self.departamentos: list[str] = []
+        if "departamento" in df.columns:
+            codes, niveles = pd.factorize(df["departamento"].astype("string"), sort=True, use_na_sentinel=True)
+            codes = np.where(codes < 0, len(niveles), codes)  # sin departamento al final
+            self._dep_codes = codes
+            self.departamentos = [str(n) for n in niveles]
+            self._ordenes[("departamento", False)] = np.lexsort((-score_orden, codes))
+            self._ordenes[("departamento", True)] = np.lexsort((-score_orden, -codes))
+
+    def mascara(self, filas: np.ndarray | None, th_low: float, busqueda: str = "") -> np.ndarray:
+        """
+        Filas candidatas: scoring ≥ th_low y sin abandono, dentro de filas (posiciones que dejan los
+        filtros; None = todas) y que coinciden con busqueda (id exacto, o parte del nombre del departamento).
+        """
+        mask = (self.score >= th_low) & self._sin_abandono
+        if filas is not None:
+            en_filtro = np.zeros(self.n, dtype=bool)
+            en_filtro[filas] = True
+            mask &= en_filtro
+        busqueda = (busqueda or "").strip()
+        if busqueda:
+            mask &= self._buscar(busqueda)
+        return mask
+
+    def _buscar(self, texto: str) -> np.ndarray:
+        out = np.zeros(self.n, dtype=bool)
+        valor = self._como_id(texto)
+        if valor is not None:
+            lo = np.searchsorted(self._ids_ordenados, valor, side="left")
+            hi = np.searchsorted(self._ids_ordenados, valor, side="right")
+            out[self._ordenes[("id", False)][lo:hi]] = True
+        if self.departamentos:
+            texto = texto.casefold()
+            codigos = [i for i, d in enumerate(self.departamentos) if texto in d.casefold()]
+            if codigos:
+                out |= np.isin(self._dep_codes, codigos)
+        return out
+
+    def _como_id(self, texto: str):
+        """texto convertido al tipo del índice, o None si no puede ser un id."""
+        if pd.api.types.is_integer_dtype(self.index.dtype):
+            return int(texto) if texto.lstrip("-").isdigit() else None
+        if pd.api.types.is_float_dtype(self.index.dtype):
+            try:
+                return float(texto)
+            except ValueError:
+                return None
+        return texto
+
+    def ordenar(self, mascara: np.ndarray, por: str = "scoring", descendente: bool = True) -> np.ndarray:
+        """Posiciones de las filas de mascara en el orden pedido (sin ordenar: se filtra el orden precomputado)."""
+        orden = self._ordenes.get((por, descendente), self._ordenes[("scoring", True)])
+        return orden[mascara[orden]]
+
+    def pagina(self, df: pd.DataFrame, posiciones: np.ndarray, pagina: int, filas_por_pagina: int,
+               th_low: float, th_high: float) -> pd.DataFrame:
+        """Filas de la página (0-based) con la columna banda y las columnas en el orden de la tabla."""
+        inicio = pagina * filas_por_pagina
+        out = df.iloc[posiciones[inicio:inicio + filas_por_pagina]]
+        score = out[self.scoring_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        out = out.assign(banda=np.where(score >= th_high, "Alto", np.where(score >= th_low, "Medio", "Bajo")))
+        return out[columnas_tabla(out, self.scoring_col)]
+
+
+def columnas_tabla(df: pd.DataFrame, scoring_col: str) -> list[str]:
+    """
+    Scoring, banda, columnas relevantes y el resto; sin las internas del almacén (prefijo "_") ni las
+    contribuciones por variable (contrib__*), que se ven en el detalle de un empleado.
+    """
+    relevantes = [c for c in COLUMNAS_RELEVANTES if c in df.columns]
+    primeras = [scoring_col, "banda"] + relevantes
+    columnas = primeras + [c for c in df.columns if c not in primeras]
+    excluidas = set(columnas_contribucion(df.columns))
+    return [c for c in columnas if c in df.columns and not str(c).startswith("_") and c not in excluidas]
@@ -0,0 +1,84 @@
+"""
+Almacén columnar del dataset con scoring (Arrow IPC sin compresión, apto para memory map).
+
+Solo depende de pyarrow, pandas y esquema.py (sin sklearn ni joblib): lo importan tanto los scripts de
+scoring (a través de scoring.py) como el dashboard, que lo necesita en el arranque en frío.
+
+  write_scoring_store(df, ruta, metadata)  escribe el almacén (temporal + rename)
+  read_scoring_store(ruta, columns)        lo lee con memory map, solo con las columnas pedidas
+  read_store_schema(ruta)                  (columnas sin el índice, metadatos churn.*) sin leer los datos
+  read_store_metadata(ruta)                solo los metadatos churn.*
+"""
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from esquema import esquema_almacen
+
+SCORING_STORE_PATH = Path(__file__).resolve().parent.parent / "artifacts" / "modeling" / "df_con_scoring.feather"
+PREFIJO_METADATOS = "churn."
+
+
+def to_columnar(df: pd.DataFrame) -> pd.DataFrame:
+    """Tipos del almacén (esquema.esquema_almacen): categorías con niveles fijos, enteros pequeños, float32 y flags bool."""
+    return esquema_almacen(df)
+
+
+def write_scoring_store(df: pd.DataFrame, path: Path = SCORING_STORE_PATH, metadata: dict | None = None) -> Path:
+    """
+    Escribe df (índice id incluido) como archivo Arrow IPC sin compresión, apto para memory map.
+    metadata (valores JSON) se guarda en el esquema y se recupera con read_store_metadata.
+    Se escribe a un temporal y se renombra, para que un lector nunca vea un archivo a medias.
+    """
+    import pyarrow as pa
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(to_columnar(df), preserve_index=True)
+    if metadata:
+        extra = {f"{PREFIJO_METADATOS}{k}".encode(): json.dumps(v).encode() for k, v in metadata.items()}
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **extra})
+    tmp = path.with_name(path.name + ".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+    return path
+
+
+def read_scoring_store(path: Path = SCORING_STORE_PATH, columns=None) -> pd.DataFrame:
+    """
+    Lee el almacén Arrow con memory map (las páginas del archivo las comparte el sistema operativo entre
+    procesos) como DataFrame indexado por id; con columns solo se materializan esas columnas.
+    """
+    import pyarrow as pa
+
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    if columns is not None:
+        index_cols = [c for c in (table.schema.pandas_metadata or {}).get("index_columns", []) if isinstance(c, str)]
+        wanted = set(columns) | set(index_cols)
+        table = table.select([c for c in table.column_names if c in wanted])
+    return table.to_pandas(split_blocks=True)
+
+
+def read_store_schema(path: Path = SCORING_STORE_PATH) -> tuple[list[str], dict]:
+    """(columnas sin las del índice, metadatos churn.*) del almacén sin leer los datos."""
+    import pyarrow as pa
+
+    schema = pa.ipc.open_file(pa.memory_map(str(path), "r")).schema
+    index_cols = {c for c in (schema.pandas_metadata or {}).get("index_columns", []) if isinstance(c, str)}
+    metadata = {
+        k.decode()[len(PREFIJO_METADATOS):]: json.loads(v)
+        for k, v in (schema.metadata or {}).items()
+        if k.decode().startswith(PREFIJO_METADATOS)
+    }
+    return [c for c in schema.names if c not in index_cols], metadata
+
+
+def read_store_metadata(path: Path = SCORING_STORE_PATH) -> dict:
+    """Metadatos guardados con write_scoring_store(metadata=...); {} si el archivo no existe."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return read_store_schema(path)[1]
@@ -0,0 +1,80 @@
+"""
+Comprueba que scripts/features.py reproduce la salida del notebook.
+
+Aplica limpiar + construir_features al CSV en bruto y compara, columna a columna y por id:
+  - artifacts/data/df_procesado.joblib   (limpieza, salario_ano, impacto_abandono)
+  - artifacts/modeling/df_con_scoring.pkl (además ratio_estancamiento, indice_satisfaccion,
+                                           nunca_promovido, ratio_formacion)
+Sale con código 1 si alguna columna difiere.
+
+Ejecutar desde la raíz del proyecto:
+  python scripts/check_features.py
+  python scripts/check_features.py --csv otra_ruta/AbandonoEmpleados.csv
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from features import construir_features, limpiar
+from scoring import ARTIFACTS, CSV_NA_VALUES, CSV_SEP, INDEX_COL, ROOT, SCORING_COL
+
+REFERENCIAS = (
+    ROOT / "artifacts" / "data" / "df_procesado.joblib",
+    ARTIFACTS / "df_con_scoring.pkl",
+)
+
+
+def comparar(df: pd.DataFrame, ref: pd.DataFrame, rtol: float = 1e-9) -> list[str]:
+    """Diferencias entre df y ref (mismas columnas que ref, alineadas por id); [] si coinciden."""
+    errores = []
+    if not ref.index.isin(df.index).all():
+        errores.append(f"{int((~ref.index.isin(df.index)).sum())} ids de la referencia no están en el CSV")
+        return errores
+    df = df.loc[ref.index]
+    for col in ref.columns:
+        if col == SCORING_COL:
+            continue
+        if col not in df.columns:
+            errores.append(f"{col}: no se genera")
+            continue
+        a, b = df[col], ref[col]
+        if pd.api.types.is_numeric_dtype(b) and pd.api.types.is_numeric_dtype(a):
+            ok = np.isclose(a.to_numpy(dtype=np.float64), b.to_numpy(dtype=np.float64), rtol=rtol, atol=0, equal_nan=True)
+        else:
+            ok = (a.astype("object").to_numpy() == b.astype("object").to_numpy()) | (a.isna().to_numpy() & b.isna().to_numpy())
+        if not ok.all():
+            errores.append(f"{col}: {int((~ok).sum())} filas distintas (p. ej. id {ref.index[~ok][0]})")
+    return errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridad de scripts/features.py con la salida del notebook")
+    parser.add_argument("--csv", default=None, help="Ruta al CSV (default: AbandonoEmpleados.csv en la raíz)")
+    args = parser.parse_args()
+    csv_path = Path(args.csv) if args.csv else ROOT / "AbandonoEmpleados.csv"
+    if not csv_path.exists():
+        print(f"No se encontró {csv_path}.", file=sys.stderr)
+        sys.exit(1)
+
+    df = construir_features(limpiar(pd.read_csv(csv_path, sep=CSV_SEP, index_col=INDEX_COL, na_values=CSV_NA_VALUES)))
+    fallos = 0
+    for path in REFERENCIAS:
+        if not path.exists():
+            print(f"{path.name}: no existe, se omite")
+            continue
+        ref = joblib.load(path)
+        errores = comparar(df, ref)
+        fallos += len(errores)
+        estado = "OK" if not errores else "DIFERENCIAS"
+        print(f"{path.name}: {estado} ({len(ref):,} filas, {len(ref.columns)} columnas)")
+        for e in errores:
+            print(f"  - {e}")
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Artefacto de inferencia compilado: el mismo cálculo que preprocessor.pkl + best_model.pkl, sin
+recorrer el Pipeline imblearn ni el ColumnTransformer en cada llamada.
+
+  compiled_model.json  preprocessor plegado en tablas: por columna numérica valor de imputación,
+                       media y escala; por categórica, categoría -> índice de columna one-hot.
+  compiled_model.ubj   booster XGBoost extraído del pipeline (formato nativo, sin pickle).
+
+CompiledPreprocessor.transform construye directamente la matriz float32 con NumPy (CSR si el
+preprocessor original producía salida sparse, con los mismos ceros implícitos) y
+CompiledBooster.predict_proba usa Booster.inplace_predict. Ambos tienen la misma interfaz que el
+preprocessor y el modelo originales, así que scoring.score_frame funciona igual con unos u otros.
+Se genera con scripts/export_compiled_model.py (que comprueba la paridad con el pipeline) y
+scoring.load_artifacts(compiled=True) lo usa si corresponde a los .pkl actuales.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SPEC_NAME = "compiled_model.json"
+BOOSTER_NAME = "compiled_model.ubj"
+
+# Hasta este tamaño de lote las categorías se resuelven con un dict (menos coste fijo que get_indexer)
+MAX_FILAS_DICT = 256
+
+
+class CompiledPreprocessor:
+    """Equivalente a un ColumnTransformer (imputación + escalado, one-hot) ya ajustado."""
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.feature_names_in_ = np.asarray(spec["input_columns"], dtype=object)
+        self.n_features_out = int(spec["n_features_out"])
+        self.sparse_output = bool(spec.get("sparse_output", False))
+        self._numeric = []
+        self._onehot = []
+        for block in spec["blocks"]:
+            if block["kind"] == "numeric":
+                self._numeric.append((
+                    list(block["columns"]),
+                    int(block["offset"]),
+                    np.asarray(block["fill"], dtype=np.float64),
+                    np.asarray(block["mean"], dtype=np.float64),
+                    np.asarray(block["scale"], dtype=np.float64),
+                ))
+            else:
+                for col, cats, offset in zip(block["columns"], block["categories"], block["offsets"]):
+                    nivel_nan = next((i for i, c in enumerate(cats) if c is None), -1)
+                    niveles = pd.Index([c for c in cats if c is not None], dtype=object)
+                    pos = np.array([i for i, c in enumerate(cats) if c is not None], dtype=np.intp)
+                    lookup = {c: i for i, c in enumerate(cats) if c is not None}
+                    self._onehot.append((col, int(offset), niveles, pos, lookup, nivel_nan))
+
+    def transform(self, df: pd.DataFrame):
+        n = len(df)
+        numericas = [(offset, self._numeric_values(df, cols, fill, mean, scale)) for cols, offset, fill, mean, scale in self._numeric]
+        onehot = [(offset, self._onehot_codes(df, col, *rest)) for col, offset, *rest in self._onehot]
+        if self.sparse_output:
+            return self._to_csr(n, numericas, onehot)
+        X = np.zeros((n, self.n_features_out), dtype=np.float32)
+        for offset, vals in numericas:
+            X[:, offset:offset + vals.shape[1]] = vals
+        filas = np.arange(n)
+        for offset, codes in onehot:
+            ok = codes >= 0
+            X[filas[ok], offset + codes[ok]] = 1.0
+        return X
+
+    @staticmethod
+    def _numeric_values(df, cols, fill, mean, scale) -> np.ndarray:
+        vals = np.empty((len(df), len(cols)), dtype=np.float64)
+        for j, c in enumerate(cols):
+            vals[:, j] = df[c].to_numpy(dtype=np.float64, na_value=np.nan)
+        vals = np.where(np.isnan(vals), fill, vals)
+        return (vals - mean) / scale
+
+    def _to_csr(self, n: int, numericas, onehot):
+        """CSR como el de ColumnTransformer con one-hot sparse: los ceros numéricos no se almacenan."""
+        from scipy import sparse
+
+        rows, cols, data = [], [], []
+        for offset, vals in numericas:
+            r, c = np.nonzero(vals)
+            rows.append(r)
+            cols.append(c + offset)
+            data.append(vals[r, c])
+        for offset, codes in onehot:
+            r = np.flatnonzero(codes >= 0)
+            rows.append(r)
+            cols.append(codes[r] + offset)
+            data.append(np.ones(len(r)))
+        return sparse.csr_matrix(
+            (np.concatenate(data).astype(np.float32), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n, self.n_features_out),
+        )
+
+    @staticmethod
+    def _onehot_codes(df, col, niveles, pos, lookup, nivel_nan) -> np.ndarray:
+        """Índice de columna one-hot (relativo al bloque) por fila; -1 si la categoría es desconocida."""
+        n = len(df)
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Columna con el esquema (esquema.py): se resuelven las categorías una vez y se indexa por código
+            por_nivel = niveles.get_indexer(serie.cat.categories.astype(object))
+            por_nivel = np.append(np.where(por_nivel >= 0, pos[por_nivel], -1), -1)
+            codes = por_nivel[serie.cat.codes.to_numpy()]
+        elif n <= MAX_FILAS_DICT:
+            codes = np.fromiter((lookup.get(v, -1) for v in serie.to_numpy(dtype=object)), dtype=np.intp, count=n)
+        else:
+            codes = niveles.get_indexer(serie)
+            codes = np.where(codes >= 0, pos[codes], -1)
+        if nivel_nan >= 0:
+            codes = np.where(serie.isna().to_numpy(), nivel_nan, codes)
+        return codes
+
+
+class CompiledBooster:
+    """Booster XGBoost binario con predict_proba al estilo sklearn (columnas: clase 0, clase 1)."""
+
+    def __init__(self, booster, iteration_range: tuple[int, int] = (0, 0)):
+        self.booster = booster
+        self.iteration_range = tuple(iteration_range)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        p = self.booster.inplace_predict(X, iteration_range=self.iteration_range)
+        return np.column_stack([1.0 - p, p])
+
+
+def _numeric_block(transformer, columns: list[str]) -> dict:
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    steps = [s for _, s in transformer.steps] if isinstance(transformer, Pipeline) else [transformer]
+    n = len(columns)
+    fill, mean, scale = np.full(n, np.nan), np.zeros(n), np.ones(n)
+    for step in steps:
+        if isinstance(step, SimpleImputer) and not step.add_indicator:
+            fill = np.asarray(step.statistics_, dtype=np.float64)
+        elif isinstance(step, StandardScaler):
+            if step.mean_ is not None and step.with_mean:
+                mean = np.asarray(step.mean_, dtype=np.float64)
+            if step.scale_ is not None and step.with_std:
+                scale = np.asarray(step.scale_, dtype=np.float64)
+        else:
+            raise ValueError(f"Paso numérico no soportado: {step!r}")
+    return {"kind": "numeric", "columns": columns, "fill": fill.tolist(), "mean": mean.tolist(), "scale": scale.tolist()}
+
+
+def _onehot_block(encoder, columns: list[str]) -> dict:
+    if encoder.drop is not None or getattr(encoder, "_infrequent_enabled", False):
+        raise ValueError("OneHotEncoder con drop o categorías infrecuentes no soportado.")
+    if encoder.handle_unknown not in ("ignore", "infrequent_if_exist"):
+        raise ValueError("OneHotEncoder debe usar handle_unknown='ignore'.")
+    categories = [[None if pd.isna(c) else (c.item() if hasattr(c, "item") else c) for c in cats]
+                  for cats in encoder.categories_]
+    return {"kind": "onehot", "columns": columns, "categories": categories}
+
+
+def compile_artifacts(preprocessor, model) -> tuple[dict, object]:
+    """
+    Pliega preprocessor (ColumnTransformer ajustado) y extrae el booster del modelo (pipeline cuyo
+    último paso es un XGBClassifier binario). Devuelve (spec, booster). ValueError si no se puede.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder
+
+    if not isinstance(preprocessor, ColumnTransformer) or preprocessor.remainder != "drop":
+        raise ValueError("El preprocessor debe ser un ColumnTransformer con remainder='drop'.")
+    blocks, offset = [], 0
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == "drop" or len(columns) == 0:
+            continue
+        columns = [str(c) for c in columns]
+        if isinstance(transformer, OneHotEncoder):
+            block = _onehot_block(transformer, columns)
+            block["offsets"] = []
+            for cats in block["categories"]:
+                block["offsets"].append(offset)
+                offset += len(cats)
+        else:
+            block = _numeric_block(transformer, columns)
+            block["offset"] = offset
+            offset += len(columns)
+        blocks.append(block)
+
+    clf = model.steps[-1][1] if hasattr(model, "steps") else model
+    previos = [s for _, s in model.steps[:-1]] if hasattr(model, "steps") else []
+    if any(not hasattr(s, "fit_resample") for s in previos):
+        raise ValueError("El pipeline tiene pasos distintos de samplers antes del clasificador.")
+    if not hasattr(clf, "get_booster") or clf.get_params().get("objective") not in (None, "binary:logistic"):
+        raise ValueError("El clasificador debe ser un XGBClassifier binario.")
+    best = getattr(clf, "best_iteration", None) if getattr(clf, "early_stopping_rounds", None) else None
+    spec = {
+        "input_columns": [str(c) for c in preprocessor.feature_names_in_],
+        "n_features_out": offset,
+        "sparse_output": bool(getattr(preprocessor, "sparse_output_", False)),
+        "blocks": blocks,
+        "iteration_range": [0, int(best) + 1] if best is not None else [0, 0],
+    }
+    return spec, clf.get_booster()
+
+
+def save_compiled(artifacts_dir: Path, spec: dict, booster) -> None:
+    artifacts_dir = Path(artifacts_dir)
+    booster.save_model(str(artifacts_dir / BOOSTER_NAME))
+    with open(artifacts_dir / SPEC_NAME, "w", encoding="utf-8") as f:
+        json.dump(spec, f, indent=2, ensure_ascii=False)
+
+
+def load_compiled(artifacts_dir: Path) -> tuple[dict, CompiledPreprocessor, CompiledBooster] | None:
+    """(spec, preprocessor, modelo) compilados, o None si no existen en artifacts_dir."""
+    import xgboost as xgb
+
+    artifacts_dir = Path(artifacts_dir)
+    spec_path, booster_path = artifacts_dir / SPEC_NAME, artifacts_dir / BOOSTER_NAME
+    if not (spec_path.exists() and booster_path.exists()):
+        return None
+    with open(spec_path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    booster = xgb.Booster()
+    booster.load_model(str(booster_path))
+    return spec, CompiledPreprocessor(spec), CompiledBooster(booster, spec.get("iteration_range", (0, 0)))
@@ -0,0 +1,88 @@
+"""
+Contribuciones por empleado al scoring (TreeSHAP nativo de XGBoost, Booster.predict(pred_contribs=True)).
+
+Se calculan por lotes al puntuar y se guardan junto al scoring como columnas float32
+contrib__<variable>, una por variable de entrada: las columnas one-hot de una categórica se suman en
+su variable. Están en log-odds: para cada empleado, base + suma de contribuciones = logit(scoring).
+La base (contribución del sesgo, igual para todos) va en los metadatos del almacén.
+
+Lo usan scripts/score_incremental.py y scripts/export_scoring_store.py; el dashboard solo lee las
+columnas y las agrega por segmento con los filtros del sidebar.
+"""
+import numpy as np
+import pandas as pd
+
+from features import preparar_entrada
+
+CONTRIB_PREFIX = "contrib__"
+CHUNKSIZE = 100_000
+
+
+def columna_contribucion(variable: str) -> str:
+    return f"{CONTRIB_PREFIX}{variable}"
+
+
+def variables_transformadas(preprocessor) -> list[tuple[str, int, int]]:
+    """
+    (variable de entrada, primera columna, nº de columnas) en la salida del preprocessor, en orden.
+    Admite el ColumnTransformer de preprocessor.pkl y el CompiledPreprocessor (compiled_model.py).
+    """
+    if hasattr(preprocessor, "spec"):
+        out = []
+        for block in preprocessor.spec["blocks"]:
+            if block["kind"] == "numeric":
+                out += [(c, block["offset"] + i, 1) for i, c in enumerate(block["columns"])]
+            else:
+                out += [(c, o, len(cats)) for c, o, cats in zip(block["columns"], block["offsets"], block["categories"])]
+        return sorted(out, key=lambda v: v[1])
+
+    from sklearn.preprocessing import OneHotEncoder
+
+    out, offset = [], 0
+    for _, transformer, columns in preprocessor.transformers_:
+        if transformer == "drop" or len(columns) == 0:
+            continue
+        if isinstance(transformer, OneHotEncoder):
+            anchos = [len(cats) for cats in transformer.categories_]
+        else:
+            if len(transformer.get_feature_names_out()) != len(columns):
+                raise ValueError(f"No se puede asignar la salida de {transformer!r} a sus columnas de entrada.")
+            anchos = [1] * len(columns)
+        for col, ancho in zip(columns, anchos):
+            out.append((str(col), offset, ancho))
+            offset += ancho
+    return out
+
+
+def _booster(model):
+    """(Booster XGBoost, iteration_range) del modelo: CompiledBooster, pipeline con XGBClassifier o XGBClassifier."""
+    if hasattr(model, "booster") and hasattr(model, "iteration_range"):
+        return model.booster, tuple(model.iteration_range)
+    clf = model.steps[-1][1] if hasattr(model, "steps") else model
+    if not hasattr(clf, "get_booster"):
+        raise ValueError(f"Las contribuciones requieren un modelo XGBoost; el modelo es {type(clf).__name__}.")
+    best = getattr(clf, "best_iteration", None) if getattr(clf, "early_stopping_rounds", None) else None
+    return clf.get_booster(), (0, int(best) + 1) if best is not None else (0, 0)
+
+
+def contribuciones_frame(preprocessor, model, df: pd.DataFrame, columns: list[str]) -> tuple[pd.DataFrame, float]:
+    """
+    Contribuciones float32 por variable de entrada (columnas contrib__<variable>, mismo índice que df)
+    y la base en log-odds. ValueError si el modelo no es XGBoost.
+    """
+    import xgboost as xgb
+
+    booster, iteration_range = _booster(model)
+    variables = variables_transformadas(preprocessor)
+    inicios = np.array([inicio for _, inicio, _ in variables], dtype=np.intp)
+    df = preparar_entrada(df, columns)
+    out = np.empty((len(df), len(variables)), dtype=np.float32)
+    base = 0.0
+    for start in range(0, len(df), CHUNKSIZE):
+        X_t = preprocessor.transform(df[columns].iloc[start:start + CHUNKSIZE])
+        contribs = booster.predict(xgb.DMatrix(X_t), pred_contribs=True, iteration_range=iteration_range)
+        # Última columna: sesgo (constante); el resto se suma por variable de entrada
+        out[start:start + CHUNKSIZE] = np.add.reduceat(contribs[:, :-1], inicios, axis=1)
+        base = float(contribs[0, -1])
+    nombres = [columna_contribucion(v) for v, _, _ in variables]
+    return pd.DataFrame(out, index=df.index, columns=nombres), base
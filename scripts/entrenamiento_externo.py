@@ -0,0 +1,362 @@
+"""
+Entrenamiento fuera de memoria (export_model_artifacts.py --externo): el mismo modelo que el
+entrenamiento en memoria, con la memoria acotada por el tamaño de bloque y no por el de los datos.
+
+En memoria, _prepare_data lee todo el CSV, lo transforma con el ColumnTransformer y SMOTE + XGBoost
+entrenan sobre la matriz completa en float64. Aquí los datos pasan por disco en bloques de filas_bloque:
+  1. El CSV (o un Parquet con las mismas columnas) se lee por bloques, se limpia y se le agregan las
+     features de features.py, y se escribe un Parquet con un row group por bloque (numéricas en
+     float64, categóricas como diccionario). Los tipos se fijan con el primer bloque.
+  2. El split es el de train_test_split sobre el número de filas: los mismos índices que en memoria.
+  3. El preprocessor se ajusta en streaming. En una primera pasada se obtienen las medianas exactas
+     (conteo de valores por columna), los vocabularios de las categóricas y una muestra mínima de
+     filas que los contiene. En la segunda, media y varianza con StandardScaler.partial_fit sobre las
+     filas imputadas. El ColumnTransformer se ajusta sobre la muestra y recibe esas estadísticas.
+  4. Tercera pasada: cada bloque se transforma y sus filas de train se reparten en cubetas según su
+     posición en la permutación de train_test_split (permutación externa). Las filas de las clases
+     a sobremuestrear quedan en memoria: SMOTE necesita sus vecinos, como en memoria.
+  5. SMOTEEscalable calcula los vecinos y sortea las muestras como en el pipeline (con el sampler que
+     elige crear_smote; imblearn.SMOTE se sustituye por el modo exacto, que genera las mismas).
+  6. XGBoost entrena con ExtMemQuantileDMatrix alimentado por un DataIter. Recorre las cubetas en
+     orden, que es el orden de las filas en memoria, y después genera por bloques las muestras de
+     SMOTE. El orden importa: las mismas filas en otro orden dan otro modelo.
+
+Memoria: un bloque y su transformación, las filas de la clase minoritaria y 4 bytes por fila para el
+split. Disco: el Parquet, las cubetas en float32 y las páginas de XGBoost, en un directorio temporal
+que se borra al terminar. Comparación con el entrenamiento en memoria (tiempo, pico de RSS y
+probabilidades): benchmarks/bench_entrenamiento_externo.py.
+"""
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xgboost as xgb
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
+
+from esquema import aplicar_esquema
+from export_model_artifacts import (
+    RANDOM_STATE,
+    ROOT,
+    TEST_SIZE,
+    _build_pipeline,
+    _build_preprocessor,
+    _columnas_modelo,
+    _default_classifier,
+    _tipos_columnas,
+)
+from features import construir_features, limpiar
+from model_search import SMOTE_PARAMS
+from scoring import read_csv_chunks
+from smote_escalable import SMOTEEscalable, crear_smote, interpolar
+
+FILAS_BLOQUE = 100_000
+DIR_TRABAJO = ROOT / "artifacts" / "cache" / "externo"
+ETIQUETA = "abandono"
+
+
+def bloques_origen(ruta: Path, filas_bloque: int):
+    """Bloques de filas en bruto (esquema aplicado) de un CSV con el formato del proyecto o de un Parquet."""
+    if Path(ruta).suffix == ".parquet":
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=filas_bloque):
+            yield aplicar_esquema(lote.to_pandas())
+    else:
+        yield from read_csv_chunks(ruta, filas_bloque)
+
+
+def a_parquet(origen: Path, destino: Path, feature_columns: list[str], filas_bloque: int = FILAS_BLOQUE) -> dict:
+    """
+    Escribe en destino las columnas del modelo (con las features derivadas) y la etiqueta, un row group
+    por bloque. Devuelve filas y columnas numéricas/categóricas (sin las que no tienen ningún valor).
+    """
+    writer, n = None, 0
+    try:
+        for bloque in bloques_origen(origen, filas_bloque):
+            df = construir_features(limpiar(bloque))
+            if ETIQUETA not in df.columns:
+                raise ValueError(f"{origen} no tiene columna '{ETIQUETA}'.")
+            if writer is None:
+                columnas = _columnas_modelo(df, feature_columns)
+                num_cols, cat_cols = _tipos_columnas(df[columnas])
+                esquema = pa.schema(
+                    [(c, pa.float64()) for c in num_cols]
+                    + [(c, _tipo_categorica(df[c])) for c in cat_cols]
+                    + [(ETIQUETA, pa.int8())]
+                )
+                writer = pq.ParquetWriter(destino, esquema)
+                no_nulos = dict.fromkeys(columnas, 0)
+            tabla = df[num_cols + cat_cols + [ETIQUETA]]
+            for c in columnas:
+                no_nulos[c] += int(tabla[c].notna().sum())
+            writer.write_table(pa.Table.from_pandas(tabla, schema=esquema, preserve_index=False), row_group_size=filas_bloque)
+            n += len(tabla)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError(f"{origen} no tiene filas.")
+    # Como X.dropna(axis=1, how="all") en memoria
+    return {
+        "filas": n,
+        "num_cols": [c for c in num_cols if no_nulos[c]],
+        "cat_cols": [c for c in cat_cols if no_nulos[c]],
+    }
+
+
+def _tipo_categorica(serie: pd.Series) -> pa.DataType:
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return pa.dictionary(pa.int32(), pa.string(), ordered=serie.cat.ordered)
+    if pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.Schema.from_pandas(serie.to_frame()).field(serie.name).type
+
+
+def posiciones_train(n: int) -> np.ndarray:
+    """Posición de cada fila en el train de train_test_split (como en memoria); -1 si es de test."""
+    train_idx, _ = train_test_split(np.arange(n), test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    posiciones = np.full(n, -1, dtype=np.int32)
+    posiciones[train_idx] = np.arange(len(train_idx), dtype=np.int32)
+    return posiciones
+
+
+def _row_groups(ruta: Path, columnas: list[str]):
+    """(fila inicial, DataFrame) de cada row group."""
+    archivo = pq.ParquetFile(ruta)
+    inicio = 0
+    for i in range(archivo.num_row_groups):
+        df = archivo.read_row_group(i, columns=columnas).to_pandas()
+        yield inicio, df
+        inicio += len(df)
+
+
+class EstadisticasStreaming:
+    """
+    Lo que el preprocessor necesita de las filas de train, acumulado bloque a bloque: conteo de cada
+    valor de las numéricas (medianas exactas), valores de las categóricas, clases de la etiqueta y una
+    muestra con la primera fila de cada valor categórico nuevo y el primer valor no nulo de cada numérica.
+    """
+
+    def __init__(self, num_cols: list[str], cat_cols: list[str]):
+        self.num_cols = num_cols
+        self.cat_cols = cat_cols
+        self.valores = {c: (np.empty(0), np.empty(0, dtype=np.int64)) for c in num_cols}
+        self.vistos: dict[str, set] = {c: set() for c in cat_cols}
+        self.clases: dict = {}
+        self._muestra: list[pd.DataFrame] = []
+
+    def actualizar(self, df: pd.DataFrame, y: np.ndarray) -> None:
+        nuevas = np.zeros(len(df), dtype=bool)
+        for c in self.num_cols:
+            v = df[c].to_numpy(dtype=np.float64, na_value=np.nan)
+            observados = ~np.isnan(v)
+            if observados.any() and len(self.valores[c][0]) == 0:
+                nuevas[np.argmax(observados)] = True
+            u, k = np.unique(v[observados], return_counts=True)
+            self.valores[c] = _sumar_conteos(*self.valores[c], u, k)
+        for c in self.cat_cols:
+            codigos, unicos = pd.factorize(df[c], use_na_sentinel=False)
+            _, primeras = np.unique(codigos, return_index=True)
+            for valor, fila in zip(unicos[np.unique(codigos)], primeras):
+                clave = None if pd.isna(valor) else valor
+                if clave not in self.vistos[c]:
+                    self.vistos[c].add(clave)
+                    nuevas[fila] = True
+        if nuevas.any():
+            self._muestra.append(df[nuevas])
+        for clase, n in zip(*np.unique(y, return_counts=True)):
+            self.clases[clase] = self.clases.get(clase, 0) + int(n)
+
+    def medianas(self) -> np.ndarray:
+        """Mediana de cada numérica como la de SimpleImputer (np.ma.median: media de los dos centrales)."""
+        out = np.full(len(self.num_cols), np.nan)
+        for i, c in enumerate(self.num_cols):
+            u, k = self.valores[c]
+            n = int(k.sum())
+            if n == 0:
+                continue
+            acumulado = np.cumsum(k)
+            bajo, alto = u[np.searchsorted(acumulado, [(n - 1) // 2, n // 2], side="right")]
+            out[i] = bajo if n % 2 else (bajo + alto) / 2
+        return out
+
+    def preprocessor(self):
+        """ColumnTransformer ajustado sobre la muestra, con las medianas de todas las filas (falta la escala)."""
+        muestra = pd.concat(self._muestra)[self.num_cols + self.cat_cols]
+        pre = _build_preprocessor(self.num_cols, self.cat_cols).fit(muestra)
+        if self.num_cols:
+            pre.named_transformers_["num"].named_steps["impute"].statistics_ = self.medianas()
+        return pre
+
+
+def _sumar_conteos(u1: np.ndarray, k1: np.ndarray, u2: np.ndarray, k2: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Une dos conteos de valores (valores ordenados y sin repetir)."""
+    if len(u1) == 0:
+        return u2, k2
+    u, inversa = np.unique(np.concatenate([u1, u2]), return_inverse=True)
+    return u, np.bincount(inversa, weights=np.concatenate([k1, k2]), minlength=len(u)).astype(np.int64)
+
+
+class BloquesEntrenamiento(xgb.DataIter):
+    """
+    Filas de entrenamiento para XGBoost, en el orden del pipeline en memoria: las cubetas de train
+    ordenadas por posición y después las muestras de SMOTE de cada clase, generadas por bloques.
+    """
+
+    def __init__(self, cubetas: list[Path], n_columnas: int, sinteticas: list[dict], filas_bloque: int,
+                 cache_prefix: str):
+        self._piezas = [("cubeta", ruta) for ruta in cubetas]
+        for i, s in enumerate(sinteticas):
+            self._piezas += [("smote", i, inicio) for inicio in range(0, len(s["filas"]), filas_bloque)]
+        self._n_columnas = n_columnas
+        self._sinteticas = sinteticas
+        self._filas_bloque = filas_bloque
+        self._i = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._i >= len(self._piezas):
+            return False
+        X, y = self._pieza(self._piezas[self._i])
+        self._i += 1
+        input_data(data=X, label=y)
+        return True
+
+    def reset(self) -> None:
+        self._i = 0
+
+    def _pieza(self, pieza: tuple) -> tuple[np.ndarray, np.ndarray]:
+        if pieza[0] == "cubeta":
+            ruta = pieza[1]
+            orden = np.argsort(np.fromfile(ruta.with_suffix(".pos"), dtype=np.int32))
+            X = np.fromfile(ruta.with_suffix(".x"), dtype=np.float32).reshape(-1, self._n_columnas)
+            return X[orden], np.fromfile(ruta.with_suffix(".y"), dtype=np.int8)[orden]
+        s = self._sinteticas[pieza[1]]
+        tramo = slice(pieza[2], pieza[2] + self._filas_bloque)
+        X = interpolar(s["X"], s["vecinos"], s["filas"][tramo], s["cols"][tramo], s["pasos"][tramo])
+        return X, np.full(len(X), s["clase"], dtype=np.int8)
+
+
+def entrenar_externo(origen: Path, feature_columns: list[str], filas_bloque: int = FILAS_BLOQUE, smote: str = "auto",
+                     float32: bool = False, directorio: Path = DIR_TRABAJO, informar=print) -> dict:
+    """
+    Entrena el pipeline por defecto (SMOTE + XGBoost de export_model_artifacts.py) sin cargar los datos
+    en memoria. Devuelve preprocessor, pipeline y clf (como el entrenamiento en memoria), probabilidades
+    y etiquetas del test (test_proba, test_y) y tiempos por etapa.
+    """
+    Path(directorio).mkdir(parents=True, exist_ok=True)
+    tiempos = {}
+    with tempfile.TemporaryDirectory(prefix="externo_", dir=directorio) as tmp:
+        tmp = Path(tmp)
+        t0 = time.perf_counter()
+        info = a_parquet(origen, tmp / "datos.parquet", feature_columns, filas_bloque)
+        num_cols, cat_cols = info["num_cols"], info["cat_cols"]
+        if not num_cols and not cat_cols:
+            raise ValueError("No quedan columnas útiles para entrenar.")
+        columnas = num_cols + cat_cols
+        posiciones = posiciones_train(info["filas"])
+        n_train = int((posiciones >= 0).sum())
+        tiempos["parquet_s"] = time.perf_counter() - t0
+        informar(f"Parquet: {info['filas']:,} filas ({n_train:,} de train) en bloques de {filas_bloque:,} "
+                 f"({tiempos['parquet_s']:.1f} s)")
+
+        t0 = time.perf_counter()
+        estadisticas = EstadisticasStreaming(num_cols, cat_cols)
+        for inicio, df in _row_groups(tmp / "datos.parquet", columnas + [ETIQUETA]):
+            train = posiciones[inicio:inicio + len(df)] >= 0
+            estadisticas.actualizar(df.loc[train, columnas], df[ETIQUETA].to_numpy()[train])
+        preprocessor = estadisticas.preprocessor()
+        if num_cols:
+            num = preprocessor.named_transformers_["num"]
+            imputador, escalador = num.named_steps["impute"], clone(num.named_steps["scale"])
+            for inicio, df in _row_groups(tmp / "datos.parquet", num_cols):
+                train = posiciones[inicio:inicio + len(df)] >= 0
+                escalador.partial_fit(imputador.transform(df.loc[train]))
+            num.steps[-1] = ("scale", escalador)
+        tiempos["preprocessor_s"] = time.perf_counter() - t0
+        informar(f"Preprocessor ajustado en streaming ({tiempos['preprocessor_s']:.1f} s)")
+
+        clases = np.array(sorted(estadisticas.clases))
+        conteos = np.array([estadisticas.clases[c] for c in clases])
+        sampler = crear_smote(smote, n_train, False, float32, **SMOTE_PARAMS)
+        if not isinstance(sampler, SMOTEEscalable):
+            # Modo exacto: los mismos vecinos y las mismas muestras que imblearn.SMOTE
+            sampler = SMOTEEscalable(**SMOTE_PARAMS, algoritmo="exacto")
+        objetivos = {c: n for c, n in sampler.objetivos(clases, conteos).items() if n > 0}
+
+        t0 = time.perf_counter()
+        (tmp / "cubetas").mkdir()
+        minoria = {c: ([], []) for c in objetivos}
+        n_columnas = None
+        for inicio, df in _row_groups(tmp / "datos.parquet", columnas + [ETIQUETA]):
+            pos = posiciones[inicio:inicio + len(df)]
+            train = pos >= 0
+            X = preprocessor.transform(df.loc[train, columnas])
+            pos, y = pos[train], df[ETIQUETA].to_numpy(dtype=np.int8)[train]
+            n_columnas = X.shape[1]
+            _repartir(tmp / "cubetas", X.astype(np.float32), pos, y, filas_bloque)
+            for clase, (bloques, pos_clase) in minoria.items():
+                bloques.append(X[y == clase].astype(np.float32 if float32 else np.float64))
+                pos_clase.append(pos[y == clase])
+            del X
+        cubetas = sorted((tmp / "cubetas").glob("*.x"))
+        tiempos["transformacion_s"] = time.perf_counter() - t0
+        informar(f"Transformado en {len(cubetas)} cubetas de train ({tiempos['transformacion_s']:.1f} s)")
+
+        t0 = time.perf_counter()
+        sinteticas = []
+        for clase, n_muestras in objetivos.items():
+            bloques, pos_clase = minoria.pop(clase)
+            X_clase = np.vstack(bloques)[np.argsort(np.concatenate(pos_clase))]
+            del bloques
+            vecinos = sampler.vecinos(X_clase)
+            filas, cols, pasos = sampler.sorteo(vecinos, n_muestras)
+            sinteticas.append({"clase": clase, "X": X_clase, "vecinos": vecinos, "filas": filas, "cols": cols, "pasos": pasos})
+        tiempos["smote_s"] = time.perf_counter() - t0
+        informar(f"Sobremuestreo: {type(sampler).__name__} ({sampler._algoritmo(len(X_clase)) if sinteticas else '-'}), "
+                 f"{sum(objetivos.values()):,} muestras ({tiempos['smote_s']:.1f} s)")
+
+        t0 = time.perf_counter()
+        scale_pos_weight = conteos[clases == 0].sum() / max(conteos[clases == 1].sum(), 1)
+        clf = _default_classifier(scale_pos_weight)
+        iterador = BloquesEntrenamiento(cubetas, n_columnas, sinteticas, filas_bloque, str(tmp / "xgb"))
+        dtrain = xgb.ExtMemQuantileDMatrix(iterador, missing=clf.missing, nthread=clf.n_jobs, max_bin=clf.max_bin)
+        booster = xgb.train(clf.get_xgb_params(), dtrain, clf.get_num_boosting_rounds())
+        del dtrain
+        params = clf.get_params()
+        clf.load_model(bytearray(booster.save_raw(raw_format="ubj")))
+        # load_model deja los hiperparámetros del booster (base_score aprendido, ...): los del clasificador
+        clf.set_params(**params)
+        tiempos["xgboost_s"] = time.perf_counter() - t0
+        informar(f"XGBoost con memoria externa ({tiempos['xgboost_s']:.1f} s)")
+
+        # Probabilidades del test por bloques, para las métricas del manifest
+        t0 = time.perf_counter()
+        test_proba, test_y = [], []
+        for inicio, df in _row_groups(tmp / "datos.parquet", columnas + [ETIQUETA]):
+            test = posiciones[inicio:inicio + len(df)] < 0
+            test_proba.append(clf.predict_proba(preprocessor.transform(df.loc[test, columnas]))[:, 1])
+            test_y.append(df[ETIQUETA].to_numpy(dtype=np.int8)[test])
+        tiempos["test_s"] = time.perf_counter() - t0
+
+    pipeline = _build_pipeline(clf, smote, n_train, False, float32)
+    return {"preprocessor": preprocessor, "pipeline": pipeline, "clf": clf, "filas": info["filas"],
+            "filas_train": n_train, "test_proba": np.concatenate(test_proba), "test_y": np.concatenate(test_y),
+            "tiempos": tiempos}
+
+
+def _repartir(directorio: Path, X: np.ndarray, pos: np.ndarray, y: np.ndarray, filas_bloque: int) -> None:
+    """Añade cada fila a la cubeta de su posición (posición // filas_bloque): .x float32, .pos int32, .y int8."""
+    cubeta = pos // filas_bloque
+    orden = np.argsort(cubeta, kind="stable")
+    limites = np.flatnonzero(np.diff(cubeta[orden])) + 1
+    for grupo in np.split(orden, limites):
+        if len(grupo) == 0:
+            continue
+        base = directorio / f"{cubeta[grupo[0]]:06d}"
+        for sufijo, datos in ((".x", X[grupo]), (".pos", pos[grupo]), (".y", y[grupo])):
+            with open(base.with_suffix(sufijo), "ab") as f:
+                datos.tofile(f)
@@ -0,0 +1,190 @@
+"""
+Esquema declarado de los datos de empleados (columnas de AbandonoEmpleados.csv y del dataset con scoring).
+
+Un único sitio para los tipos que usan el entrenamiento, el scoring y el dashboard:
+  - categóricas con niveles fijos (ordenadas las de nivel: Baja < Media < Alta < Muy_Alta, Primaria <
+    ... < Master, Non-Travel < Travel_Rarely < Travel_Frequently); un nivel que no está declarado
+    (p. ej. un departamento nuevo en el HRIS) se añade al final, nunca se pierde;
+  - enteros reducidos a int8/int16/int32 (si los valores caben; si no, el entero más pequeño que sirve);
+  - en el almacén del dashboard, además: float32 para las columnas decimales y flags 0/1 como bool.
+
+Las features derivadas que entran al modelo se siguen calculando en float64 (features.py): el esquema
+solo cambia cómo se guardan las columnas en bruto, no los valores, y el preprocessor ve las mismas
+categorías (texto) y los mismos números que antes.
+
+  leer_csv(ruta)        CSV con el formato del proyecto (';', '#N/D') con pyarrow si está instalado
+  aplicar_esquema(df)   categóricas y enteros declarados (entrada de entrenamiento y scoring)
+  esquema_almacen(df)   aplicar_esquema + float32 + flags bool (dataset con scoring / dashboard)
+  informe_memoria(a, b) texto "X MB -> Y MB (N×)" para comparar la memoria de dos DataFrames
+
+Memoria del CSV y del dataset con scoring con y sin esquema:
+  python scripts/esquema.py
+"""
+import numpy as np
+import pandas as pd
+
+CSV_SEP = ";"
+CSV_NA_VALUES = "#N/D"
+INDEX_COL = "id"
+
+NIVELES_SATISFACCION = ("Baja", "Media", "Alta", "Muy_Alta")
+
+# Columna -> (niveles en orden, ordenada)
+CATEGORICAS = {
+    "abandono": (("No", "Yes"), False),
+    "viajes": (("Non-Travel", "Travel_Rarely", "Travel_Frequently"), True),
+    "departamento": (("Human Resources", "Research & Development", "Sales"), False),
+    "educacion": (("Primaria", "Secundaria", "Universitaria", "Master"), True),
+    "carrera": (("Human Resources", "Life Sciences", "Marketing", "Medical", "Other", "Technical Degree"), False),
+    "satisfaccion_entorno": (NIVELES_SATISFACCION, True),
+    "implicacion": (NIVELES_SATISFACCION, True),
+    "puesto": (("Healthcare Representative", "Human Resources", "Laboratory Technician", "Manager",
+                "Manufacturing Director", "Research Director", "Research Scientist", "Sales Executive",
+                "Sales Representative"), False),
+    "satisfaccion_trabajo": (NIVELES_SATISFACCION, True),
+    "estado_civil": (("Single", "Married", "Divorced"), False),
+    "mayor_edad": (("N", "Y"), False),
+    "horas_extra": (("No", "Yes"), False),
+    "evaluacion": (NIVELES_SATISFACCION, True),
+    "satisfaccion_companeros": (NIVELES_SATISFACCION, True),
+    "conciliacion": (NIVELES_SATISFACCION, True),
+}
+
+ENTEROS = {
+    "edad": "int8",
+    "distancia_casa": "int8",
+    "empleados": "int8",
+    "nivel_laboral": "int8",
+    "salario_mes": "int32",
+    "num_empresas_anteriores": "int8",
+    "incremento_salario_porc": "int8",
+    "horas_quincena": "int16",
+    "nivel_acciones": "int8",
+    "anos_experiencia": "int8",
+    "num_formaciones_ult_ano": "int8",
+    "anos_compania": "int8",
+    "anos_desde_ult_promocion": "int8",
+    "anos_con_manager_actual": "int8",
+    "salario_ano": "int32",
+    # abandono ya como 0/1 (tras features.limpiar)
+    "abandono": "int8",
+}
+
+# Solo en el almacén del dashboard
+FLAGS = ("nunca_promovido",)
+
+
+def leer_csv(ruta, usecols: list[str] | None = None) -> pd.DataFrame:
+    """
+    Lee un CSV con el formato de AbandonoEmpleados.csv y le aplica el esquema. Con pyarrow el CSV se
+    parsea en paralelo y las categóricas se codifican en Arrow (sin pasar por objetos str de Python);
+    sin pyarrow, motor C de pandas.
+    """
+    cols = None if usecols is None else [INDEX_COL] + [c for c in usecols if c != INDEX_COL]
+    try:
+        df = _leer_csv_pyarrow(ruta, cols)
+    except ImportError:
+        df = pd.read_csv(ruta, sep=CSV_SEP, index_col=INDEX_COL, na_values=CSV_NA_VALUES, usecols=cols,
+                         dtype=dtypes_lectura(cols))
+    return aplicar_esquema(df)
+
+
+def _leer_csv_pyarrow(ruta, cols: list[str] | None) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv
+
+    # Mismos faltantes que pandas por defecto ("", "NA", "NaN", ...) más '#N/D'
+    convert = csv.ConvertOptions(include_columns=cols, strings_can_be_null=True)
+    convert.null_values = list(convert.null_values) + [CSV_NA_VALUES]
+    tabla = csv.read_csv(ruta, parse_options=csv.ParseOptions(delimiter=CSV_SEP), convert_options=convert)
+    for i, nombre in enumerate(tabla.column_names):
+        if nombre in CATEGORICAS and pa.types.is_string(tabla.schema.field(i).type):
+            tabla = tabla.set_column(i, nombre, pc.dictionary_encode(tabla.column(i)))
+    return tabla.to_pandas().set_index(INDEX_COL)
+
+
+def dtypes_lectura(usecols: list[str] | None = None) -> dict:
+    """dtype= para pd.read_csv con el motor C (lectura por bloques): categóricas como category."""
+    return {c: "category" for c in CATEGORICAS if usecols is None or c in usecols}
+
+
+def aplicar_esquema(df: pd.DataFrame) -> pd.DataFrame:
+    """Categóricas con sus niveles declarados y enteros reducidos; las demás columnas no cambian."""
+    nuevas = {}
+    for col in df.columns:
+        serie = df[col]
+        if col in CATEGORICAS and not pd.api.types.is_numeric_dtype(serie):
+            niveles, ordenada = CATEGORICAS[col]
+            nuevas[col] = _categorica(serie, niveles, ordenada)
+        elif col in ENTEROS and pd.api.types.is_integer_dtype(serie) and not isinstance(serie.dtype, pd.CategoricalDtype):
+            nuevas[col] = _entero(serie, ENTEROS[col])
+    return df.assign(**nuevas) if nuevas else df
+
+
+def esquema_almacen(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tipos del dataset con scoring para el dashboard: aplicar_esquema, el resto de texto a category,
+    decimales a float32 y flags 0/1 a bool.
+    """
+    out = aplicar_esquema(df)
+    nuevas = {}
+    for col in out.columns:
+        serie = out[col]
+        if col in FLAGS and pd.api.types.is_integer_dtype(serie) and serie.isin([0, 1]).all():
+            nuevas[col] = serie.astype(bool)
+        elif pd.api.types.is_float_dtype(serie) and serie.dtype != np.float32:
+            nuevas[col] = serie.astype(np.float32)
+        elif pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+            if not isinstance(serie.dtype, pd.CategoricalDtype):
+                nuevas[col] = serie.astype("category")
+    return out.assign(**nuevas) if nuevas else out
+
+
+def _categorica(serie: pd.Series, niveles: tuple[str, ...], ordenada: bool) -> pd.Series:
+    actuales = serie.cat.categories if isinstance(serie.dtype, pd.CategoricalDtype) else pd.Index(serie.dropna().unique())
+    extra = sorted(str(c) for c in actuales if c not in niveles)
+    dtype = pd.CategoricalDtype(list(niveles) + extra, ordered=ordenada)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.set_categories(dtype.categories, ordered=ordenada)
+    return serie.astype(dtype)
+
+
+def _entero(serie: pd.Series, dtype: str) -> pd.Series:
+    info = np.iinfo(dtype)
+    if len(serie) == 0 or (serie.min() >= info.min and serie.max() <= info.max):
+        return serie.astype(dtype)
+    return pd.to_numeric(serie, downcast="integer")
+
+
+def memoria(df: pd.DataFrame) -> int:
+    """Bytes en RAM de df, contando el contenido de las columnas de texto."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def informe_memoria(antes: pd.DataFrame, despues: pd.DataFrame) -> str:
+    a, b = memoria(antes), memoria(despues)
+    return f"{a / 1e6:,.1f} MB -> {b / 1e6:,.1f} MB ({a / max(b, 1):.1f}×)"
+
+
+def main():
+    import argparse
+    from pathlib import Path
+
+    root = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description="Memoria del CSV y del dataset con scoring con y sin el esquema declarado")
+    parser.add_argument("--csv", default=str(root / "AbandonoEmpleados.csv"))
+    parser.add_argument("--scoring", default=str(root / "artifacts" / "modeling" / "df_con_scoring.pkl"))
+    args = parser.parse_args()
+
+    inferido = pd.read_csv(args.csv, sep=CSV_SEP, index_col=INDEX_COL, na_values=CSV_NA_VALUES)
+    print(f"CSV ({len(inferido):,} filas), tipos inferidos -> esquema: {informe_memoria(inferido, leer_csv(args.csv))}")
+    if Path(args.scoring).exists():
+        import joblib
+
+        df = joblib.load(args.scoring)
+        print(f"Dataset con scoring ({len(df):,} filas) -> esquema del almacén: {informe_memoria(df, esquema_almacen(df))}")
+
+
+if __name__ == "__main__":
+    main()
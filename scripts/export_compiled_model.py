@@ -0,0 +1,76 @@
+"""
+Genera el artefacto de inferencia compilado (compiled_model.json + compiled_model.ubj) junto a
+best_model.pkl y comprueba que puntúa igual que el pipeline original sobre el CSV.
+
+Ejecutar desde la raíz del proyecto (también lo llama export_model_artifacts.py al terminar):
+  python scripts/export_compiled_model.py
+  python scripts/export_compiled_model.py --csv otra_ruta/AbandonoEmpleados.csv --tolerance 1e-6
+
+Si la diferencia máxima de probabilidad supera --tolerance no se escribe nada (código de salida 1).
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from compiled_model import CompiledBooster, CompiledPreprocessor, compile_artifacts, save_compiled
+from esquema import leer_csv
+from scoring import (
+    ARTIFACTS,
+    ROOT,
+    artifacts_hash,
+    input_columns,
+    load_artifacts,
+    load_manifest,
+    score_frame,
+)
+
+DEFAULT_TOLERANCE = 1e-6
+
+
+def export_compiled(artifacts_dir: Path = ARTIFACTS, csv_path: Path | None = None,
+                    tolerance: float = DEFAULT_TOLERANCE) -> float:
+    """
+    Compila los artefactos de artifacts_dir, compara con el pipeline sobre csv_path (si existe) y
+    guarda el resultado. Devuelve la diferencia máxima; ValueError si supera tolerance.
+    """
+    preprocessor, model = load_artifacts(artifacts_dir)
+    spec, booster = compile_artifacts(preprocessor, model)
+    spec["artifacts_hash"] = artifacts_hash(artifacts_dir)
+
+    max_diff = float("nan")
+    if csv_path is not None and Path(csv_path).exists():
+        columns = input_columns(preprocessor, load_manifest(artifacts_dir))
+        df = leer_csv(csv_path)
+        esperado = score_frame(preprocessor, model, df, columns)
+        obtenido = score_frame(CompiledPreprocessor(spec), CompiledBooster(booster, spec["iteration_range"]), df, columns)
+        max_diff = float(np.max(np.abs(esperado - obtenido))) if len(df) else 0.0
+        if max_diff > tolerance:
+            raise ValueError(f"El modelo compilado difiere del pipeline: {max_diff:.3g} > {tolerance:.3g}")
+        spec["parity"] = {"rows": len(df), "max_abs_diff": max_diff}
+    save_compiled(artifacts_dir, spec, booster)
+    return max_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportar artefacto de inferencia compilado (preprocessor plegado + booster)")
+    parser.add_argument("--csv", default=None, help="CSV para la comprobación de paridad (default: AbandonoEmpleados.csv)")
+    parser.add_argument("--artifacts", default=None, help="Carpeta con preprocessor.pkl y best_model.pkl")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Diferencia máxima de probabilidad admitida")
+    args = parser.parse_args()
+    artifacts_dir = Path(args.artifacts) if args.artifacts else ARTIFACTS
+    csv_path = Path(args.csv) if args.csv else ROOT / "AbandonoEmpleados.csv"
+    try:
+        max_diff = export_compiled(artifacts_dir, csv_path, args.tolerance)
+    except ValueError as e:
+        print(f"No se exporta el modelo compilado: {e}", file=sys.stderr)
+        sys.exit(1)
+    if np.isnan(max_diff):
+        print(f"Modelo compilado guardado en {artifacts_dir} (sin comprobación de paridad: no se encontró {csv_path}).")
+    else:
+        print(f"Modelo compilado guardado en {artifacts_dir}. Paridad con el pipeline: diferencia máxima {max_diff:.2e}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,40 +4,109 @@ muestre el gráfico de importancia de variables.
 
 Ejecutar desde la raíz del proyecto:
   python scripts/export_model_artifacts.py
+  python scripts/export_model_artifacts.py --search --n-iter 30 --cv 5
+
+Con --search se comparan XGBoost, Random Forest y LightGBM (si está instalado) con búsqueda de
+hiperparámetros en paralelo (ver model_search.py) y se exporta el elegido; el manifest guarda las
+métricas y el tiempo de cada prueba en model_search.trials.
+
+Con --sparse el one-hot se guarda como matriz CSR (scipy) en todo el recorrido: preprocessor,
+caché de matrices, SMOTE, entrenamiento y modelo compilado. Conviene cuando las categóricas tienen
+muchos niveles (ver benchmarks/bench_sparse_onehot.py); con las del CSV actual el denso es igual de rápido.
+
+Con --smote escalable el sobremuestreo usa SMOTEEscalable (smote_escalable.py): vecinos por bloques
+o con un índice aproximado, generación en paralelo y, con --smote-float32, en float32. Con el valor
+por defecto (auto) se usa desde SMOTE_ESCALABLE_DESDE filas de entrenamiento; por debajo, imblearn.SMOTE.
+
+Con --publicar, al terminar se publica una versión nueva de los artefactos (registro_artefactos.py)
+que el dashboard activa en caliente.
 
 Requisitos: AbandonoEmpleados.csv en la raíz (o ruta indicada con --csv).
 Si ya tiene pipeline/preprocessor desde el notebook, no es necesario ejecutar esto.
 """
 import argparse
+import hashlib
+import inspect
 import json
+import os
 import sys
+from datetime import datetime
 from pathlib import Path
 
 import joblib
 import numpy as np
 import pandas as pd
-from imblearn.over_sampling import SMOTE
 from imblearn.pipeline import Pipeline as ImbPipeline
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
+from sklearn.metrics import roc_auc_score
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
+import xgboost
 from xgboost import XGBClassifier
 
+import esquema
+import features
+from esquema import leer_csv
+from export_compiled_model import export_compiled
+from features import construir_features, limpiar
+from matrix_cache import DEFAULT_MAX_BYTES, MatrixCache, file_hash
+from model_search import ESPACIOS, SMOTE_PARAMS, buscar, crear_modelo, metricas, modelos_disponibles, preparar_folds
+from registro_artefactos import publicar_e_informar
+from smote_escalable import SMOTEEscalable, crear_smote
+
 ROOT = Path(__file__).resolve().parent.parent
 ARTIFACTS = ROOT / "artifacts" / "modeling"
 MANIFEST_PATH = ARTIFACTS / "experiment_manifest.json"
+CACHE_DIR = ROOT / "artifacts" / "cache" / "matrices"
+
+TEST_SIZE = 0.3
+# Clasificador sin búsqueda; su umbral es el de 0.5 (no hay validación para optimizarlo)
+DEFAULT_MODEL = "xgboost"
+DEFAULT_PARAMS = {"n_estimators": 50, "max_depth": 5, "learning_rate": 0.1}
+DEFAULT_THRESHOLD = 0.5
+RANDOM_STATE = 42
 
 
 def main():
     parser = argparse.ArgumentParser(description="Exportar pipeline y preprocessor para el dashboard")
     parser.add_argument("--csv", default=None, help="Ruta al CSV (default: AbandonoEmpleados.csv en la raíz)")
+    parser.add_argument("--search", action="store_true",
+                        help="Buscar hiperparámetros y comparar modelos con CV estratificada (SMOTE dentro de cada fold)")
+    parser.add_argument("--models", nargs="+", default=list(ESPACIOS), help="Candidatos de la búsqueda")
+    parser.add_argument("--n-iter", type=int, default=20, help="Combinaciones aleatorias por modelo (<= 0: rejilla completa)")
+    parser.add_argument("--cv", type=int, default=5, help="Folds de la validación cruzada")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos de la búsqueda (default: todos los cores)")
+    parser.add_argument("--search-space", default=None, help="JSON {modelo: {parámetro: [valores]}} que reemplaza los espacios por defecto")
+    parser.add_argument("--prune-margin", type=float, default=0.05,
+                        help="Podar una prueba si su AUPR medio queda este margen por debajo de la mejor")
+    parser.add_argument("--aupr-tol", type=float, default=0.01, help="Entre pruebas a esta distancia del mejor AUPR, gana la de menos FP")
+    parser.add_argument("--sparse", action="store_true",
+                        help="One-hot en matriz CSR (para categóricas de alta cardinalidad)")
+    parser.add_argument("--no-cache", action="store_true", help="No usar la caché de matrices preprocesadas")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / 1024 ** 2,
+                        help="Tamaño máximo de artifacts/cache/matrices (se borran las entradas menos usadas)")
+    parser.add_argument("--smote", choices=["auto", "imblearn", "escalable"], default="auto",
+                        help="Sobremuestreo: imblearn.SMOTE, SMOTEEscalable o auto (escalable con muchas filas)")
+    parser.add_argument("--smote-float32", action="store_true", help="SMOTEEscalable en float32 (mitad de memoria)")
+    parser.add_argument("--publicar", action="store_true", help="Publicar los artefactos como versión nueva (registro_artefactos.py)")
+    parser.add_argument("--externo", action="store_true",
+                        help="Entrenar fuera de memoria: bloques en Parquet y XGBoost con memoria externa (entrenamiento_externo.py)")
+    parser.add_argument("--filas-bloque", type=int, default=100_000, help="Filas por bloque con --externo")
+    parser.add_argument("--dir-externo", default=None,
+                        help="Directorio de trabajo de --externo (default: artifacts/cache/externo)")
     args = parser.parse_args()
     csv_path = Path(args.csv) if args.csv else ROOT / "AbandonoEmpleados.csv"
     if not csv_path.exists():
         print(f"No se encontró {csv_path}. Indique --csv o coloque AbandonoEmpleados.csv en la raíz.", file=sys.stderr)
         sys.exit(1)
+    if args.externo and (args.search or args.sparse):
+        print("--externo no es compatible con --search ni --sparse.", file=sys.stderr)
+        sys.exit(1)
+    if args.externo and not hasattr(xgboost, "ExtMemQuantileDMatrix"):
+        print(f"--externo necesita xgboost>=3.0 (ExtMemQuantileDMatrix); instalada: {xgboost.__version__}.", file=sys.stderr)
+        sys.exit(1)
 
     # Cargar manifest para feature_columns
     feature_columns = []
@@ -46,75 +115,259 @@ def main():
             manifest = json.load(f)
             feature_columns = manifest.get("feature_columns", [])
 
-    df = pd.read_csv(csv_path, sep=";", index_col="id", na_values="#N/D")
+    search = None
+    if args.externo:
+        # Importación diferida: entrenamiento_externo importa de este módulo
+        from entrenamiento_externo import DIR_TRABAJO, entrenar_externo
+
+        resultado = entrenar_externo(csv_path, feature_columns, args.filas_bloque, args.smote, args.smote_float32,
+                                     Path(args.dir_externo) if args.dir_externo else DIR_TRABAJO)
+        preprocessor, pipeline, clf = resultado["preprocessor"], resultado["pipeline"], resultado["clf"]
+        test_proba, test_y = resultado["test_proba"], resultado["test_y"]
+    else:
+        cache = MatrixCache(CACHE_DIR, int(args.cache_max_mb * 1024 * 1024))
+        split_key = {
+            "csv": file_hash(csv_path),
+            "feature_columns": feature_columns,
+            "test_size": TEST_SIZE,
+            "random_state": RANDOM_STATE,
+            "sparse": args.sparse,
+            # Código que produce el split y las matrices: si cambia, la entrada cacheada ya no vale
+            "preprocessor": _hash_fuente(_prepare_data, _columnas_modelo, _tipos_columnas, _build_preprocessor),
+            "features": file_hash(Path(features.__file__)),
+            "esquema": file_hash(Path(esquema.__file__)),
+        }
+        prepare = lambda: _prepare_data(csv_path, feature_columns, args.sparse)  # noqa: E731
+        data = prepare() if args.no_cache else cache.get_or_build("split", split_key, prepare)
+        preprocessor = data["preprocessor"]
+        train_x, train_y = data["train_x"], data["train_y"]
+        train_x_t, test_x_t, test_y = data["train_x_t"], data["test_x_t"], data["test_y"]
+
+        if args.search:
+            fold_key = {**split_key, "cv": args.cv, "seed": RANDOM_STATE}
+            build_folds = lambda: _flatten_folds(preparar_folds(preprocessor, train_x, train_y, args.cv, RANDOM_STATE))  # noqa: E731
+            folds = _unflatten_folds(build_folds() if args.no_cache else cache.get_or_build("folds", fold_key, build_folds))
+            search = _run_search(preprocessor, train_x, train_y, folds, args)
+            if search["best"] is None:
+                print("Ninguna prueba de la búsqueda terminó; no se guardan artefactos.", file=sys.stderr)
+                sys.exit(1)
+        if not args.no_cache:
+            print(cache.report())
+
+        scale_pos_weight = (train_y == 0).sum() / max((train_y == 1).sum(), 1)
+        if search is not None:
+            best = search["best"]
+            clf = crear_modelo(best["model"], best["params"], scale_pos_weight).set_params(n_jobs=-1)
+        else:
+            clf = _default_classifier(scale_pos_weight)
+        pipeline = _build_pipeline(clf, args.smote, train_x_t.shape[0], args.sparse, args.smote_float32)
+        print(f"Sobremuestreo: {type(pipeline.steps[0][1]).__name__}")
+        pipeline.fit(train_x_t, train_y)
+        test_proba = pipeline.predict_proba(test_x_t)[:, 1]
+
+    ARTIFACTS.mkdir(parents=True, exist_ok=True)
+    joblib.dump(pipeline, ARTIFACTS / "best_model.pkl")
+    joblib.dump(preprocessor, ARTIFACTS / "preprocessor.pkl")
+    print(f"Guardado: {ARTIFACTS / 'best_model.pkl'}, {ARTIFACTS / 'preprocessor.pkl'}")
+    try:
+        # Con --externo no se comprueba la paridad: exigiría cargar el CSV completo
+        max_diff = export_compiled(ARTIFACTS, None if args.externo else csv_path)
+        print("Guardado: modelo compilado" + ("" if args.externo else f" (paridad con el pipeline: diferencia máxima {max_diff:.2e})"))
+    except ValueError as e:
+        print(f"No se exporta el modelo compilado: {e}", file=sys.stderr)
+
+    if not MANIFEST_PATH.exists():
+        return
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        m = json.load(f)
+    if "best_model" not in m:
+        m["best_model"] = {}
+    # Opcional: guardar feature_importances en el manifest para no depender del .pkl
+    if hasattr(clf, "feature_importances_"):
+        names = preprocessor.get_feature_names_out()
+        imp = clf.feature_importances_
+        m["best_model"]["feature_importances"] = [{"variable": names[i], "importancia": float(imp[i])} for i in range(len(imp))]
+    # Siempre: el manifest describe el modelo guardado (si no, quedaría el tipo y el umbral de una búsqueda anterior)
+    _update_manifest_model(m, search, test_proba, test_y, args)
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(m, f, indent=2, ensure_ascii=False)
+    print("Manifest actualizado con el modelo guardado" + (" y la búsqueda de modelos." if search is not None else "."))
+    if args.publicar:
+        publicar_e_informar(ARTIFACTS)
+
+
+def _default_classifier(scale_pos_weight: float) -> XGBClassifier:
+    """XGBoost sin búsqueda (el del notebook)."""
+    return XGBClassifier(
+        scale_pos_weight=scale_pos_weight,
+        random_state=42,
+        use_label_encoder=False,
+        eval_metric="logloss",
+        **DEFAULT_PARAMS,
+    )
+
+
+def _build_pipeline(clf, smote: str = "auto", n_filas: int = 0, sparse: bool = False,
+                    float32: bool = False) -> ImbPipeline:
+    """SMOTE (el de imblearn o SMOTEEscalable según smote y n_filas, ver crear_smote) + clasificador."""
+    return ImbPipeline([
+        ("smote", crear_smote(smote, n_filas, sparse, float32, **SMOTE_PARAMS)),
+        ("clf", clf),
+    ])
+
+
+def _build_preprocessor(num_cols: list[str], cat_cols: list[str], sparse: bool = False) -> ColumnTransformer:
+    """sparse=True: salida CSR siempre (sparse_threshold=1), con el one-hot sin densificar."""
+    return ColumnTransformer([
+        ("num", Pipeline([
+            ("impute", SimpleImputer(strategy="median")),
+            ("scale", StandardScaler()),
+        ]), num_cols),
+        ("cat", OneHotEncoder(sparse_output=sparse, handle_unknown="ignore"), cat_cols),
+    ], sparse_threshold=1.0 if sparse else 0.3)
+
+
+def _hash_fuente(*funciones) -> str:
+    """sha256 del código fuente de las funciones (parte de la clave de la caché de matrices)."""
+    return hashlib.sha256("".join(inspect.getsource(f) for f in funciones).encode()).hexdigest()
+
+
+def _prepare_data(csv_path: Path, feature_columns: list[str], sparse: bool = False) -> dict:
+    """Lee el CSV, aplica limpieza y features, separa train/test y ajusta y aplica el preprocessor."""
+    df = leer_csv(csv_path)
     if "abandono" not in df.columns:
         print("El CSV no tiene columna 'abandono'.", file=sys.stderr)
         sys.exit(1)
-    y = df["abandono"].replace({"Yes": 1, "No": 0}).astype(int)
+    # Limpieza y features derivadas del notebook (salario_ano, ratio_estancamiento, ...): feature_columns las incluye
+    df = construir_features(limpiar(df))
+    y = df["abandono"].astype(int)
+    X = df[_columnas_modelo(df, feature_columns)].copy()
+    X = X.dropna(axis=1, how="all")
+    num_cols, cat_cols = _tipos_columnas(X)
+    if not num_cols and not cat_cols:
+        print("No quedan columnas útiles para entrenar.", file=sys.stderr)
+        sys.exit(1)
+
+    X = X[num_cols + cat_cols]
+    train_x, test_x, train_y, test_y = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    preprocessor = _build_preprocessor(num_cols, cat_cols, sparse).fit(train_x)
+    return {
+        "preprocessor": preprocessor,
+        "train_x": train_x,
+        "train_y": train_y.to_numpy(),
+        "train_x_t": preprocessor.transform(train_x),
+        "test_x_t": preprocessor.transform(test_x),
+        "test_y": test_y.to_numpy(),
+    }
+
+
+def _columnas_modelo(df: pd.DataFrame, feature_columns: list[str]) -> list[str]:
+    """Columnas de df que entran al modelo: las de feature_columns presentes o, sin ellas, numéricas y de texto."""
     available = [c for c in feature_columns if c in df.columns] if feature_columns else df.columns.drop("abandono").tolist()
     available = [c for c in available if c != "abandono"]
     if not available:
         available = [c for c in df.select_dtypes(include=[np.number]).columns if c not in ("abandono", "impacto_abandono", "scoring_abandono")]
         available += [c for c in df.select_dtypes(include=["object"]).columns if c != "abandono"]
-    X = df[available].copy()
-    X = X.dropna(axis=1, how="all")
-    available = list(X.columns)
-    num_cols = [c for c in available if X[c].dtype in (np.int64, np.float64)]
-    cat_cols = [c for c in available if c not in num_cols]
-    if not num_cols and not cat_cols:
-        print("No quedan columnas útiles para entrenar.", file=sys.stderr)
+    return available
+
+
+def _tipos_columnas(X: pd.DataFrame) -> tuple[list[str], list[str]]:
+    """(numéricas, categóricas) del preprocessor, en el orden de X."""
+    num_cols = [c for c in X.columns
+                if pd.api.types.is_numeric_dtype(X[c]) and not pd.api.types.is_bool_dtype(X[c])]
+    return num_cols, [c for c in X.columns if c not in num_cols]
+
+
+def _flatten_folds(folds: list[tuple]) -> dict:
+    out = {}
+    for i, (val_idx, X_tr, y_tr, X_val) in enumerate(folds):
+        out.update({f"fold{i}_val_idx": val_idx, f"fold{i}_X_tr": X_tr, f"fold{i}_y_tr": y_tr, f"fold{i}_X_val": X_val})
+    return out
+
+
+def _unflatten_folds(data: dict) -> list[tuple]:
+    n = sum(1 for k in data if k.endswith("_val_idx"))
+    return [(data[f"fold{i}_val_idx"], data[f"fold{i}_X_tr"], data[f"fold{i}_y_tr"], data[f"fold{i}_X_val"]) for i in range(n)]
+
+
+def _run_search(preprocessor, train_x, train_y, folds, args) -> dict:
+    modelos, omitidos = modelos_disponibles(args.models)
+    for nombre in omitidos:
+        print(f"Se omite {nombre}: no está instalado.", file=sys.stderr)
+    if not modelos:
+        print("No hay modelos disponibles para la búsqueda.", file=sys.stderr)
         sys.exit(1)
+    espacios = None
+    if args.search_space:
+        with open(args.search_space, "r", encoding="utf-8") as f:
+            espacios = json.load(f)
 
-    X = X[num_cols + cat_cols]
-    train_x, test_x, train_y, test_y = train_test_split(X, y, test_size=0.3, random_state=42)
+    def progreso(res, hechas, total):
+        detalle = f"AUPR {res['aupr']:.4f}, FP {res['fp']}" if res["status"] == "completa" else f"podada tras {res['folds']} folds"
+        print(f"  [{hechas}/{total}] {res['model']}: {detalle} ({res['wall_time_s']:.1f} s)")
 
-    preprocessor = ColumnTransformer([
-        ("num", Pipeline([
-            ("impute", SimpleImputer(strategy="median")),
-            ("scale", StandardScaler()),
-        ]), num_cols),
-        ("cat", OneHotEncoder(sparse_output=False, handle_unknown="ignore"), cat_cols),
-    ])
-    preprocessor.fit(train_x)
-    train_x_t = preprocessor.transform(train_x)
-    test_x_t = preprocessor.transform(test_x)
-
-    scale_pos_weight = (train_y == 0).sum() / max((train_y == 1).sum(), 1)
-    pipeline = ImbPipeline([
-        ("smote", SMOTE(random_state=42, k_neighbors=3, sampling_strategy=0.6)),
-        ("clf", XGBClassifier(
-            scale_pos_weight=scale_pos_weight,
-            random_state=42,
-            use_label_encoder=False,
-            eval_metric="logloss",
-            n_estimators=50,
-            max_depth=5,
-            learning_rate=0.1,
-        )),
-    ])
-    pipeline.fit(train_x_t, train_y)
+    print(f"Búsqueda: {', '.join(modelos)}; {args.n_iter if args.n_iter > 0 else 'rejilla completa'} "
+          f"combinaciones por modelo, CV estratificada de {args.cv} folds, {args.workers or os.cpu_count()} procesos")
+    smote = crear_smote(args.smote, len(train_y), args.sparse, args.smote_float32, **SMOTE_PARAMS)
+    if isinstance(smote, SMOTEEscalable):
+        # El pool ya reparte las pruebas entre procesos: un hilo por sampler
+        smote.set_params(n_jobs=1)
+    search = buscar(preprocessor, train_x, train_y, modelos, n_iter=args.n_iter, cv=args.cv, workers=args.workers,
+                    espacios=espacios, folds=folds, prune_margin=args.prune_margin, aupr_tol=args.aupr_tol, on_result=progreso,
+                    smote=smote)
+    best = search["best"]
+    print(f"Búsqueda terminada en {search['wall_time_s']:.1f} s ({search['n_pruned']} podadas de {search['n_trials']}).")
+    if best is not None:
+        print(f"Elegido: {best['model']} {best['params']} (AUPR OOF {best['aupr']:.4f}, FP {best['fp']}, umbral {best['threshold']:.3f})")
+    return search
 
-    ARTIFACTS.mkdir(parents=True, exist_ok=True)
-    joblib.dump(pipeline, ARTIFACTS / "best_model.pkl")
-    joblib.dump(preprocessor, ARTIFACTS / "preprocessor.pkl")
-    print(f"Guardado: {ARTIFACTS / 'best_model.pkl'}, {ARTIFACTS / 'preprocessor.pkl'}")
-    print("Reinicie el dashboard para ver el gráfico de importancia de variables.")
 
-    # Opcional: guardar feature_importances en el manifest para no depender del .pkl
-    clf = pipeline.steps[-1][1]
-    if hasattr(clf, "feature_importances_"):
-        names = preprocessor.get_feature_names_out()
-        imp = clf.feature_importances_
-        imp_list = [{"variable": names[i], "importancia": float(imp[i])} for i in range(len(imp))]
-        if MANIFEST_PATH.exists():
-            with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
-                m = json.load(f)
-            if "best_model" not in m:
-                m["best_model"] = {}
-            m["best_model"]["feature_importances"] = imp_list
-            with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
-                json.dump(m, f, indent=2, ensure_ascii=False)
-            print("Manifest actualizado con feature_importances.")
+def _update_manifest_model(m: dict, search: dict | None, test_proba: np.ndarray, test_y: np.ndarray, args) -> None:
+    """
+    Modelo de best_model.pkl, sus métricas en test y su umbral en el manifest. Con búsqueda también sus
+    pruebas (model_search); sin ella se quita el bloque de una búsqueda anterior.
+    """
+    if search is not None:
+        best = search["best"]
+        model, params, threshold = best["model"], best["params"], best["threshold"]
+    else:
+        model, params, threshold = DEFAULT_MODEL, DEFAULT_PARAMS, DEFAULT_THRESHOLD
+    test = metricas(test_y, test_proba, threshold)
+    tp, fp, fn = test["tp"], test["fp"], test["fn"]
+    m["model_type"] = f"{model}_smote"
+    m["best_model"].update({
+        "model_type": f"{model}_smote",
+        "metrics": {
+            "aupr": round(test["aupr"], 4),
+            "f1_score": round(test["f1"], 4),
+            "precision": round(tp / (tp + fp), 4) if tp + fp else None,
+            "recall": round(tp / (tp + fn), 4) if tp + fn else None,
+            "roc_auc": round(float(roc_auc_score(test_y, test_proba)), 4),
+            "tp": tp,
+            "fp": fp,
+        },
+        "best_params": {f"clf__{k}": v for k, v in params.items()},
+        "optimization": None,
+        "threshold_optimized": threshold,
+    })
+    if search is None:
+        m.pop("model_search", None)
+        return
+    m["best_model"]["optimization"] = {
+        "method": "random_search" if args.n_iter > 0 else "grid_search",
+        "n_iter": args.n_iter,
+        "cv": search["cv"],
+        "scoring": "average_precision",
+        "tie_break": f"menos FP entre pruebas a ≤ {args.aupr_tol} del mejor AUPR",
+        "workers": search["workers"],
+        "n_trials": search["n_trials"],
+        "n_pruned": search["n_pruned"],
+        "wall_time_s": search["wall_time_s"],
+    }
+    m["model_search"] = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "trials": search["trials"],
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+"""
+Convierte artifacts/modeling/df_con_scoring.pkl al almacén columnar df_con_scoring.feather
+(Arrow IPC sin compresión, tipos de esquema.py) que el dashboard abre con memory map.
+
+Ejecutar desde la raíz del proyecto:
+  python scripts/export_scoring_store.py
+  python scripts/export_scoring_store.py --input otra_ruta/df_con_scoring.pkl --output otra_ruta/df_con_scoring.feather
+  python scripts/export_scoring_store.py --contribuciones
+
+El dashboard sigue funcionando sin este archivo (usa el .pkl), pero con él cada página solo lee
+las columnas que necesita y los procesos comparten las páginas del archivo en memoria.
+Con --contribuciones se calculan por lotes las contribuciones por variable de cada empleado
+(contribuciones.py) con el modelo actual y se guardan en el almacén como columnas float32.
+Con --publicar se publica después una versión nueva de los artefactos (registro_artefactos.py).
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+from contribuciones import contribuciones_frame
+from esquema import esquema_almacen, informe_memoria
+from registro_artefactos import publicar_e_informar
+from scoring import ARTIFACTS, SCORING_STORE_PATH, artifacts_hash, input_columns, load_artifacts, load_manifest, write_scoring_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportar df_con_scoring a formato columnar (Arrow/Feather)")
+    parser.add_argument("--input", default=None, help="Pickle de entrada (default: artifacts/modeling/df_con_scoring.pkl)")
+    parser.add_argument("--output", default=None, help="Archivo de salida (default: artifacts/modeling/df_con_scoring.feather)")
+    parser.add_argument("--contribuciones", action="store_true",
+                        help="Añadir las contribuciones por variable (TreeSHAP de XGBoost) de cada empleado")
+    parser.add_argument("--publicar", action="store_true", help="Publicar los artefactos como versión nueva (registro_artefactos.py)")
+    args = parser.parse_args()
+    input_path = Path(args.input) if args.input else ARTIFACTS / "df_con_scoring.pkl"
+    output_path = Path(args.output) if args.output else SCORING_STORE_PATH
+    if not input_path.exists():
+        print(f"No se encontró {input_path}.", file=sys.stderr)
+        sys.exit(1)
+    df = joblib.load(input_path)
+    metadata = None
+    if args.contribuciones:
+        preprocessor, model = load_artifacts(ARTIFACTS, compiled=True)
+        try:
+            contribs, base = contribuciones_frame(preprocessor, model, df, input_columns(preprocessor, load_manifest()))
+        except ValueError as e:
+            print(f"No se pueden calcular contribuciones: {e}", file=sys.stderr)
+            sys.exit(1)
+        df = pd.concat([df.drop(columns=[c for c in contribs.columns if c in df.columns]), contribs], axis=1)
+        metadata = {
+            "model_hash": artifacts_hash(ARTIFACTS),
+            "contribuciones": {"columnas": list(contribs.columns), "base": base},
+        }
+        print(f"Contribuciones: {contribs.shape[1]} variables")
+    tipado = esquema_almacen(df)
+    print(f"Memoria en RAM con el esquema (esquema.py): {informe_memoria(df, tipado)}")
+    write_scoring_store(tipado, output_path, metadata=metadata)
+    print(f"Guardado: {output_path} ({len(df):,} filas, {output_path.stat().st_size / 1e6:.2f} MB)")
+    if args.publicar:
+        publicar_e_informar(output_path.parent)
+
+
+if __name__ == "__main__":
+    main()
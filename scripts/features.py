@@ -0,0 +1,152 @@
+"""
+Limpieza y feature engineering del notebook (Churn-empleados.ipynb) como funciones vectorizadas.
+
+Las mismas derivaciones las usan el entrenamiento (export_model_artifacts.py), el scoring
+(scoring.score_frame y los scripts que lo llaman) y el dashboard, de modo que un export en bruto
+del HRIS se puede puntuar sin pasar por el notebook. Todas operan sobre columnas completas con NumPy.
+
+  limpiar(df)              columnas descartadas, imputaciones y abandono a 0/1 (celdas 10-26)
+  construir_features(df)   salario_ano, impacto_abandono y las features de la celda 70
+  preparar_entrada(df, c)  imputaciones + solo las features derivadas de c que falten (scoring)
+  columnas_base(c)         columnas en bruto necesarias para obtener c
+
+Paridad con la salida del notebook: python scripts/check_features.py
+"""
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+COLUMNAS_DESCARTADAS = (
+    "anos_en_puesto", "conciliacion", "mayor_edad", "empleados", "sexo", "horas_quincena",
+)
+IMPUTACIONES = {"educacion": "Universitaria", "satisfaccion_trabajo": "Alta", "implicacion": "Alta"}
+MAPA_ABANDONO = {"No": 0, "Yes": 1}
+
+ORDEN_SATISFACCION = {"Baja": 1, "Media": 2, "Alta": 3, "Muy_Alta": 4}
+COLUMNAS_SATISFACCION = (
+    "satisfaccion_entorno", "satisfaccion_trabajo", "satisfaccion_companeros", "evaluacion", "implicacion",
+)
+
+# Impacto económico del abandono: % del salario anual por tramo (límites superiores incluidos)
+TRAMOS_SALARIO = (30000, 50000, 75000)
+TASAS_IMPACTO = (0.161, 0.197, 0.204, 0.21)
+IMPACTO_SIN_SALARIO = -999  # default de np.select en el notebook
+
+# Feature derivada -> columnas en bruto de las que depende
+DEPENDENCIAS = {
+    "salario_ano": ("salario_mes",),
+    "impacto_abandono": ("salario_mes",),
+    "ratio_estancamiento": ("anos_desde_ult_promocion", "anos_compania"),
+    "indice_satisfaccion": COLUMNAS_SATISFACCION,
+    "nunca_promovido": ("anos_desde_ult_promocion", "anos_compania"),
+    "ratio_formacion": ("num_formaciones_ult_ano", "anos_compania"),
+}
+FEATURES_DERIVADAS = tuple(DEPENDENCIAS)
+
+
+def limpiar(df: pd.DataFrame) -> pd.DataFrame:
+    """Limpieza del notebook: descarta columnas sin señal, imputa categóricas y pasa abandono a 0/1."""
+    out = df.drop(columns=[c for c in COLUMNAS_DESCARTADAS if c in df.columns])
+    out = _imputar(out)
+    if "abandono" in out.columns and not pd.api.types.is_numeric_dtype(out["abandono"]):
+        out["abandono"] = out["abandono"].astype("object").map(MAPA_ABANDONO)
+    return out
+
+
+def _imputar(df: pd.DataFrame) -> pd.DataFrame:
+    faltan = {c: v for c, v in IMPUTACIONES.items() if c in df.columns and df[c].isna().any()}
+    return df.fillna(faltan) if faltan else df
+
+
+def _ordinal(serie: pd.Series) -> np.ndarray:
+    """Niveles de satisfacción a 1..4 (NaN si falta o no es un nivel conocido)."""
+    codes = pd.Categorical(serie.astype("object"), categories=list(ORDEN_SATISFACCION)).codes
+    return np.where(codes >= 0, codes + 1, np.nan)
+
+
+def _numerica(df: pd.DataFrame, col: str) -> np.ndarray:
+    return df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _salario_ano(df: pd.DataFrame) -> pd.Series:
+    salario = df["salario_mes"]
+    # Con el esquema salario_mes puede ser int16/int32: el producto se hace en int64 para no desbordar
+    return (salario.astype(np.int64) if pd.api.types.is_integer_dtype(salario) else salario) * 12
+
+
+def _impacto_abandono(df: pd.DataFrame) -> np.ndarray:
+    salario_ano = _numerica(df, "salario_mes") * 12
+    tasa = np.asarray(TASAS_IMPACTO)[np.searchsorted(TRAMOS_SALARIO, np.nan_to_num(salario_ano), side="left")]
+    return np.where(np.isnan(salario_ano), IMPACTO_SIN_SALARIO, salario_ano * tasa)
+
+
+def _ratio_estancamiento(df: pd.DataFrame) -> np.ndarray:
+    return _numerica(df, "anos_desde_ult_promocion") / (_numerica(df, "anos_compania") + 1)
+
+
+def _indice_satisfaccion(df: pd.DataFrame) -> np.ndarray:
+    niveles = np.column_stack([_ordinal(df[c]) for c in COLUMNAS_SATISFACCION])
+    n = (~np.isnan(niveles)).sum(axis=1)
+    suma = np.nansum(niveles, axis=1)
+    return np.divide(suma, n, out=np.full(len(df), np.nan), where=n > 0)
+
+
+def _nunca_promovido(df: pd.DataFrame) -> np.ndarray:
+    return (_numerica(df, "anos_desde_ult_promocion") >= _numerica(df, "anos_compania")).astype(np.int64)
+
+
+def _ratio_formacion(df: pd.DataFrame) -> np.ndarray:
+    return _numerica(df, "num_formaciones_ult_ano") / (_numerica(df, "anos_compania") + 1)
+
+
+_DERIVAR = {
+    "salario_ano": _salario_ano,
+    "impacto_abandono": _impacto_abandono,
+    "ratio_estancamiento": _ratio_estancamiento,
+    "indice_satisfaccion": _indice_satisfaccion,
+    "nunca_promovido": _nunca_promovido,
+    "ratio_formacion": _ratio_formacion,
+}
+
+
+def construir_features(df: pd.DataFrame, columnas=None) -> pd.DataFrame:
+    """
+    Añade las features derivadas (todas, o solo las de columnas) a una copia de df.
+    Las que no se pueden calcular porque faltan sus columnas en bruto se omiten.
+    """
+    pedidas = FEATURES_DERIVADAS if columnas is None else [c for c in FEATURES_DERIVADAS if c in columnas]
+    nuevas = {
+        c: _DERIVAR[c](df) for c in pedidas
+        if all(dep in df.columns for dep in DEPENDENCIAS[c])
+    }
+    return df.assign(**nuevas) if nuevas else df
+
+
+def preparar_entrada(df: pd.DataFrame, columnas) -> pd.DataFrame:
+    """Entrada del preprocessor: imputaciones del notebook y las features derivadas de columnas que falten."""
+    out = _imputar(df)
+    faltan = [c for c in columnas if c in DEPENDENCIAS and c not in out.columns]
+    return construir_features(out, faltan) if faltan else out
+
+
+def columnas_base(columnas) -> list[str]:
+    """Columnas en bruto (del CSV) necesarias para obtener columnas, conservando el orden."""
+    out: list[str] = []
+    for c in columnas:
+        for base in DEPENDENCIAS.get(c, (c,)):
+            if base not in out:
+                out.append(base)
+    return out
+
+
+class FeatureEngineer(BaseEstimator, TransformerMixin):
+    """Transformer sklearn sin estado equivalente a construir_features (para usar dentro de un Pipeline)."""
+
+    def __init__(self, columnas=None):
+        self.columnas = columnas
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        return construir_features(_imputar(X), self.columnas)
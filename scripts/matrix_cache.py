@@ -0,0 +1,145 @@
+"""
+Caché por contenido de las matrices preprocesadas de entrenamiento.
+
+Cada entrada es una carpeta artifacts/cache/matrices/<clave>/ con:
+  - un .npy por matriz (sin comprimir: se abren con memory map, sin copiarlas a memoria);
+  - un .npz (scipy.sparse.save_npz, sin comprimir) por matriz sparse (export --sparse);
+  - un .pkl (joblib) por objeto no matricial (preprocessor ajustado, DataFrames);
+  - meta.json: partes de la clave, tamaño, tiempo que costó construirla y último uso.
+La clave es el SHA-256 de sus partes (hash del CSV, columnas, configuración del preprocesado y
+del código de features.py); si cualquiera cambia, es otra entrada. Al superar max_bytes se borran
+las entradas usadas hace más tiempo.
+
+Lo usa scripts/export_model_artifacts.py (split + preprocessor y folds de la búsqueda).
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+from scipy import sparse
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(**partes) -> str:
+    payload = json.dumps(partes, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class MatrixCache:
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.time_saved_s = 0.0
+
+    def get_or_build(self, nombre: str, partes: dict, build) -> dict:
+        """
+        Entrada de partes si existe (arrays como memmap de solo lectura); si no, build() -> dict
+        {nombre: ndarray u objeto}, se guarda y se devuelve. nombre solo identifica la entrada en el informe.
+        """
+        key = cache_key(nombre=nombre, **partes)
+        t0 = time.perf_counter()
+        cached = self._load(key)
+        if cached is not None:
+            data, meta = cached
+            self.hits += 1
+            self.time_saved_s += max(meta.get("build_time_s", 0.0) - (time.perf_counter() - t0), 0.0)
+            return data
+        self.misses += 1
+        data = build()
+        self._store(key, nombre, partes, data, time.perf_counter() - t0)
+        self._evict()
+        return data
+
+    def report(self) -> str:
+        return (f"Caché de matrices: {self.hits} aciertos, {self.misses} fallos, "
+                f"{self.time_saved_s:.1f} s ahorrados ({self.root})")
+
+    def _load(self, key: str):
+        path = self.root / key
+        meta_path = path / "meta.json"
+        if not meta_path.exists():
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            data = {}
+            for name in meta["arrays"]:
+                data[name] = np.load(path / f"{name}.npy", mmap_mode="r")
+            for name in meta.get("sparse", []):
+                data[name] = sparse.load_npz(path / f"{name}.npz")
+            for name in meta["objects"]:
+                data[name] = joblib.load(path / f"{name}.pkl")
+        except (OSError, ValueError, KeyError, EOFError):
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+        meta["last_used"] = time.time()
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False, default=str)
+        return data, meta
+
+    def _store(self, key: str, nombre: str, partes: dict, data: dict, build_time_s: float) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".{key}.tmp{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        arrays, matrices, objects = [], [], []
+        for name, value in data.items():
+            if isinstance(value, np.ndarray):
+                np.save(tmp / f"{name}.npy", value)
+                arrays.append(name)
+            elif sparse.issparse(value):
+                sparse.save_npz(tmp / f"{name}.npz", value, compressed=False)
+                matrices.append(name)
+            else:
+                joblib.dump(value, tmp / f"{name}.pkl")
+                objects.append(name)
+        meta = {
+            "name": nombre,
+            "key_parts": partes,
+            "arrays": arrays,
+            "sparse": matrices,
+            "objects": objects,
+            "bytes": sum(p.stat().st_size for p in tmp.iterdir()),
+            "build_time_s": round(build_time_s, 3),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "last_used": time.time(),
+        }
+        with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False, default=str)
+        final = self.root / key
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(tmp, final)
+
+    def _evict(self) -> None:
+        """Borra las entradas menos usadas recientemente hasta quedar por debajo de max_bytes."""
+        entradas = []
+        for meta_path in self.root.glob("*/meta.json"):
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                entradas.append((meta.get("last_used", 0.0), meta.get("bytes", 0), meta_path.parent))
+            except (OSError, ValueError):
+                continue
+        total = sum(b for _, b, _ in entradas)
+        for _, b, path in sorted(entradas, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= b
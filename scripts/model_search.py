@@ -0,0 +1,221 @@
+"""
+Búsqueda de hiperparámetros y comparación de modelos (XGBoost, Random Forest, LightGBM) con SMOTE.
+
+Cada prueba (modelo + combinación de parámetros) se evalúa con validación cruzada estratificada:
+en cada fold el preprocessor se ajusta con el train del fold (una sola vez por fold, compartido por
+todas las pruebas), SMOTE se aplica solo a ese train y se puntúa el fold de validación. Con las
+probabilidades out-of-fold se calculan AUPR, el umbral que maximiza F1 (como optimizar_umbral en
+el notebook) y TP/FP con ese umbral.
+
+Las pruebas se reparten en un pool de procesos (un hilo por prueba). Una prueba se abandona
+(estado "podada") si tras min_folds folds su AUPR medio por fold queda más de prune_margin por
+debajo del de la mejor prueba completada. Ranking: AUPR descendente; entre las pruebas a menos de
+aupr_tol del mejor AUPR se elige la de menos FP (criterio de docs/eleccion_modelo_churn_xgboost_smote.md).
+
+El sampler es SMOTE(**SMOTE_PARAMS) o el que se pase en smote= (p. ej. SMOTEEscalable con muchos
+empleados, ver smote_escalable.py); se clona en cada fold.
+
+Lo usa scripts/export_model_artifacts.py --search.
+"""
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from imblearn.over_sampling import SMOTE
+from sklearn.base import clone
+from sklearn.metrics import average_precision_score, confusion_matrix, f1_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
+
+SMOTE_PARAMS = {"random_state": 42, "k_neighbors": 3, "sampling_strategy": 0.6}
+UMBRALES = np.linspace(0.25, 0.5, 11)
+
+# Espacios de búsqueda del notebook (celdas de RandomizedSearchCV con SMOTE)
+ESPACIOS = {
+    "xgboost": {
+        "n_estimators": [50, 100, 200, 300],
+        "max_depth": [3, 5, 7, 10],
+        "learning_rate": [0.01, 0.05, 0.1, 0.2],
+        "subsample": [0.7, 0.8, 0.9, 1.0],
+        "colsample_bytree": [0.7, 0.8, 0.9, 1.0],
+        "min_child_weight": [1, 3, 5],
+    },
+    "random_forest": {
+        "n_estimators": [50, 100, 200, 300],
+        "max_depth": [5, 10, 15, 20, None],
+        "min_samples_split": [2, 5, 10],
+        "min_samples_leaf": [1, 2, 5],
+        "max_features": ["sqrt", "log2", None],
+    },
+    "lightgbm": {
+        "n_estimators": [50, 100, 200, 300],
+        "max_depth": [3, 5, 7, 10, -1],
+        "learning_rate": [0.01, 0.05, 0.1, 0.2],
+        "num_leaves": [31, 50, 70, 100],
+        "min_child_samples": [5, 10, 20, 30],
+        "subsample": [0.7, 0.8, 0.9, 1.0],
+        "colsample_bytree": [0.7, 0.8, 0.9, 1.0],
+    },
+}
+
+
+def crear_modelo(nombre: str, params: dict, scale_pos_weight: float = 1.0):
+    """Clasificador del candidato nombre con params (un hilo: el paralelismo lo da el pool)."""
+    if nombre == "xgboost":
+        from xgboost import XGBClassifier
+
+        return XGBClassifier(scale_pos_weight=scale_pos_weight, random_state=42, eval_metric="logloss",
+                             n_jobs=1, **params)
+    if nombre == "random_forest":
+        from sklearn.ensemble import RandomForestClassifier
+
+        return RandomForestClassifier(class_weight="balanced", random_state=42, n_jobs=1, **params)
+    if nombre == "lightgbm":
+        from lightgbm import LGBMClassifier
+
+        return LGBMClassifier(scale_pos_weight=scale_pos_weight, random_state=42, n_jobs=1, verbose=-1, **params)
+    raise ValueError(f"Modelo desconocido: {nombre}")
+
+
+def modelos_disponibles(nombres) -> tuple[list[str], list[str]]:
+    """(disponibles, omitidos): LightGBM es opcional y se omite si no está instalado."""
+    disponibles, omitidos = [], []
+    for nombre in nombres:
+        if nombre not in ESPACIOS:
+            raise ValueError(f"Modelo desconocido: {nombre} (opciones: {', '.join(ESPACIOS)})")
+        if nombre == "lightgbm":
+            try:
+                import lightgbm  # noqa: F401
+            except ImportError:
+                omitidos.append(nombre)
+                continue
+        disponibles.append(nombre)
+    return disponibles, omitidos
+
+
+def generar_pruebas(nombres, n_iter: int, espacios: dict | None = None, seed: int = 42) -> list[tuple[str, dict]]:
+    """Combinaciones a evaluar: n_iter aleatorias por modelo, o la rejilla completa si n_iter <= 0."""
+    espacios = {**ESPACIOS, **(espacios or {})}
+    pruebas = []
+    for nombre in nombres:
+        espacio = espacios[nombre]
+        combos = ParameterGrid(espacio) if n_iter <= 0 else ParameterSampler(espacio, n_iter, random_state=seed)
+        pruebas.extend((nombre, dict(p)) for p in combos)
+    return pruebas
+
+
+def umbral_f1(y_true: np.ndarray, proba: np.ndarray) -> tuple[float, float]:
+    """Umbral de UMBRALES que maximiza F1 (mismo criterio que optimizar_umbral del notebook)."""
+    best_t, best_f1 = 0.5, 0.0
+    for t in UMBRALES:
+        f1 = f1_score(y_true, (proba >= t).astype(int), zero_division=0)
+        if f1 > best_f1:
+            best_t, best_f1 = round(float(t), 4), f1
+    return best_t, best_f1
+
+
+def metricas(y_true: np.ndarray, proba: np.ndarray, umbral: float) -> dict:
+    tn, fp, fn, tp = confusion_matrix(y_true, (proba >= umbral).astype(int), labels=[0, 1]).ravel()
+    return {
+        "aupr": float(average_precision_score(y_true, proba)),
+        "threshold": float(umbral),
+        "tp": int(tp), "fp": int(fp), "fn": int(fn), "tn": int(tn),
+        "f1": float(f1_score(y_true, (proba >= umbral).astype(int), zero_division=0)),
+    }
+
+
+def preparar_folds(preprocessor, X, y: np.ndarray, cv: int, seed: int = 42) -> list[tuple]:
+    """Por fold: (índices de validación, X_train transformado, y_train, X_val transformado)."""
+    folds = []
+    for train_idx, val_idx in StratifiedKFold(cv, shuffle=True, random_state=seed).split(X, y):
+        pre = clone(preprocessor).fit(X.iloc[train_idx])
+        folds.append((val_idx, pre.transform(X.iloc[train_idx]), y[train_idx], pre.transform(X.iloc[val_idx])))
+    return folds
+
+
+# Estado por proceso del pool: folds ya transformados y mejor AUPR compartido (para podar)
+_estado = {}
+
+
+def _init_worker(folds, y, mejor_aupr, smote=None):
+    _estado.update(folds=folds, y=y, mejor_aupr=mejor_aupr, smote=smote if smote is not None else SMOTE(**SMOTE_PARAMS))
+
+
+def evaluar_prueba(nombre: str, params: dict, min_folds: int = 2, prune_margin: float = 0.05) -> dict:
+    """Evalúa una prueba en los folds del proceso; devuelve métricas OOF o estado podada."""
+    folds, y, mejor = _estado["folds"], _estado["y"], _estado["mejor_aupr"]
+    t0 = time.perf_counter()
+    oof = np.full(len(y), np.nan)
+    aupr_folds = []
+    for val_idx, X_tr, y_tr, X_val in folds:
+        X_res, y_res = clone(_estado["smote"]).fit_resample(X_tr, y_tr)
+        spw = (y_tr == 0).sum() / max((y_tr == 1).sum(), 1)
+        clf = crear_modelo(nombre, params, spw).fit(X_res, y_res)
+        oof[val_idx] = clf.predict_proba(X_val)[:, 1]
+        aupr_folds.append(float(average_precision_score(y[val_idx], oof[val_idx])))
+        if len(aupr_folds) >= min_folds and len(aupr_folds) < len(folds) \
+                and np.mean(aupr_folds) < mejor.value - prune_margin:
+            return {"model": nombre, "params": params, "status": "podada", "folds": len(aupr_folds),
+                    "aupr_folds": aupr_folds, "wall_time_s": round(time.perf_counter() - t0, 3)}
+    umbral, _ = umbral_f1(y, oof)
+    return {"model": nombre, "params": params, "status": "completa", "folds": len(folds),
+            "aupr_folds": aupr_folds, "aupr_cv_mean": float(np.mean(aupr_folds)), **metricas(y, oof, umbral),
+            "wall_time_s": round(time.perf_counter() - t0, 3)}
+
+
+def buscar(preprocessor, X, y, nombres, n_iter: int = 20, cv: int = 5, workers: int | None = None,
+           espacios: dict | None = None, min_folds: int = 2, prune_margin: float = 0.05,
+           aupr_tol: float = 0.01, seed: int = 42, folds: list | None = None, on_result=None, smote=None) -> dict:
+    """
+    Ejecuta la búsqueda y devuelve {"trials": [...ordenados], "best": prueba elegida, "wall_time_s", ...}.
+    folds: folds ya preparados (preparar_folds), p. ej. desde la caché de matrices.
+    on_result(prueba, hechas, total) se llama al terminar cada prueba (progreso).
+    smote: sampler de cada fold (default: SMOTE(**SMOTE_PARAMS)).
+    """
+    t0 = time.perf_counter()
+    y = np.asarray(y)
+    workers = workers or os.cpu_count() or 1
+    pruebas = generar_pruebas(nombres, n_iter, espacios, seed)
+    if folds is None:
+        folds = preparar_folds(preprocessor, X, y, cv, seed)
+    mejor = mp.get_context().Value("d", -1.0, lock=False)
+    resultados = []
+    if workers <= 1:
+        _init_worker(folds, y, mejor, smote)
+        for i, (nombre, params) in enumerate(pruebas, 1):
+            res = evaluar_prueba(nombre, params, min_folds, prune_margin)
+            if res["status"] == "completa":
+                mejor.value = max(mejor.value, res["aupr_cv_mean"])
+            resultados.append(res)
+            if on_result:
+                on_result(res, i, len(pruebas))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(folds, y, mejor, smote)) as pool:
+            futures = [pool.submit(evaluar_prueba, n, p, min_folds, prune_margin) for n, p in pruebas]
+            for i, fut in enumerate(as_completed(futures), 1):
+                res = fut.result()
+                if res["status"] == "completa":
+                    mejor.value = max(mejor.value, res["aupr_cv_mean"])
+                resultados.append(res)
+                if on_result:
+                    on_result(res, i, len(pruebas))
+
+    completas = sorted((r for r in resultados if r["status"] == "completa"), key=lambda r: (-r["aupr"], r["fp"]))
+    podadas = [r for r in resultados if r["status"] != "completa"]
+    best = None
+    if completas:
+        cerca = [r for r in completas if r["aupr"] >= completas[0]["aupr"] - aupr_tol]
+        best = min(cerca, key=lambda r: (r["fp"], -r["aupr"]))
+    for rank, r in enumerate(completas, 1):
+        r["rank"] = rank
+        r["selected"] = r is best
+    return {
+        "trials": completas + podadas,
+        "best": best,
+        "n_trials": len(pruebas),
+        "n_pruned": len(podadas),
+        "cv": cv,
+        "workers": workers,
+        "wall_time_s": round(time.perf_counter() - t0, 3),
+    }
@@ -0,0 +1,227 @@
+"""
+Registro versionado de los artefactos que consume el dashboard.
+
+artifacts/modeling/ sigue siendo el directorio de trabajo: export_model_artifacts.py,
+export_scoring_store.py y score_incremental.py escriben ahí. Publicar copia el conjunto de artefactos a
+artifacts/modeling/versiones/<version>/, que ya no se modifica. En el experiment_manifest.json de la
+versión se registra el hash de contenido: sha256 por archivo y uno total. Después se cambia el puntero
+artifacts/modeling/CURRENT con un rename atómico. Quien lee CURRENT ve la versión anterior o la nueva
+completa, nunca una a medias. Si el contenido no cambió, no se crea versión ni se toca el puntero.
+
+  publicar(base)              versión nueva (o la vigente si el contenido es el mismo)
+  activar(version, base)      vuelve a una versión publicada (rollback)
+  version_vigente(base)       id al que apunta CURRENT (None sin registro)
+  directorio_version(base, v) directorio de la versión v (base si v no es del registro)
+  firma(base)                 stat barato (CURRENT o, sin registro, los archivos) para detectar cambios
+  hash_contenido(dir)         hash total del contenido de un directorio de artefactos
+
+Ejecutar desde la raíz del proyecto:
+  python scripts/registro_artefactos.py publicar
+  python scripts/registro_artefactos.py listar
+  python scripts/registro_artefactos.py activar 20250101-120000-1a2b3c4d5e6f
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+ARTIFACTS = ROOT / "artifacts" / "modeling"
+
+MANIFEST = "experiment_manifest.json"
+ARCHIVOS = (
+    MANIFEST, "best_model.pkl", "pipeline.pkl", "preprocessor.pkl", "compiled_model.json", "compiled_model.ubj",
+    "df_con_scoring.pkl", "df_con_scoring.feather",
+)
+VERSIONES_DIR = "versiones"
+PUNTERO = "CURRENT"
+CONSERVAR = 5
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _hash_manifest(path: Path) -> str:
+    """Hash del manifest sin el bloque "artefactos" (que contiene el propio hash)."""
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest.pop("artefactos", None)
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def hashes_archivos(directorio: Path) -> dict[str, str]:
+    """sha256 de cada artefacto presente en directorio (el manifest, sin su bloque "artefactos")."""
+    directorio = Path(directorio)
+    out = {}
+    for nombre in ARCHIVOS:
+        path = directorio / nombre
+        if path.exists():
+            out[nombre] = _hash_manifest(path) if nombre == MANIFEST else _sha256(path)
+    return out
+
+
+def hash_contenido(directorio: Path, hashes: dict[str, str] | None = None) -> str:
+    hashes = hashes_archivos(directorio) if hashes is None else hashes
+    return hashlib.sha256(json.dumps(hashes, sort_keys=True).encode()).hexdigest()
+
+
+def version_vigente(base: Path = ARTIFACTS) -> str | None:
+    try:
+        version = (Path(base) / PUNTERO).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return version if version and (Path(base) / VERSIONES_DIR / version).is_dir() else None
+
+
+def directorio_version(base: Path, version: str | None) -> Path:
+    base = Path(base)
+    if version and (base / VERSIONES_DIR / version).is_dir():
+        return base / VERSIONES_DIR / version
+    return base
+
+
+def firma(base: Path = ARTIFACTS) -> tuple:
+    """
+    Comprobación barata de cambios (solo stat): la del puntero CURRENT si hay registro; si no, la de
+    los archivos del directorio de trabajo.
+    """
+    base = Path(base)
+    puntero = base / PUNTERO
+    archivos = [puntero] if puntero.exists() else [base / n for n in ARCHIVOS]
+    out = []
+    for path in archivos:
+        try:
+            st_ = path.stat()
+        except OSError:
+            continue
+        out.append((path.name, st_.st_mtime_ns, st_.st_size))
+    return tuple(out)
+
+
+def manifest_version(base: Path, version: str) -> dict:
+    with open(directorio_version(base, version) / MANIFEST, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _escribir_puntero(base: Path, version: str) -> None:
+    tmp = base / f".{PUNTERO}.tmp"
+    tmp.write_text(version + "\n", encoding="utf-8")
+    os.replace(tmp, base / PUNTERO)
+
+
+def publicar(base: Path = ARTIFACTS, conservar: int = CONSERVAR) -> tuple[str, bool]:
+    """
+    Publica los artefactos de base como versión nueva y apunta CURRENT a ella.
+    Devuelve (versión, creada); creada=False si el contenido coincide con la versión vigente.
+    """
+    base = Path(base)
+    if not (base / MANIFEST).exists():
+        raise FileNotFoundError(f"No hay {MANIFEST} en {base}.")
+    hashes = hashes_archivos(base)
+    total = hash_contenido(base, hashes)
+    vigente = version_vigente(base)
+    if vigente is not None and manifest_version(base, vigente).get("artefactos", {}).get("hash") == total:
+        return vigente, False
+
+    version = f"{datetime.now():%Y%m%d-%H%M%S}-{total[:12]}"
+    versiones = base / VERSIONES_DIR
+    tmp = versiones / f".tmp-{version}"
+    tmp.mkdir(parents=True)
+    try:
+        for nombre in hashes:
+            if nombre != MANIFEST:
+                shutil.copy2(base / nombre, tmp / nombre)
+        with open(base / MANIFEST, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest["artefactos"] = {
+            "version": version,
+            "hash": total,
+            "archivos": hashes,
+            "publicado": datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(tmp / MANIFEST, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.rename(tmp, versiones / version)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    _escribir_puntero(base, version)
+    limpiar(base, conservar)
+    return version, True
+
+
+def publicar_e_informar(base: Path = ARTIFACTS, conservar: int = CONSERVAR) -> str | None:
+    """publicar() para los scripts de exportación: informa por pantalla; None si no se pudo publicar."""
+    try:
+        version, creada = publicar(base, conservar)
+    except FileNotFoundError as e:
+        print(f"No se publica: {e}", file=sys.stderr)
+        return None
+    print(f"Publicada la versión {version}" if creada else f"Sin cambios de contenido: sigue vigente {version}")
+    return version
+
+
+def activar(version: str, base: Path = ARTIFACTS) -> None:
+    """Apunta CURRENT a una versión ya publicada (rollback)."""
+    base = Path(base)
+    if not (base / VERSIONES_DIR / version / MANIFEST).exists():
+        raise FileNotFoundError(f"No existe la versión {version} en {base / VERSIONES_DIR}.")
+    _escribir_puntero(base, version)
+
+
+def listar(base: Path = ARTIFACTS) -> list[str]:
+    """Versiones publicadas, de la más antigua a la más reciente (el id empieza por la fecha)."""
+    versiones = Path(base) / VERSIONES_DIR
+    if not versiones.is_dir():
+        return []
+    return sorted(p.name for p in versiones.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+
+def limpiar(base: Path = ARTIFACTS, conservar: int = CONSERVAR) -> list[str]:
+    """Borra las versiones más antiguas, salvo las conservar más recientes y la vigente."""
+    vigente = version_vigente(base)
+    sobrantes = [v for v in listar(base)[:-conservar] if v != vigente] if conservar > 0 else []
+    for v in sobrantes:
+        shutil.rmtree(Path(base) / VERSIONES_DIR / v, ignore_errors=True)
+    return sobrantes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registro versionado de artefactos del dashboard")
+    parser.add_argument("--artifacts", default=None, help="Directorio de trabajo (default: artifacts/modeling)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_pub = sub.add_parser("publicar", help="Publicar los artefactos actuales como versión nueva")
+    p_pub.add_argument("--conservar", type=int, default=CONSERVAR, help="Versiones a conservar (0: todas)")
+    sub.add_parser("listar", help="Listar versiones publicadas")
+    p_act = sub.add_parser("activar", help="Apuntar CURRENT a una versión publicada (rollback)")
+    p_act.add_argument("version")
+    args = parser.parse_args()
+    base = Path(args.artifacts) if args.artifacts else ARTIFACTS
+
+    if args.comando == "publicar":
+        if publicar_e_informar(base, args.conservar) is None:
+            sys.exit(1)
+    elif args.comando == "listar":
+        vigente = version_vigente(base)
+        for v in listar(base):
+            print(f"{'*' if v == vigente else ' '} {v}")
+    else:
+        try:
+            activar(args.version, base)
+        except FileNotFoundError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        print(f"Vigente: {args.version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Scoring por lotes: aplica preprocessor.pkl + best_model.pkl a un CSV de empleados de cualquier tamaño.
+
+El CSV se lee por bloques de tamaño fijo y cada bloque se transforma, se puntúa y se escribe
+de inmediato en la salida, de modo que la memoria no crece con el número de filas.
+Con --workers N los bloques se reparten entre N procesos (cada uno carga los artefactos una
+sola vez) y los resultados se escriben en el mismo orden que la entrada.
+
+Ejecutar desde la raíz del proyecto:
+  python scripts/score_batch.py
+  python scripts/score_batch.py --csv export_rrhh.csv --output scoring.csv --chunksize 100000
+  python scripts/score_batch.py --csv export_rrhh.csv --output scoring.csv --workers 8
+
+La salida es un CSV separado por ';' con índice id y la columna scoring_abandono
+(más las columnas de entrada si se indica --keep-columns).
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from features import columnas_base
+from scoring import (
+    ARTIFACTS,
+    CSV_SEP,
+    ROOT,
+    SCORING_COL,
+    input_columns,
+    load_artifacts,
+    load_manifest,
+    load_preprocessor,
+    read_csv_chunks,
+    score_frame,
+)
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+# Estado por proceso del modo --workers: artefactos cargados una vez en el initializer
+_worker_state = {}
+
+
+def _single_thread(model):
+    """Limita XGBoost a un hilo: con varios procesos el paralelismo lo da el pool."""
+    if hasattr(model, "booster"):  # modelo compilado (compiled_model.py)
+        model.booster.set_param({"nthread": 1})
+        return model
+    clf = model.steps[-1][1] if hasattr(model, "steps") else model
+    if hasattr(clf, "set_params"):
+        try:
+            clf.set_params(n_jobs=1)
+        except ValueError:
+            pass
+    return model
+
+
+def _init_worker(artifacts_dir: Path, columns: list[str], single_thread: bool = True, compiled: bool = True):
+    preprocessor, model = load_artifacts(artifacts_dir, compiled=compiled)
+    if single_thread:
+        model = _single_thread(model)
+    _worker_state.update(preprocessor=preprocessor, model=model, columns=columns)
+
+
+def _score_chunk(chunk, keep_columns: bool):
+    """Puntúa un bloque; devuelve el DataFrame de salida indexado por id."""
+    st = _worker_state
+    out = chunk if keep_columns else chunk.iloc[:, :0]
+    return out.assign(**{SCORING_COL: score_frame(st["preprocessor"], st["model"], chunk, st["columns"])})
+
+
+def _iter_scored(chunks, artifacts_dir: Path, columns: list[str], keep_columns: bool, workers: int,
+                 compiled: bool = True):
+    """Genera los bloques puntuados en el orden de entrada, en el proceso actual o en un pool."""
+    if workers <= 1:
+        _init_worker(artifacts_dir, columns, single_thread=False, compiled=compiled)
+        for chunk in chunks:
+            yield _score_chunk(chunk, keep_columns)
+        return
+    # Ventana acotada de bloques en vuelo: la memoria depende de workers × chunksize, no del CSV
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(artifacts_dir, columns, True, compiled)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_chunk, chunk, keep_columns))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def score_csv(csv_path: Path, output_path: Path, chunksize: int = DEFAULT_CHUNKSIZE,
+              artifacts_dir: Path = ARTIFACTS, keep_columns: bool = False, workers: int = 1,
+              compiled: bool = True) -> int:
+    """
+    Puntúa csv_path en bloques y escribe output_path de forma incremental. Devuelve filas procesadas.
+    compiled: usar el modelo compilado si está al día con los .pkl (ver compiled_model.py).
+    """
+    columns = input_columns(load_preprocessor(artifacts_dir), load_manifest(artifacts_dir))
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    chunks = read_csv_chunks(csv_path, chunksize, usecols=None if keep_columns else columnas_base(columns))
+    n_rows = 0
+    first = True
+    for out in _iter_scored(chunks, artifacts_dir, columns, keep_columns, workers, compiled):
+        out.to_csv(output_path, sep=CSV_SEP, mode="w" if first else "a", header=first)
+        first = False
+        n_rows += len(out)
+    if first:
+        # CSV sin filas: dejar al menos la cabecera
+        output_path.write_text(f"id{CSV_SEP}{SCORING_COL}\n", encoding="utf-8")
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoring por lotes de un CSV de empleados")
+    parser.add_argument("--csv", default=None, help="CSV de entrada (default: AbandonoEmpleados.csv en la raíz)")
+    parser.add_argument("--output", default=None, help="CSV de salida (default: artifacts/modeling/scoring_batch.csv)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Filas por bloque")
+    parser.add_argument("--artifacts", default=None, help="Carpeta con preprocessor.pkl y best_model.pkl")
+    parser.add_argument("--keep-columns", action="store_true", help="Copiar todas las columnas de entrada a la salida")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"Procesos de scoring (1 = sin pool; máquina actual: {os.cpu_count()} cores)")
+    parser.add_argument("--no-compiled", action="store_true", help="Puntuar con los .pkl aunque exista el modelo compilado")
+    args = parser.parse_args()
+
+    csv_path = Path(args.csv) if args.csv else ROOT / "AbandonoEmpleados.csv"
+    output_path = Path(args.output) if args.output else ARTIFACTS / "scoring_batch.csv"
+    artifacts_dir = Path(args.artifacts) if args.artifacts else ARTIFACTS
+    if not csv_path.exists():
+        print(f"No se encontró {csv_path}. Indique --csv.", file=sys.stderr)
+        sys.exit(1)
+    if args.chunksize <= 0:
+        print("--chunksize debe ser mayor que 0.", file=sys.stderr)
+        sys.exit(1)
+    if args.workers <= 0:
+        print("--workers debe ser mayor que 0.", file=sys.stderr)
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    n_rows = score_csv(csv_path, output_path, args.chunksize, artifacts_dir, args.keep_columns, args.workers,
+                       not args.no_compiled)
+    elapsed = time.perf_counter() - t0
+    print(f"Guardado: {output_path}")
+    print(f"Filas: {n_rows:,} en {elapsed:.2f} s ({n_rows / max(elapsed, 1e-9):,.0f} filas/s, workers={args.workers})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Scoring incremental: solo se vuelven a puntuar los empleados nuevos o cuyas features cambiaron.
+
+Para cada empleado se guarda, junto al scoring, una huella (hash de las columnas en bruto de las que
+dependen feature_columns del manifest). Con cada snapshot diario:
+  1. se calcula la huella de todas las filas (vectorizado, sin puntuar);
+  2. se compara por id con la del almacén df_con_scoring.feather;
+  3. se puntúan solo las altas y los cambios, y se conservan los scores del resto;
+  4. se escribe el almacén actualizado y se añaden las altas/cambios/bajas al registro de cambios.
+El coste de scoring depende del tamaño del delta, no de la plantilla. Si cambia el hash de
+preprocessor.pkl + best_model.pkl (modelo nuevo) o las columnas de la huella, se repuntúa todo.
+Con un modelo XGBoost se guardan también las contribuciones por variable (contribuciones.py), con el
+mismo criterio: se calculan para las filas puntuadas y se copian del almacén para el resto.
+
+Ejecutar desde la raíz del proyecto:
+  python scripts/score_incremental.py --csv snapshot_hoy.csv
+  python scripts/score_incremental.py --csv snapshot_hoy.csv --store otra/df_con_scoring.feather --log otra/cambios.csv
+  python scripts/score_incremental.py --csv snapshot_hoy.csv --publicar   # y publicar la versión para el dashboard
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from contribuciones import contribuciones_frame
+from esquema import leer_csv
+from features import columnas_base, construir_features, limpiar
+from registro_artefactos import publicar_e_informar
+from scoring import (
+    ARTIFACTS,
+    CSV_SEP,
+    SCORING_COL,
+    SCORING_STORE_PATH,
+    artifacts_hash,
+    input_columns,
+    load_artifacts,
+    load_manifest,
+    read_scoring_store,
+    read_store_metadata,
+    score_frame,
+    write_scoring_store,
+)
+
+HUELLA_COL = "_huella_features"
+CHANGELOG_PATH = ARTIFACTS / "scoring_cambios.csv"
+SCORE_CHUNKSIZE = 100_000
+
+
+def huella_columns(manifest: dict, preprocessor, df: pd.DataFrame) -> list[str]:
+    """Columnas en bruto de las que dependen feature_columns del manifest y las entradas del preprocessor."""
+    cols = columnas_base(list(manifest.get("feature_columns", [])) + input_columns(preprocessor, manifest))
+    return [c for c in cols if c in df.columns]
+
+
+def huella(df: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    """Hash uint64 por fila sobre columns (independiente del índice)."""
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+def _score_rows(preprocessor, model, df: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    out = np.empty(len(df), dtype=np.float32)
+    for start in range(0, len(df), SCORE_CHUNKSIZE):
+        out[start:start + SCORE_CHUNKSIZE] = score_frame(preprocessor, model, df.iloc[start:start + SCORE_CHUNKSIZE], columns)
+    return out
+
+
+def score_incremental(csv_path: Path, store_path: Path = SCORING_STORE_PATH, log_path: Path = CHANGELOG_PATH,
+                      artifacts_dir: Path = ARTIFACTS, full: bool = False, compiled: bool = True) -> dict:
+    """Actualiza store_path con el snapshot csv_path. Devuelve contadores de altas/cambios/bajas."""
+    manifest = load_manifest(artifacts_dir)
+    preprocessor, model = load_artifacts(artifacts_dir, compiled=compiled)
+    columns = input_columns(preprocessor, manifest)
+    model_hash = artifacts_hash(artifacts_dir)
+
+    snap = leer_csv(csv_path)
+    snap = snap.drop(columns=[c for c in (SCORING_COL, HUELLA_COL) if c in snap.columns])
+    # Mismo contenido que df_con_scoring del notebook: limpieza + features derivadas
+    snap = construir_features(limpiar(snap))
+    if not snap.index.is_unique:
+        raise ValueError(f"El snapshot tiene ids duplicados: {snap.index[snap.index.duplicated()].unique()[:10].tolist()}")
+    cols_huella = huella_columns(manifest, preprocessor, snap)
+    h_new = huella(snap, cols_huella)
+
+    meta = read_store_metadata(store_path)
+    reutilizable = (
+        not full
+        and meta.get("model_hash") == model_hash
+        and meta.get("columnas_huella") == cols_huella
+    )
+    cols_contrib = (meta.get("contribuciones") or {}).get("columnas") if reutilizable else None
+    if reutilizable:
+        prev = read_scoring_store(store_path, columns=[SCORING_COL, HUELLA_COL] + (cols_contrib or []))
+        pos = prev.index.get_indexer(snap.index)
+        es_alta = pos == -1
+        h_prev = prev[HUELLA_COL].to_numpy()
+        es_cambio = ~es_alta & (h_prev[np.where(es_alta, 0, pos)] != h_new)
+        bajas = prev.index.difference(snap.index)
+        prev_scores = prev[SCORING_COL].to_numpy(dtype=np.float32)
+    else:
+        prev = None
+        es_alta = np.ones(len(snap), dtype=bool)
+        es_cambio = np.zeros(len(snap), dtype=bool)
+        bajas = pd.Index([])
+        prev_scores = None
+        pos = None
+
+    a_puntuar = es_alta | es_cambio
+    scores = np.empty(len(snap), dtype=np.float32)
+    if prev is not None:
+        scores[~a_puntuar] = prev_scores[pos[~a_puntuar]]
+    if a_puntuar.any():
+        scores[a_puntuar] = _score_rows(preprocessor, model, snap[a_puntuar], columns)
+
+    out = snap.assign(**{SCORING_COL: scores, HUELLA_COL: h_new})
+    contribs, meta_contrib = _contribuciones(preprocessor, model, snap, columns, a_puntuar, prev, pos,
+                                             meta.get("contribuciones") if cols_contrib else None)
+    if contribs is not None:
+        out = pd.concat([out, contribs], axis=1)
+    write_scoring_store(out, store_path, metadata={
+        "model_hash": model_hash,
+        "columnas_huella": cols_huella,
+        "contribuciones": meta_contrib,
+        "actualizado": datetime.now().isoformat(timespec="seconds"),
+    })
+
+    if prev is not None:
+        _append_log(log_path, snap.index, es_alta, es_cambio, pos, prev_scores, scores, bajas, prev)
+    return {
+        "filas": len(snap),
+        "altas": int(es_alta.sum()) if prev is not None else 0,
+        "cambios": int(es_cambio.sum()),
+        "bajas": len(bajas),
+        "puntuadas": int(a_puntuar.sum()),
+        "completo": prev is None,
+        "contribuciones": contribs is not None,
+    }
+
+
+def _contribuciones(preprocessor, model, snap: pd.DataFrame, columns: list[str], a_calcular: np.ndarray,
+                    prev: pd.DataFrame | None, pos: np.ndarray | None, meta_prev: dict | None):
+    """
+    Contribuciones de snap y sus metadatos (columnas, base): se calculan para a_calcular y se copian
+    del almacén (meta_prev) para el resto. (None, None) si el modelo no es XGBoost.
+    """
+    if meta_prev is None:
+        a_calcular = np.ones(len(snap), dtype=bool)
+        cols = None
+    else:
+        cols = list(meta_prev["columnas"])
+    meta = meta_prev
+    if a_calcular.any():
+        try:
+            nuevas, base = contribuciones_frame(preprocessor, model, snap[a_calcular], columns)
+        except ValueError as e:
+            print(f"No se guardan contribuciones: {e}", file=sys.stderr)
+            return None, None
+        cols = list(nuevas.columns)
+        meta = {"columnas": cols, "base": base}
+    out = np.empty((len(snap), len(cols)), dtype=np.float32)
+    if a_calcular.any():
+        out[a_calcular] = nuevas.to_numpy()
+    if not a_calcular.all():
+        out[~a_calcular] = prev[cols].to_numpy(dtype=np.float32)[pos[~a_calcular]]
+    return pd.DataFrame(out, index=snap.index, columns=cols), meta
+
+
+def _append_log(log_path: Path, ids: pd.Index, es_alta, es_cambio, pos, prev_scores, scores, bajas, prev):
+    """Añade al registro de cambios (CSV ';') una fila por alta, cambio o baja."""
+    fecha = datetime.now().isoformat(timespec="seconds")
+    idx_cambio = np.flatnonzero(es_cambio)
+    partes = [
+        pd.DataFrame({"id": ids[es_alta], "tipo": "alta", "scoring_anterior": np.nan, "scoring_nuevo": scores[es_alta]}),
+        pd.DataFrame({"id": ids[idx_cambio], "tipo": "cambio",
+                      "scoring_anterior": prev_scores[pos[idx_cambio]], "scoring_nuevo": scores[idx_cambio]}),
+        pd.DataFrame({"id": bajas, "tipo": "baja",
+                      "scoring_anterior": prev.loc[bajas, SCORING_COL].to_numpy(), "scoring_nuevo": np.nan}),
+    ]
+    partes = [p for p in partes if len(p)]
+    if not partes:
+        return
+    log = pd.concat(partes, ignore_index=True)
+    log.insert(0, "fecha", fecha)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    log.to_csv(log_path, sep=CSV_SEP, index=False, mode="a", header=not log_path.exists())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoring incremental: solo altas y empleados con features cambiadas")
+    parser.add_argument("--csv", required=True, help="Snapshot del día (mismo formato que AbandonoEmpleados.csv)")
+    parser.add_argument("--store", default=None, help="Almacén con scoring (default: artifacts/modeling/df_con_scoring.feather)")
+    parser.add_argument("--log", default=None, help="Registro de cambios (default: artifacts/modeling/scoring_cambios.csv)")
+    parser.add_argument("--artifacts", default=None, help="Carpeta con preprocessor.pkl y best_model.pkl")
+    parser.add_argument("--full", action="store_true", help="Repuntuar todos los empleados")
+    parser.add_argument("--no-compiled", action="store_true", help="Puntuar con los .pkl aunque exista el modelo compilado")
+    parser.add_argument("--publicar", action="store_true", help="Publicar los artefactos como versión nueva (registro_artefactos.py)")
+    args = parser.parse_args()
+    csv_path = Path(args.csv)
+    if not csv_path.exists():
+        print(f"No se encontró {csv_path}.", file=sys.stderr)
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    res = score_incremental(
+        csv_path,
+        Path(args.store) if args.store else SCORING_STORE_PATH,
+        Path(args.log) if args.log else CHANGELOG_PATH,
+        Path(args.artifacts) if args.artifacts else ARTIFACTS,
+        args.full,
+        not args.no_compiled,
+    )
+    elapsed = time.perf_counter() - t0
+    modo = "completo (sin almacén previo válido o modelo nuevo)" if res["completo"] else "incremental"
+    print(f"Scoring {modo}: {res['filas']:,} empleados, {res['puntuadas']:,} puntuados "
+          f"({res['altas']:,} altas, {res['cambios']:,} cambios, {res['bajas']:,} bajas) en {elapsed:.2f} s"
+          + (", con contribuciones por variable" if res["contribuciones"] else ""))
+    if args.publicar:
+        store = Path(args.store) if args.store else SCORING_STORE_PATH
+        publicar_e_informar(store.parent)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Utilidades compartidas de scoring: carga de artefactos (preprocessor + best_model),
+lectura del CSV por bloques y cálculo de la probabilidad de abandono.
+
+Lo usan scripts/score_batch.py y el resto de scripts que puntúan empleados fuera del notebook.
+"""
+import hashlib
+import json
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# El almacén columnar vive en almacen_scoring.py (sin sklearn, lo importa el dashboard); se reexporta aquí
+from almacen_scoring import (  # noqa: F401
+    SCORING_STORE_PATH,
+    read_scoring_store,
+    read_store_metadata,
+    read_store_schema,
+    to_columnar,
+    write_scoring_store,
+)
+from compiled_model import load_compiled
+from esquema import CSV_NA_VALUES, CSV_SEP, INDEX_COL, aplicar_esquema, dtypes_lectura
+from features import preparar_entrada
+
+ROOT = Path(__file__).resolve().parent.parent
+ARTIFACTS = ROOT / "artifacts" / "modeling"
+MANIFEST_PATH = ARTIFACTS / "experiment_manifest.json"
+
+SCORING_COL = "scoring_abandono"
+
+
+def load_manifest(artifacts_dir: Path = ARTIFACTS) -> dict:
+    path = Path(artifacts_dir) / "experiment_manifest.json"
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_preprocessor(artifacts_dir: Path = ARTIFACTS):
+    return joblib.load(Path(artifacts_dir) / "preprocessor.pkl")
+
+
+def _model_path(artifacts_dir: Path) -> Path:
+    model_path = Path(artifacts_dir) / "best_model.pkl"
+    if not model_path.exists():
+        model_path = Path(artifacts_dir) / "pipeline.pkl"
+    return model_path
+
+
+def load_artifacts(artifacts_dir: Path = ARTIFACTS, compiled: bool = False):
+    """
+    Carga (preprocessor, modelo) una sola vez. El modelo es el pipeline imblearn (SMOTE + XGBoost).
+    Con compiled=True se usa el artefacto compilado (compiled_model.py) si existe y se generó a
+    partir de los .pkl actuales; si no, los .pkl.
+    """
+    if compiled:
+        loaded = load_compiled(artifacts_dir)
+        if loaded is not None and loaded[0].get("artifacts_hash") == artifacts_hash(artifacts_dir):
+            return loaded[1], loaded[2]
+    preprocessor = load_preprocessor(artifacts_dir)
+    model = joblib.load(_model_path(artifacts_dir))
+    return preprocessor, model
+
+
+def artifacts_hash(artifacts_dir: Path = ARTIFACTS) -> str:
+    """SHA-256 del contenido de preprocessor.pkl + modelo: cambia cuando se exporta un modelo nuevo."""
+    h = hashlib.sha256()
+    for path in (Path(artifacts_dir) / "preprocessor.pkl", _model_path(artifacts_dir)):
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def input_columns(preprocessor, manifest: dict | None = None) -> list[str]:
+    """
+    Columnas de entrada que espera el preprocessor. Se toman de feature_names_in_
+    (las realmente usadas al entrenar); si no existe, de feature_columns del manifest.
+    """
+    if hasattr(preprocessor, "feature_names_in_"):
+        return [str(c) for c in preprocessor.feature_names_in_]
+    return list((manifest or {}).get("feature_columns", []))
+
+
+def read_csv_chunks(path: Path, chunksize: int, usecols: list[str] | None = None):
+    """
+    Itera el CSV (separador ';', faltantes '#N/D', índice id) en bloques de chunksize filas, con el
+    esquema de esquema.py aplicado a cada bloque (mismos niveles de categoría en todos).
+    """
+    cols = None
+    if usecols is not None:
+        cols = [INDEX_COL] + [c for c in usecols if c != INDEX_COL]
+    reader = pd.read_csv(
+        path,
+        sep=CSV_SEP,
+        index_col=INDEX_COL,
+        na_values=CSV_NA_VALUES,
+        usecols=cols,
+        dtype=dtypes_lectura(cols),
+        chunksize=chunksize,
+    )
+    return (aplicar_esquema(chunk) for chunk in reader)
+
+
+def score_frame(preprocessor, model, df: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    """
+    Devuelve la probabilidad de abandono (clase 1) para cada fila de df. Las features derivadas
+    (salario_ano, ratio_estancamiento, ...) que pida el preprocessor se calculan si df no las trae.
+    """
+    df = preparar_entrada(df, columns)
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise KeyError(f"Faltan columnas de entrada: {missing}")
+    X_t = preprocessor.transform(df[columns])
+    return model.predict_proba(X_t)[:, 1].astype(np.float32)
@@ -0,0 +1,261 @@
+"""
+Servicio HTTP local de scoring con micro-batching.
+
+Carga preprocessor.pkl y best_model.pkl una sola vez al arrancar y expone:
+  POST /predict  cuerpo JSON: un objeto (un empleado) o un array de objetos, con una clave
+                 por cada columna en bruto de required_columns (GET /schema); las features
+                 derivadas de feature_columns se calculan con scripts/features.py.
+                 Respuesta: {"predict_proba": p, "predict_class": c} o un array de ellos
+                 (output_schema del manifest), en el mismo orden que la entrada.
+  GET  /schema   feature_columns, input_schema (con el tipo de cada columna en bruto) y output_schema.
+  GET  /health   estado y contadores de peticiones y lotes.
+
+Cada registro se valida y convierte al llegar (números y texto según esquema.py); uno inválido
+devuelve 400 solo a su petición. Las peticiones concurrentes se agrupan en micro-lotes (hasta
+--max-batch-size filas o --max-wait-ms de espera) y cada lote se puntúa con una única llamada
+vectorizada a predict_proba; si esa llamada falla, cada petición del lote se puntúa por separado
+para que el error llegue solo a la que lo provoca.
+
+Ejecutar desde la raíz del proyecto:
+  python scripts/serve_scoring.py --port 8000 --max-batch-size 256 --max-wait-ms 5
+"""
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from esquema import CATEGORICAS
+from features import columnas_base
+from registro_artefactos import directorio_version, version_vigente
+from scoring import ARTIFACTS, input_columns, load_artifacts, load_manifest, score_frame
+
+DEFAULT_THRESHOLD = 0.5
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class MicroBatcher:
+    """
+    Agrupa registros de peticiones concurrentes y los puntúa por lotes en un hilo dedicado.
+    submit() bloquea al llamador hasta que su lote ha sido puntuado.
+    """
+
+    def __init__(self, preprocessor, model, columns: list[str], max_batch_size: int = 256, max_wait_ms: float = 5.0):
+        self.preprocessor = preprocessor
+        self.model = model
+        self.columns = columns
+        # Claves que debe traer cada registro: columnas en bruto (las features derivadas se calculan aquí)
+        self.required = columnas_base(columns)
+        self.tipos = tipos_entrada(self.required)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.n_batches = 0
+        self.n_rows = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, records: list[dict]) -> np.ndarray:
+        fut: Future = Future()
+        self._queue.put((records, fut))
+        return fut.result()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        n = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while n < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            n += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            rows = [r for records, _ in batch for r in records]
+            try:
+                proba = self._score(rows)
+            except Exception:
+                # Un lote falla entero: se reparte por petición para que el error llegue solo a la culpable
+                for records, fut in batch:
+                    try:
+                        fut.set_result(self._score(records))
+                    except Exception as e:
+                        fut.set_exception(e)
+                continue
+            start = 0
+            for records, fut in batch:
+                fut.set_result(proba[start:start + len(records)])
+                start += len(records)
+
+    def _score(self, rows: list[dict]) -> np.ndarray:
+        df = pd.DataFrame.from_records(rows, columns=self.required)
+        # None (null en JSON) como NaN: lo imputa el preprocessor igual que '#N/D' en el CSV
+        df = df.where(df.notna(), np.nan)
+        proba = score_frame(self.preprocessor, self.model, df, self.columns)
+        self.n_batches += 1
+        self.n_rows += len(rows)
+        return proba
+
+
+def tipos_entrada(required: list[str]) -> dict[str, str]:
+    """Tipo JSON de cada columna en bruto: "string" las categóricas de esquema.py, "number" el resto."""
+    return {c: "string" if c in CATEGORICAS else "number" for c in required}
+
+
+def _convertir(valor, tipo: str):
+    """Valor de un registro convertido a su tipo (None se mantiene: es un faltante); ValueError si no se puede."""
+    if valor is None:
+        return None
+    if isinstance(valor, (dict, list)):
+        raise ValueError("se esperaba un valor escalar")
+    if tipo == "string":
+        return valor if isinstance(valor, str) else str(valor)
+    if isinstance(valor, bool):
+        raise ValueError("se esperaba un número")
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        raise ValueError("se esperaba un número") from None
+    if math.isinf(numero):
+        raise ValueError("se esperaba un número finito")
+    return numero if isinstance(valor, str) else valor
+
+
+def _validate(payload, tipos: dict[str, str]) -> list[dict]:
+    """
+    Normaliza el cuerpo a lista de registros, comprueba las claves obligatorias y convierte cada valor
+    a su tipo (tipos_entrada): "40" pasa a 40.0 y "cuarenta" en una columna numérica es un ValueError.
+    """
+    records = payload if isinstance(payload, list) else [payload]
+    if not records:
+        raise ValueError("El array de entrada está vacío.")
+    out = []
+    for i, r in enumerate(records):
+        if not isinstance(r, dict):
+            raise ValueError(f"Elemento {i}: se esperaba un objeto JSON.")
+        missing = [c for c in tipos if c not in r]
+        if missing:
+            raise ValueError(f"Elemento {i}: faltan claves {missing}.")
+        registro = dict(r)
+        for c, tipo in tipos.items():
+            try:
+                registro[c] = _convertir(r[c], tipo)
+            except ValueError as e:
+                raise ValueError(f"Elemento {i}: '{c}' {e} (recibido {r[c]!r}).") from None
+        out.append(registro)
+    return out
+
+
+def make_handler(batcher: MicroBatcher, manifest: dict, threshold: float):
+    schema = {
+        "feature_columns": manifest.get("feature_columns", batcher.columns),
+        "required_columns": batcher.required,
+        "input_schema": {**manifest.get("input_schema", {}), "columns": batcher.tipos},
+        "output_schema": manifest.get("output_schema", {}),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok", "batches": batcher.n_batches, "rows": batcher.n_rows})
+            elif self.path == "/schema":
+                self._send(200, schema)
+            else:
+                self._send(404, {"error": "Ruta no encontrada."})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": "Ruta no encontrada."})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length <= 0 or length > MAX_BODY_BYTES:
+                self._send(400, {"error": "Cuerpo vacío o demasiado grande."})
+                return
+            try:
+                payload = json.loads(self.rfile.read(length))
+                records = _validate(payload, batcher.tipos)
+            except (ValueError, UnicodeDecodeError) as e:
+                self._send(400, {"error": str(e)})
+                return
+            try:
+                proba = batcher.submit(records)
+            except Exception as e:
+                self._send(500, {"error": f"Error al puntuar: {e}"})
+                return
+            out = [{"predict_proba": float(p), "predict_class": int(p >= threshold)} for p in proba]
+            self._send(200, out if isinstance(payload, list) else out[0])
+
+    return Handler
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Cola de conexiones amplia: con la de por defecto (5) los picos de concurrencia provocan reintentos de 1 s
+    request_queue_size = 128
+
+
+def _manifest_threshold(manifest: dict) -> float:
+    """Umbral de predict_class: el del manifest si es numérico; si no, 0.5."""
+    value = manifest.get("best_model", {}).get("threshold_optimized")
+    return float(value) if isinstance(value, (int, float)) else DEFAULT_THRESHOLD
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de scoring con micro-batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--artifacts", default=None, help="Carpeta con preprocessor.pkl y best_model.pkl (default: versión publicada vigente)")
+    parser.add_argument("--max-batch-size", type=int, default=256, help="Máximo de filas por micro-lote")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Espera máxima para completar un micro-lote")
+    parser.add_argument("--no-compiled", action="store_true", help="Puntuar con los .pkl aunque exista el modelo compilado")
+    parser.add_argument("--threshold", type=float, default=None, help="Umbral de predict_class (default: manifest o 0.5)")
+    args = parser.parse_args()
+
+    artifacts_dir = Path(args.artifacts) if args.artifacts else directorio_version(ARTIFACTS, version_vigente(ARTIFACTS))
+    manifest = load_manifest(artifacts_dir)
+    preprocessor, model = load_artifacts(artifacts_dir, compiled=not args.no_compiled)
+    columns = input_columns(preprocessor, manifest)
+    threshold = args.threshold if args.threshold is not None else _manifest_threshold(manifest)
+    batcher = MicroBatcher(preprocessor, model, columns, args.max_batch_size, args.max_wait_ms)
+
+    server = ScoringServer((args.host, args.port), make_handler(batcher, manifest, threshold))
+    print(f"Scoring en http://{args.host}:{args.port}/predict "
+          f"(lote ≤ {args.max_batch_size} filas, espera ≤ {args.max_wait_ms} ms, umbral {threshold})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+SMOTE para conjuntos de entrenamiento grandes: el mismo remuestreo que imblearn.SMOTE (cada muestra
+sintética se interpola entre un empleado de la clase minoritaria y uno de sus k vecinos), con una
+búsqueda de vecinos que escala y la generación repartida en bloques.
+
+imblearn.SMOTE calcula los k vecinos exactos de toda la clase minoritaria con NearestNeighbors:
+O(n_min²) distancias y, con muchos empleados, la mayor parte del tiempo y la memoria del entrenamiento.
+SMOTEEscalable usa, según el tamaño de la minoría:
+  - "exacto": fuerza bruta por bloques de filas con BLAS (||b||² - 2 a·b, en el propio bloque); la
+    memoria de distancias queda acotada a MAX_ELEMENTOS_BLOQUE. Con el mismo random_state genera las mismas
+    muestras que imblearn.SMOTE (salvo empates de distancia).
+  - "ivf": índice aproximado de listas invertidas. La minoría se reparte con k-means en listas de
+    ~tamano_lista filas y los vecinos de cada fila se buscan en su lista y en las n_sondas - 1 listas
+    de centroides más cercanos. Coste O(n_min · tamano_lista · n_sondas) en lugar de O(n_min²).
+  - "auto": exacto hasta MAX_MINORIA_EXACTO filas minoritarias, ivf por encima.
+Los índices y pasos aleatorios se sortean como en imblearn (mismo RandomState); la interpolación y
+la búsqueda de vecinos se reparten en bloques entre n_jobs hilos (NumPy/BLAS liberan el GIL), así
+que el resultado no depende de n_jobs. Con float32=True todo el cálculo y la salida son float32
+(XGBoost entrena en float32 de todos modos), con la mitad de memoria; los vecinos candidatos se
+reordenan en float64 para que el redondeo no decida entre empleados casi repetidos.
+
+Es un sampler compatible con el Pipeline de imblearn (fit_resample). Matrices sparse: se delega en
+imblearn.SMOTE. crear_smote() elige entre uno y otro (export_model_artifacts.py --smote, model_search.py).
+Comparación de tiempo, memoria y AUPR con imblearn.SMOTE: benchmarks/bench_smote_escalable.py.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import sparse
+from sklearn.base import BaseEstimator
+from sklearn.utils import check_random_state
+
+# Con "auto", filas de entrenamiento desde las que crear_smote usa SMOTEEscalable
+SMOTE_ESCALABLE_DESDE = 100_000
+# Con algoritmo="auto", filas minoritarias hasta las que los vecinos son exactos
+MAX_MINORIA_EXACTO = 50_000
+# Elementos de cada bloque de distancias (filas de consulta × candidatos): 32 MB en float64
+MAX_ELEMENTOS_BLOQUE = 1 << 22
+# Hasta este k los vecinos se seleccionan con k pasadas de argmin en lugar de argpartition
+K_SELECCION_ARGMIN = 8
+# En float32, candidatos extra que se reordenan en float64 (ver _k_mas_cercanos)
+MARGEN_REFINADO = 2
+# Filas por bloque de la generación de muestras
+FILAS_BLOQUE_GENERACION = 65_536
+
+
+class SMOTEEscalable(BaseEstimator):
+    _estimator_type = "sampler"
+
+    def __init__(self, sampling_strategy="auto", k_neighbors: int = 5, random_state=None, algoritmo: str = "auto",
+                 tamano_lista: int = 2048, n_sondas: int = 2, float32: bool = False, n_jobs: int | None = None):
+        self.sampling_strategy = sampling_strategy
+        self.k_neighbors = k_neighbors
+        self.random_state = random_state
+        self.algoritmo = algoritmo
+        self.tamano_lista = tamano_lista
+        self.n_sondas = n_sondas
+        self.float32 = float32
+        self.n_jobs = n_jobs
+
+    def fit(self, X, y):
+        self.fit_resample(X, y)
+        return self
+
+    def fit_resample(self, X, y):
+        if sparse.issparse(X):
+            from imblearn.over_sampling import SMOTE
+
+            smote = SMOTE(sampling_strategy=self.sampling_strategy, k_neighbors=self.k_neighbors,
+                          random_state=self.random_state)
+            X_res, y_res = smote.fit_resample(X, y)
+            self.sampling_strategy_ = smote.sampling_strategy_
+            return X_res, y_res
+        X = np.asarray(X, dtype=np.float32 if self.float32 else None)
+        if not np.issubdtype(X.dtype, np.floating):
+            X = X.astype(np.float64)
+        y = np.asarray(y)
+        self.objetivos(*np.unique(y, return_counts=True))
+        X_res, y_res = [X], [y]
+        self.algoritmo_ = {}
+        for clase, n_muestras in self.sampling_strategy_.items():
+            if n_muestras == 0:
+                continue
+            X_clase = X[y == clase]
+            vecinos = self.vecinos(X_clase)
+            self.algoritmo_[clase] = self._algoritmo(len(X_clase))
+            X_res.append(self._generar(X_clase, vecinos, n_muestras))
+            y_res.append(np.full(n_muestras, clase, dtype=y.dtype))
+        return np.vstack(X_res), np.hstack(y_res)
+
+    def _n_jobs(self) -> int:
+        return self.n_jobs if self.n_jobs and self.n_jobs > 0 else (os.cpu_count() or 1)
+
+    def objetivos(self, clases: np.ndarray, conteos: np.ndarray) -> dict:
+        """Muestras a generar por clase a partir de los conteos (también sampling_strategy_)."""
+        self.sampling_strategy_ = _objetivos(clases, conteos, self.sampling_strategy)
+        return self.sampling_strategy_
+
+    def _algoritmo(self, n: int) -> str:
+        if self.algoritmo == "auto":
+            return "exacto" if n <= MAX_MINORIA_EXACTO else "ivf"
+        if self.algoritmo not in ("exacto", "ivf"):
+            raise ValueError(f"algoritmo desconocido: {self.algoritmo!r} (auto, exacto o ivf)")
+        return self.algoritmo
+
+    def vecinos(self, X_clase: np.ndarray) -> np.ndarray:
+        """k vecinos de cada fila de X_clase (sin la propia), con el algoritmo que corresponde a su tamaño."""
+        if len(X_clase) <= self.k_neighbors:
+            raise ValueError(f"Se esperaba n_neighbors <= n_samples_fit, pero n_neighbors = {self.k_neighbors + 1}, "
+                             f"n_samples_fit = {len(X_clase)}")
+        if self._algoritmo(len(X_clase)) == "exacto":
+            return vecinos_exactos(X_clase, self.k_neighbors, self._n_jobs())
+        return vecinos_ivf(X_clase, self.k_neighbors, self.tamano_lista, self.n_sondas,
+                           check_random_state(self.random_state), self._n_jobs())
+
+    def sorteo(self, vecinos: np.ndarray, n_muestras: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Igual que imblearn: (fila, columna de vecinos, paso) de cada muestra, con un RandomState nuevo por clase."""
+        rng = check_random_state(self.random_state)
+        indices = rng.randint(low=0, high=vecinos.size, size=n_muestras)
+        pasos = rng.uniform(size=n_muestras)[:, np.newaxis]
+        return np.floor_divide(indices, vecinos.shape[1]), np.mod(indices, vecinos.shape[1]), pasos
+
+    def _generar(self, X: np.ndarray, vecinos: np.ndarray, n_muestras: int) -> np.ndarray:
+        filas, cols, pasos = self.sorteo(vecinos, n_muestras)
+        X_nuevo = np.empty((n_muestras, X.shape[1]), dtype=X.dtype)
+
+        def bloque(inicio: int) -> None:
+            fin = min(inicio + FILAS_BLOQUE_GENERACION, n_muestras)
+            X_nuevo[inicio:fin] = interpolar(X, vecinos, filas[inicio:fin], cols[inicio:fin], pasos[inicio:fin])
+
+        _en_paralelo(bloque, range(0, n_muestras, FILAS_BLOQUE_GENERACION), self._n_jobs())
+        return X_nuevo
+
+
+def interpolar(X: np.ndarray, vecinos: np.ndarray, filas: np.ndarray, cols: np.ndarray, pasos: np.ndarray) -> np.ndarray:
+    """Muestras sintéticas X[fila] + paso · (X[vecino] - X[fila]) (la fórmula de imblearn)."""
+    base = X[filas]
+    return base + pasos * (X[vecinos[filas, cols]] - base)
+
+
+def crear_smote(modo: str = "auto", n_filas: int = 0, sparse_: bool = False, float32: bool = False, **params):
+    """
+    Sampler para el pipeline: "imblearn" (imblearn.SMOTE), "escalable" (SMOTEEscalable) o "auto"
+    (SMOTEEscalable desde SMOTE_ESCALABLE_DESDE filas densas, imblearn.SMOTE por debajo).
+    """
+    if modo not in ("auto", "imblearn", "escalable"):
+        raise ValueError(f"modo de SMOTE desconocido: {modo!r} (auto, imblearn o escalable)")
+    if modo == "escalable" or (modo == "auto" and not sparse_ and n_filas >= SMOTE_ESCALABLE_DESDE):
+        return SMOTEEscalable(float32=float32, **params)
+    from imblearn.over_sampling import SMOTE
+
+    return SMOTE(**params)
+
+
+def _objetivos(clases: np.ndarray, conteos: np.ndarray, sampling_strategy) -> dict:
+    """Muestras a generar por clase, con la semántica de sampling_strategy de imblearn (float o "auto")."""
+    mayoritaria = clases[np.argmax(conteos)]
+    n_mayoritaria = conteos.max()
+    if isinstance(sampling_strategy, str):
+        if sampling_strategy not in ("auto", "not majority"):
+            raise ValueError(f"sampling_strategy no soportado: {sampling_strategy!r}")
+        return {c: int(n_mayoritaria - n) for c, n in zip(clases, conteos) if c != mayoritaria}
+    if len(clases) != 2:
+        raise ValueError("sampling_strategy float solo es válido con dos clases.")
+    objetivos = {c: int(n_mayoritaria * sampling_strategy - n) for c, n in zip(clases, conteos) if c != mayoritaria}
+    if any(n < 0 for n in objetivos.values()):
+        raise ValueError("sampling_strategy float implica quitar muestras de la minoritaria; use un valor mayor.")
+    return objetivos
+
+
+def _en_paralelo(fn, tareas, n_jobs: int) -> list:
+    tareas = list(tareas)
+    if n_jobs <= 1 or len(tareas) <= 1:
+        return [fn(t) for t in tareas]
+    with ThreadPoolExecutor(max_workers=min(n_jobs, len(tareas))) as pool:
+        return list(pool.map(fn, tareas))
+
+
+def _seleccionar(d: np.ndarray, k: int) -> np.ndarray:
+    """Columnas de los k menores valores de cada fila de d, ordenados (d se modifica)."""
+    if k <= K_SELECCION_ARGMIN:
+        # Para k pequeño, k pasadas de argmin (vectorizadas) son más rápidas que argpartition + argsort
+        filas = np.arange(len(d))
+        top = np.empty((len(d), k), dtype=np.intp)
+        for j in range(k):
+            top[:, j] = np.argmin(d, axis=1)
+            d[filas, top[:, j]] = np.inf
+        return top
+    top = np.argpartition(d, k - 1, axis=1)[:, :k]
+    orden = np.argsort(np.take_along_axis(d, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, orden, axis=1)
+
+
+def _k_mas_cercanos(consultas: np.ndarray, candidatos: np.ndarray, normas_c: np.ndarray, k: int,
+                    propios: np.ndarray) -> np.ndarray:
+    """
+    Posiciones (en candidatos) de los k más cercanos a cada consulta, ordenados por distancia, sin la
+    propia fila (propios[i], posición de la consulta i en candidatos).
+    """
+    # ||a||² es constante por fila de consulta: no cambia el orden y no se suma. El -2 se aplica a las
+    # consultas (multiplicar por 2 es exacto), y la suma de ||b||² se hace en el propio bloque.
+    d = (-2.0 * consultas) @ candidatos.T
+    d += normas_c
+    d[np.arange(len(consultas)), propios] = np.inf
+    if consultas.dtype != np.float32:
+        return _seleccionar(d, k)
+    # En float32 el redondeo de ||b||² - 2 a·b es mayor que la distancia entre empleados casi repetidos y
+    # decide el desempate. Se toman k + MARGEN_REFINADO candidatos y se reordenan por la distancia
+    # directa en float64 (empates por posición): coinciden con los vecinos en float64 en el 96% de las
+    # filas en lugar del 74% (100k filas sintéticas); el resto son empates entre duplicados.
+    m = min(k + MARGEN_REFINADO, candidatos.shape[0] - 1)
+    top = _seleccionar(d, m)
+    diferencias = candidatos[top].astype(np.float64) - consultas[:, np.newaxis, :].astype(np.float64)
+    orden = np.lexsort((top, np.einsum("ijk,ijk->ij", diferencias, diferencias)), axis=1)[:, :k]
+    return np.take_along_axis(top, orden, axis=1)
+
+
+def vecinos_exactos(X: np.ndarray, k: int, n_jobs: int = 1) -> np.ndarray:
+    """k vecinos más cercanos (sin la propia fila) de cada fila de X, por fuerza bruta en bloques."""
+    n = len(X)
+    normas = np.einsum("ij,ij->i", X, X)
+    filas_bloque = max(1, MAX_ELEMENTOS_BLOQUE // n)
+    vecinos = np.empty((n, k), dtype=np.intp)
+
+    def bloque(inicio: int) -> None:
+        fin = min(inicio + filas_bloque, n)
+        vecinos[inicio:fin] = _k_mas_cercanos(X[inicio:fin], X, normas, k, np.arange(inicio, fin))
+
+    _en_paralelo(bloque, range(0, n, filas_bloque), n_jobs)
+    return vecinos
+
+
+def _kmeans(X: np.ndarray, n_listas: int, rng: np.random.RandomState, iteraciones: int = 10) -> np.ndarray:
+    """Centroides de k-means (Lloyd) ajustados sobre una muestra de X."""
+    muestra = X[rng.choice(len(X), min(len(X), 64 * n_listas), replace=False)]
+    centroides = muestra[rng.choice(len(muestra), n_listas, replace=False)].copy()
+    for _ in range(iteraciones):
+        asignacion = _asignar(muestra, centroides)
+        conteos = np.bincount(asignacion, minlength=n_listas)
+        sumas = np.zeros_like(centroides)
+        np.add.at(sumas, asignacion, muestra)
+        llenos = conteos > 0
+        centroides[llenos] = sumas[llenos] / conteos[llenos, np.newaxis]
+    return centroides
+
+
+def _asignar(X: np.ndarray, centroides: np.ndarray) -> np.ndarray:
+    """Centroide más cercano de cada fila, por bloques."""
+    normas = np.einsum("ij,ij->i", centroides, centroides)
+    filas_bloque = max(1, MAX_ELEMENTOS_BLOQUE // len(centroides))
+    return np.concatenate([
+        np.argmin(normas[np.newaxis, :] - 2.0 * (X[i:i + filas_bloque] @ centroides.T), axis=1)
+        for i in range(0, len(X), filas_bloque)
+    ])
+
+
+def vecinos_ivf(X: np.ndarray, k: int, tamano_lista: int = 2048, n_sondas: int = 2,
+                rng: np.random.RandomState | None = None, n_jobs: int = 1) -> np.ndarray:
+    """
+    k vecinos aproximados (sin la propia fila) con listas invertidas: cada fila se compara con las de
+    su lista y las de las n_sondas - 1 listas de centroides más cercanos (y más, si no llegan a k + 1).
+    """
+    n = len(X)
+    n_listas = max(1, n // tamano_lista)
+    if n_listas == 1:
+        return vecinos_exactos(X, k, n_jobs)
+    rng = check_random_state(rng)
+    centroides = _kmeans(X, n_listas, rng)
+    asignacion = _asignar(X, centroides)
+    orden = np.argsort(asignacion, kind="stable")
+    limites = np.concatenate([[0], np.cumsum(np.bincount(asignacion, minlength=n_listas))])
+    normas = np.einsum("ij,ij->i", X, X)
+    normas_cent = np.einsum("ij,ij->i", centroides, centroides)
+    cercanas = np.argsort(normas_cent[np.newaxis, :] - 2.0 * (centroides @ centroides.T), axis=1)
+    vecinos = np.empty((n, k), dtype=np.intp)
+
+    def lista(i: int) -> None:
+        propias = orden[limites[i]:limites[i + 1]]
+        if len(propias) == 0:
+            return
+        # La propia lista va primero: sus filas ocupan las primeras posiciones de candidatos
+        sondas = [i] + [j for j in cercanas[i] if j != i]
+        tomadas, total = [], 0
+        for j in sondas:
+            if len(tomadas) >= n_sondas and total > k:
+                break
+            tomadas.append(j)
+            total += limites[j + 1] - limites[j]
+        candidatos_idx = np.concatenate([orden[limites[j]:limites[j + 1]] for j in tomadas])
+        candidatos = X[candidatos_idx]
+        normas_c = normas[candidatos_idx]
+        filas_bloque = max(1, MAX_ELEMENTOS_BLOQUE // len(candidatos_idx))
+        for inicio in range(0, len(propias), filas_bloque):
+            fin = min(inicio + filas_bloque, len(propias))
+            top = _k_mas_cercanos(X[propias[inicio:fin]], candidatos, normas_c, k, np.arange(inicio, fin))
+            vecinos[propias[inicio:fin]] = candidatos_idx[top]
+
+    _en_paralelo(lista, range(n_listas), n_jobs)
+    return vecinos